@@ -4,79 +4,42 @@
 AI服务模块 - 处理自然语言请求并调用MCP工具
 """
 
-import re
 import json
 import asyncio
-from typing import Dict, Any, List, Optional
-from database import execute_query
+from typing import Dict, Any, List, Optional, Tuple
+from database import (async_db, insert_employee, update_employee_fields, search_employees,
+                      next_employee_id, rows_to_dicts)
+from intent_engine import IntentEngine
+from gazetteer import Gazetteer, gazetteer as default_gazetteer
 
 class AIService:
     """AI服务类，处理自然语言请求"""
     
-    def __init__(self):
-        self.intent_patterns = {
-            'query': [
-                r'查询|查找|搜索|找.*?([^\s，。！？的]+)',
-                r'([^\s，。！？]+).*?信息|账号|资料',
-                r'.*?([^\s，。！？]+).*?在.*?部门',
-            ],
-            'create': [
-                r'新增|添加|创建.*?员工.*?([^\s，。！？]+).*?部门.*?([^\s，。！？]+部)',
-                r'员工.*?([^\s，。！？]+).*?部门.*?([^\s，。！？]+部)',
-                r'添加.*?([^\s，。！？]+).*?到.*?([^\s，。！？]+部)',
-            ],
-            'update': [
-                r'修改|更改|改.*?([^\s，。！？]+).*?部门.*?([^\s，。！？]+部)',
-                r'把.*?([^\s，。！？]+).*?改为|修改为|更改为.*?([^\s，。！？]+部)',
-                r'([^\s，。！？]+).*?转到|调到.*?([^\s，。！？]+部)',
-            ]
-        }
+    def __init__(self, gazetteer: Optional[Gazetteer] = None):
+        self.intent_engine = IntentEngine()
+        self.gazetteer = gazetteer
     
     def extract_intent_and_entities(self, message: str) -> Dict[str, Any]:
-        """提取用户意图和实体"""
-        message = message.strip()
-        
-        # 查询意图
-        for pattern in self.intent_patterns['query']:
-            match = re.search(pattern, message)
-            if match:
-                return {
-                    'intent': 'query',
-                    'entities': {
-                        'name': match.group(1) if match.group(1) else None
-                    }
-                }
-        
-        # 创建意图
-        for pattern in self.intent_patterns['create']:
-            match = re.search(pattern, message)
-            if match:
-                if len(match.groups()) >= 2:
-                    return {
-                        'intent': 'create',
-                        'entities': {
-                            'name': match.group(1),
-                            'department': match.group(2)
-                        }
-                    }
-        
-        # 更新意图
-        for pattern in self.intent_patterns['update']:
-            match = re.search(pattern, message)
-            if match:
-                if len(match.groups()) >= 2:
-                    return {
-                        'intent': 'update',
-                        'entities': {
-                            'name': match.group(1),
-                            'department': match.group(2)
-                        }
-                    }
-        
-        return {
-            'intent': 'unknown',
-            'entities': {}
-        }
+        """提取用户意图和实体
+
+        配置了姓名词典时，用消息中出现的已知员工姓名/部门名称校正正则捕获的
+        片段，并标记 name_exact，后续可按姓名索引精确查询。
+        """
+        result = self.intent_engine.match(message)
+        if self.gazetteer is None or result['intent'] == 'unknown':
+            return result
+        
+        entities = result['entities']
+        if result['intent'] in ('query', 'update'):
+            known_name = self.gazetteer.first(message, 'name')
+            captured = entities.get('name')
+            # 捕获的片段比已知姓名更长且包含它时（如新员工"张三丰"包含"张三"），保留捕获结果
+            if known_name and not (captured and known_name != captured and known_name in captured):
+                entities['name'] = known_name
+                entities['name_exact'] = True
+        if result['intent'] == 'create' and not entities.get('department'):
+            entities['department'] = self.gazetteer.first(message, 'department')
+        return result
     
     async def process_query_intent(self, entities: Dict[str, Any]) -> str:
         """处理查询意图"""
@@ -85,27 +48,32 @@ class AIService:
             return "请提供要查询的员工姓名。"
         
         try:
-            employees = execute_query("SELECT * FROM employee WHERE name LIKE ? ORDER BY name", (f"%{name}%",))
-            
-            if not employees:
-                return f"未找到姓名包含'{name}'的员工。"
-            
-            if len(employees) == 1:
-                emp = employees[0]
-                return f"""找到员工信息：
+            if entities.get('name_exact'):
+                employees = await async_db.fetch("SELECT * FROM employee WHERE name = ?", (name,))
+            else:
+                employees = await async_db.call(search_employees, name)
+            return self.format_query_response(name, employees)
+                
+        except Exception as e:
+            return f"查询员工信息时出现错误：{str(e)}"
+    
+    def format_query_response(self, name: str, employees: List[Dict[str, Any]]) -> str:
+        if not employees:
+            return f"未找到姓名包含'{name}'的员工。"
+        
+        if len(employees) == 1:
+            emp = employees[0]
+            return f"""找到员工信息：
 • 姓名：{emp['name']}
 • 工号：{emp['employee_id']}
 • 部门：{emp['department']}
 • HR账号：{emp['hr_account']}
 • 状态：{emp['status']}"""
-            else:
-                result = f"找到 {len(employees)} 名员工：\n\n"
-                for emp in employees:
-                    result += f"• {emp['name']} ({emp['employee_id']}) - {emp['department']} - {emp['status']}\n"
-                return result
-                
-        except Exception as e:
-            return f"查询员工信息时出现错误：{str(e)}"
+        else:
+            result = f"找到 {len(employees)} 名员工：\n\n"
+            for emp in employees:
+                result += f"• {emp['name']} ({emp['employee_id']}) - {emp['department']} - {emp['status']}\n"
+            return result
     
     async def process_create_intent(self, entities: Dict[str, Any]) -> str:
         """处理创建意图"""
@@ -117,39 +85,27 @@ class AIService:
         
         try:
             # 生成员工工号
-            result = execute_query("SELECT employee_id FROM employee WHERE employee_id LIKE 'EMP%' ORDER BY employee_id DESC LIMIT 1")
-            if result:
-                last_id = result[0]['employee_id']
-                num = int(last_id[3:]) + 1
-                employee_id = f"EMP{num:03d}"
-            else:
-                employee_id = "EMP001"
-            
-            # 生成HR账号
-            hr_account = f"{name.lower()}@company.com"
+            employee_id = await async_db.call(next_employee_id)
             
-            # 检查工号是否已存在
-            existing = execute_query("SELECT id FROM employee WHERE employee_id = ?", (employee_id,))
-            if existing:
-                return f"工号 {employee_id} 已存在，请重试。"
-            
-            # 插入新员工
-            sql = """
-                INSERT INTO employee (name, employee_id, department, hr_account, status)
-                VALUES (?, ?, ?, ?, '在职')
-            """
-            execute_query(sql, (name, employee_id, department, hr_account))
-            
-            return f"""员工创建成功！
-• 姓名：{name}
-• 工号：{employee_id}
-• 部门：{department}
-• HR账号：{hr_account}
-• 状态：在职"""
+            # 查重并插入新员工（经由写队列）
+            new_employee = await async_db.write(insert_employee, name, employee_id, department,
+                                                default_hr_account(name))
+            return self.format_create_response(employee_id, new_employee)
             
         except Exception as e:
             return f"创建员工时出现错误：{str(e)}"
     
+    def format_create_response(self, employee_id: str, new_employee: Optional[Dict[str, Any]]) -> str:
+        if new_employee is None:
+            return f"工号 {employee_id} 已存在，请重试。"
+        
+        return f"""员工创建成功！
+• 姓名：{new_employee['name']}
+• 工号：{new_employee['employee_id']}
+• 部门：{new_employee['department']}
+• HR账号：{new_employee['hr_account']}
+• 状态：在职"""
+    
     async def process_update_intent(self, entities: Dict[str, Any]) -> str:
         """处理更新意图"""
         name = entities.get('name')
@@ -160,33 +116,35 @@ class AIService:
         
         try:
             # 查找员工
-            employees = execute_query("SELECT * FROM employee WHERE name = ?", (name,))
-            
-            if not employees:
-                return f"未找到员工'{name}'。"
-            
-            if len(employees) > 1:
-                result = f"找到多个名为'{name}'的员工，请提供更具体的信息：\n"
-                for emp in employees:
-                    result += f"• {emp['name']} ({emp['employee_id']}) - {emp['department']}\n"
-                return result
-            
-            employee = employees[0]
-            old_department = employee['department']
-            
-            # 更新员工信息
-            execute_query(
-                "UPDATE employee SET department = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (new_department, employee['id'])
-            )
+            employees = await async_db.fetch("SELECT * FROM employee WHERE name = ?", (name,))
             
-            return f"已成功将{name}的部门从'{old_department}'修改为'{new_department}'。"
+            if len(employees) == 1:
+                # 更新员工信息
+                await async_db.write(update_employee_fields, employees[0]['id'], {'department': new_department})
+            return self.format_update_response(name, new_department, employees)
             
         except Exception as e:
             return f"修改员工信息时出现错误：{str(e)}"
     
+    def format_update_response(self, name: str, new_department: str, employees: List[Dict[str, Any]]) -> str:
+        """employees为更新前按姓名查到的员工"""
+        if not employees:
+            return f"未找到员工'{name}'。"
+        
+        if len(employees) > 1:
+            result = f"找到多个名为'{name}'的员工，请提供更具体的信息：\n"
+            for emp in employees:
+                result += f"• {emp['name']} ({emp['employee_id']}) - {emp['department']}\n"
+            return result
+        
+        old_department = employees[0]['department']
+        return f"已成功将{name}的部门从'{old_department}'修改为'{new_department}'。"
+    
     async def process_message(self, message: str) -> str:
         """处理用户消息"""
+        if self.gazetteer is not None:
+            await async_db.call(self.gazetteer.refresh)
+        
         # 提取意图和实体
         result = self.extract_intent_and_entities(message)
         intent = result['intent']
@@ -223,9 +181,170 @@ class AIService:
 
 请告诉我您需要什么帮助？"""
 
+    async def process_batch(self, messages: List[str]) -> List[str]:
+        """批量处理消息，返回与输入顺序一致的回复
+
+        与逐条调用process_message语义一致：消息按顺序切分为连续的读段
+        （查询及无法识别的消息）和写段（新增/修改），各段依次执行，
+        后面的查询能看到前面的写入。段内：
+        • 精确姓名查询合并为一次 IN (...) 查询，模糊查询并发执行；
+        • 新增/修改在写线程的同一个事务中按消息顺序执行，
+          修改可以看到同段中更早的新增。
+        """
+        if self.gazetteer is not None:
+            await async_db.call(self.gazetteer.refresh)
+        
+        extracted = [self.extract_intent_and_entities(message) for message in messages]
+        responses: List[Optional[str]] = [None] * len(messages)
+        
+        segments: List[Tuple[bool, List[int]]] = []
+        for index, result in enumerate(extracted):
+            is_write = result['intent'] in ('create', 'update')
+            if segments and segments[-1][0] == is_write:
+                segments[-1][1].append(index)
+            else:
+                segments.append((is_write, [index]))
+        
+        written = False
+        for is_write, indexes in segments:
+            if written and self.gazetteer is not None:
+                # 前面的写段可能新增了员工，刷新姓名词典后重新提取实体
+                await async_db.call(self.gazetteer.refresh)
+                for index in indexes:
+                    extracted[index] = self.extract_intent_and_entities(messages[index])
+            try:
+                if is_write:
+                    await self._process_write_segment(indexes, extracted, responses)
+                    written = True
+                else:
+                    await self._process_read_segment(indexes, extracted, responses)
+            except Exception as e:
+                for index in indexes:
+                    if responses[index] is None:
+                        responses[index] = f"批量处理时出现错误：{str(e)}"
+        
+        return responses
+    
+    async def _process_read_segment(self, indexes: List[int], extracted: List[Dict[str, Any]],
+                                    responses: List[Optional[str]]):
+        """读段：精确姓名一次查询，模糊查询并发执行"""
+        exact_names = set()
+        fuzzy_queries = []
+        for index in indexes:
+            intent = extracted[index]['intent']
+            name = extracted[index]['entities'].get('name')
+            if intent != 'query':
+                responses[index] = self.get_help_message()
+            elif not name:
+                responses[index] = "请提供要查询的员工姓名。"
+            elif extracted[index]['entities'].get('name_exact'):
+                exact_names.add(name)
+            else:
+                fuzzy_queries.append((index, name))
+        
+        by_name: Dict[str, List[Dict[str, Any]]] = {name: [] for name in exact_names}
+        if exact_names:
+            placeholders = ', '.join('?' * len(exact_names))
+            for emp in await async_db.fetch(
+                f"SELECT * FROM employee WHERE name IN ({placeholders}) ORDER BY name", list(exact_names)
+            ):
+                by_name[emp['name']].append(emp)
+        fuzzy_results = await asyncio.gather(*(
+            async_db.call(search_employees, name) for _, name in fuzzy_queries
+        ))
+        
+        for index in indexes:
+            if responses[index] is None:
+                name = extracted[index]['entities']['name']
+                if name in by_name:
+                    responses[index] = self.format_query_response(name, by_name[name])
+        for (index, name), employees in zip(fuzzy_queries, fuzzy_results):
+            responses[index] = self.format_query_response(name, employees)
+    
+    async def _process_write_segment(self, indexes: List[int], extracted: List[Dict[str, Any]],
+                                     responses: List[Optional[str]]):
+        """写段：所有新增/修改在写线程的一个事务中按顺序执行"""
+        writes = []
+        for index in indexes:
+            intent = extracted[index]['intent']
+            entities = extracted[index]['entities']
+            name = entities.get('name')
+            department = entities.get('department')
+            
+            if intent == 'create':
+                if not name or not department:
+                    responses[index] = "请提供完整的员工信息，包括姓名和部门。"
+                else:
+                    employee_id = await async_db.call(next_employee_id)
+                    writes.append((index, ('create', name, employee_id, department, default_hr_account(name))))
+            elif not name or not department:
+                responses[index] = "请提供要修改的员工姓名和新的部门信息。"
+            else:
+                writes.append((index, ('update', name, department)))
+        
+        if not writes:
+            return
+        outcomes = await async_db.write(apply_chat_writes, [op for _, op in writes])
+        for (index, op), outcome in zip(writes, outcomes):
+            if isinstance(outcome, Exception):
+                action = "创建员工" if op[0] == 'create' else "修改员工信息"
+                responses[index] = f"{action}时出现错误：{str(outcome)}"
+            elif op[0] == 'create':
+                responses[index] = self.format_create_response(op[2], outcome)
+            else:
+                responses[index] = self.format_update_response(op[1], op[2], outcome)
+
+def default_hr_account(name: str) -> str:
+    """根据姓名生成默认HR账号"""
+    return f"{name.lower()}@company.com"
+
+def apply_chat_writes(conn, ops):
+    """写任务：按顺序执行一批对话产生的新增/修改
+
+    每个操作使用独立的SAVEPOINT，失败只影响自身；返回与ops对应的结果列表：
+    新增为新员工记录（工号冲突时为None），修改为修改前按姓名查到的员工列表，
+    出错时为异常对象。
+    """
+    update_names = sorted({op[1] for op in ops if op[0] == 'update'})
+    by_name: Dict[str, List[Dict[str, Any]]] = {name: [] for name in update_names}
+    if update_names:
+        placeholders = ', '.join('?' * len(update_names))
+        for emp in rows_to_dicts(conn.execute(
+            f"SELECT * FROM employee WHERE name IN ({placeholders})", update_names
+        )):
+            by_name[emp['name']].append(emp)
+    
+    outcomes = []
+    for op in ops:
+        conn.execute('SAVEPOINT chat_write')
+        try:
+            if op[0] == 'create':
+                _, name, employee_id, department, hr_account = op
+                outcome = insert_employee(conn, name, employee_id, department, hr_account)
+                if outcome is not None and name in by_name:
+                    by_name[name].append(outcome)
+            else:
+                _, name, department = op
+                employees = [dict(emp) for emp in by_name.get(name, [])]
+                if len(employees) == 1:
+                    updated = update_employee_fields(conn, employees[0]['id'], {'department': department})
+                    by_name[name] = [updated]
+                outcome = employees
+            conn.execute('RELEASE chat_write')
+        except Exception as e:
+            conn.execute('ROLLBACK TO chat_write')
+            conn.execute('RELEASE chat_write')
+            outcome = e
+        outcomes.append(outcome)
+    return outcomes
+
 # 全局AI服务实例
-ai_service = AIService()
+ai_service = AIService(default_gazetteer)
 
 async def process_ai_request(message: str) -> str:
     """处理AI请求的入口函数"""
-    return await ai_service.process_message(message)
\ No newline at end of file
+    return await ai_service.process_message(message)
+
+async def process_ai_batch(messages: List[str]) -> List[str]:
+    """批量处理AI请求的入口函数"""
+    return await ai_service.process_batch(messages)
\ No newline at end of file
@@ -4,68 +4,237 @@
 HR系统后端API服务
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import sqlite3
-import uuid
-import asyncio
-from datetime import datetime
-from database import execute_query, get_connection
+import csv
+import functools
+import gzip
+import io
+import json
+import time
+import threading
+import database
+from database import (execute_query, get_pool_stats, get_writer_stats,
+                      execute_write, submit_write, insert_employee, update_employee_fields,
+                      bulk_insert_employees, stream_query, fetch_employee_page, init_database, ensure_database,
+                      search_employees, name_fts_available, SEARCH_LIMIT, next_employee_id,
+                      fetch_statistics, fetch_departments, get_data_version, get_employee_version,
+                      fetch_changes, latest_change_seq, CHANGES_PAGE_SIZE, parse_fields, project_rows,
+                      select_list)
 from models import Employee, EmployeeQuery, APIResponse
-from ai_service import process_ai_request
+from cache import ResponseCache
+from directory_snapshot import EmployeeDirectory
+from event_bus import event_bus, change_feed
+from loop_runner import background_loop
+from ai_service import process_ai_request, process_ai_batch
 
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
+# 调试模式下也输出紧凑JSON，中文不转义为\uXXXX
+app.json.compact = True
+app.json.ensure_ascii = False
 
-def generate_employee_id():
-    """生成新的员工工号"""
-    # 查询当前最大的员工编号
-    result = execute_query("SELECT employee_id FROM employee WHERE employee_id LIKE 'EMP%' ORDER BY employee_id DESC LIMIT 1")
+# 响应体超过该字节数且客户端接受gzip时压缩
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# gzip响应的ETag后缀，与未压缩表示区分
+GZIP_ETAG_SUFFIX = '-gzip'
+
+# AI对话单条消息的处理超时（秒）
+AI_CHAT_TIMEOUT = 30.0
+# 批量对话单次最多消息数及整体超时（秒）
+AI_BATCH_MAX_MESSAGES = 100
+AI_BATCH_TIMEOUT = 60.0
+
+# 读接口的响应缓存，任何写入提交后自动失效
+response_cache = ResponseCache(get_data_version)
+
+# 员工目录快照：按id查找时优先走内存映射，过期时退回SQL
+employee_directory = EmployeeDirectory(database)
+
+# 批量导入配置
+BULK_IMPORT_TYPES = ('text/csv', 'application/x-ndjson', 'application/jsonl')
+BULK_IMPORT_FIELDS = ('name', 'employee_id', 'department', 'hr_account', 'status')
+BULK_CHUNK_SIZE = 2000
+BULK_MAX_PENDING_CHUNKS = 4
+BULK_MAX_REPORTED_ERRORS = 1000
+# 自动分配工号的行在校验时使用的占位工号
+PENDING_EMPLOYEE_ID = 'EMP-PENDING'
+
+# SSE连接无事件时发送心跳的间隔（秒），客户端断线后的重连间隔（毫秒）
+EVENTS_HEARTBEAT_INTERVAL = 15.0
+EVENTS_RETRY_MS = 3000
+
+# 变更长轮询：最长等待秒数及检查数据版本的间隔
+CHANGES_MAX_WAIT = 30.0
+CHANGES_POLL_INTERVAL = 0.1
+# 同时长轮询等待的请求上限：等待中的请求独占一个工作线程，超过上限时立即返回
+CHANGES_MAX_WAITERS = 16
+changes_waiters = threading.BoundedSemaphore(CHANGES_MAX_WAITERS)
+
+# 导出列顺序
+EXPORT_COLUMNS = ('id', 'name', 'employee_id', 'department', 'hr_account', 'status', 'created_at', 'updated_at')
+
+def with_etag(view):
+    """为读接口添加基于employee表版本号的强ETag
+
+    If-None-Match与当前版本匹配时直接返回304，不执行查询和序列化；
+    读取版本号失败时不带ETag，照常返回数据。
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            version = get_employee_version()
+        except Exception:
+            return view(*args, **kwargs)
+        etag = f"{view.__name__}-{version}"
+        if 'gzip' in request.accept_encodings and request.if_none_match.contains(etag + GZIP_ETAG_SUFFIX):
+            # 客户端缓存的是gzip表示且本次仍接受gzip，304时回传同一个ETag
+            response = Response(status=304)
+            response.headers['Vary'] = 'Accept-Encoding'
+            etag += GZIP_ETAG_SUFFIX
+        elif request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        # 要求浏览器每次都携带If-None-Match重新验证
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+@app.before_request
+def prepare_database():
+    """首个请求前迁移表结构（不经由 __main__ 启动时init_database不会执行）"""
+    ensure_database()
+
+@app.after_request
+def compress_response(response):
+    """客户端接受gzip时压缩较大的JSON响应，强ETag随之加上gzip后缀"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if 'gzip' not in request.accept_encodings or response.content_length < GZIP_MIN_SIZE:
+        return response
     
-    if result:
-        last_id = result[0]['employee_id']
-        # 提取数字部分并加1
-        num = int(last_id[3:]) + 1
-        return f"EMP{num:03d}"
-    else:
-        return "EMP001"
+    response.set_data(gzip.compress(response.get_data(), compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + GZIP_ETAG_SUFFIX, weak)
+    return response
+
+def requested_fields():
+    """解析fields参数（逗号分隔的列名），未指定时返回None表示全部列"""
+    return parse_fields(request.args.get('fields'))
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """健康检查接口"""
-    return jsonify(APIResponse(True, "服务正常运行").to_dict())
+    return jsonify(APIResponse(True, "服务正常运行", {
+        'db_pool': get_pool_stats(),
+        'db_writer': get_writer_stats(),
+        'response_cache': response_cache.stats(),
+        'directory_snapshot': employee_directory.get_stats(),
+        'event_bus': event_bus.stats(),
+        'change_feed': change_feed.get_stats()
+    }).to_dict())
+
+def load_employee_by_id(emp_id, fields=None):
+    """按id读取员工，目录快照与数据库一致时不执行SQL"""
+    snapshot = employee_directory.fresh()
+    if snapshot is not None:
+        employee = snapshot.by_id(emp_id)
+        return project_rows([employee], fields) if employee else []
+    return execute_query(f"SELECT {select_list(fields)} FROM employee WHERE id = ?", (emp_id,))
+
+def employee_query_from_args():
+    """从请求参数构建员工查询条件"""
+    return EmployeeQuery(
+        name=request.args.get('name'),
+        employee_id=request.args.get('employee_id'),
+        department=request.args.get('department'),
+        status=request.args.get('status')
+    )
 
 @app.route('/api/employees', methods=['GET'])
+@with_etag
 def get_employees():
     """获取员工列表"""
     try:
-        # 获取查询参数
-        name = request.args.get('name')
-        employee_id = request.args.get('employee_id')
-        department = request.args.get('department')
-        status = request.args.get('status')
-        
         # 构建查询条件
-        query = EmployeeQuery(name=name, employee_id=employee_id, department=department, status=status)
-        where_clause, params = query.to_sql_where()
-        
-        sql = f"SELECT * FROM employee WHERE {where_clause} ORDER BY created_at DESC"
-        employees = execute_query(sql, params)
+        where_clause, params = employee_query_from_args().to_sql_where(use_fts=name_fts_available())
+        
+        # 提供limit时按游标分页，否则返回全部匹配员工
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true')
+        fields = requested_fields()
+        cache_key = ('employees', where_clause, tuple(params), limit, cursor, include_total, fields)
+        page = response_cache.get_or_load(cache_key, lambda: fetch_employee_page(
+            where_clause, params, limit=limit, cursor=cursor, include_total=include_total, fields=fields
+        ))
+        count = page.get('total', len(page['employees']))
         
         return jsonify(APIResponse(
             True, 
-            f"查询成功，共找到 {len(employees)} 名员工",
-            {'employees': employees}
+            f"查询成功，共找到 {count} 名员工",
+            page
         ).to_dict())
         
+    except ValueError as e:
+        return jsonify(APIResponse(False, f"查询失败: {str(e)}").to_dict()), 400
     except Exception as e:
         return jsonify(APIResponse(False, f"查询失败: {str(e)}").to_dict()), 500
 
+@app.route('/api/employees/export', methods=['GET'])
+def export_employees():
+    """流式导出员工数据（NDJSON或CSV），支持与员工列表相同的筛选参数"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify(APIResponse(False, "format参数必须是ndjson或csv").to_dict()), 400
+    
+    where_clause, params = employee_query_from_args().to_sql_where(use_fts=name_fts_available())
+    sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM employee WHERE {where_clause} ORDER BY id"
+    batches = stream_query(sql, params)
+    
+    def generate_ndjson():
+        for batch in batches:
+            yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in batch)
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for batch in batches:
+            writer.writerows([row[column] for column in EXPORT_COLUMNS] for row in batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # 结果为空时仍输出表头
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    if export_format == 'csv':
+        return Response(generate_csv(), mimetype='text/csv', headers={
+            'Content-Disposition': 'attachment; filename=employees.csv'
+        })
+    return Response(generate_ndjson(), mimetype='application/x-ndjson')
+
 @app.route('/api/employees/<int:emp_id>', methods=['GET'])
+@with_etag
 def get_employee_by_id(emp_id):
     """根据ID获取员工信息"""
     try:
-        employees = execute_query("SELECT * FROM employee WHERE id = ?", (emp_id,))
+        fields = requested_fields()
+        employees = response_cache.get_or_load(
+            ('employee', emp_id, fields),
+            lambda: load_employee_by_id(emp_id, fields)
+        )
         
         if not employees:
             return jsonify(APIResponse(False, "员工不存在").to_dict()), 404
@@ -76,18 +245,21 @@ def get_employee_by_id(emp_id):
             {'employee': employees[0]}
         ).to_dict())
         
+    except ValueError as e:
+        return jsonify(APIResponse(False, f"查询失败: {str(e)}").to_dict()), 400
     except Exception as e:
         return jsonify(APIResponse(False, f"查询失败: {str(e)}").to_dict()), 500
 
 @app.route('/api/employees/search', methods=['GET'])
 def search_employees_by_name():
-    """根据姓名搜索员工（支持模糊匹配）"""
+    """根据姓名搜索员工（支持模糊匹配，按相关度排序）"""
     try:
         name = request.args.get('name')
         if not name:
             return jsonify(APIResponse(False, "请提供员工姓名").to_dict()), 400
         
-        employees = execute_query("SELECT * FROM employee WHERE name LIKE ? ORDER BY name", (f"%{name}%",))
+        employees = search_employees(name, request.args.get('limit', SEARCH_LIMIT, type=int),
+                                     fields=requested_fields())
         
         if not employees:
             return jsonify(APIResponse(False, f"未找到姓名包含'{name}'的员工").to_dict())
@@ -98,6 +270,8 @@ def search_employees_by_name():
             {'employees': employees}
         ).to_dict())
         
+    except ValueError as e:
+        return jsonify(APIResponse(False, f"搜索失败: {str(e)}").to_dict()), 400
     except Exception as e:
         return jsonify(APIResponse(False, f"搜索失败: {str(e)}").to_dict()), 500
 
@@ -114,7 +288,7 @@ def create_employee():
         
         # 如果没有提供工号，自动生成
         if not employee.employee_id:
-            employee.employee_id = generate_employee_id()
+            employee.employee_id = next_employee_id()
         
         # 如果没有提供HR账号，根据姓名生成
         if not employee.hr_account:
@@ -126,31 +300,127 @@ def create_employee():
         if errors:
             return jsonify(APIResponse(False, f"数据验证失败: {', '.join(errors)}").to_dict()), 400
         
-        # 检查工号是否已存在
-        existing = execute_query("SELECT id FROM employee WHERE employee_id = ?", (employee.employee_id,))
-        if existing:
+        # 查重、插入、回读在写线程的同一个事务内完成
+        new_employee = execute_write(insert_employee, employee.name, employee.employee_id,
+                                     employee.department, employee.hr_account, employee.status)
+        if new_employee is None:
             return jsonify(APIResponse(False, f"工号 {employee.employee_id} 已存在").to_dict()), 400
         
-        # 插入数据库
-        sql = """
-            INSERT INTO employee (name, employee_id, department, hr_account, status)
-            VALUES (?, ?, ?, ?, ?)
-        """
-        execute_query(sql, (employee.name, employee.employee_id, employee.department, 
-                           employee.hr_account, employee.status))
-        
-        # 获取新创建的员工信息
-        new_employee = execute_query("SELECT * FROM employee WHERE employee_id = ?", (employee.employee_id,))
-        
         return jsonify(APIResponse(
             True, 
             f"员工 {employee.name} 创建成功",
-            {'employee': new_employee[0]}
+            {'employee': new_employee}
         ).to_dict()), 201
         
     except Exception as e:
         return jsonify(APIResponse(False, f"创建失败: {str(e)}").to_dict()), 500
 
+def iter_import_records(stream, mimetype):
+    """逐行解析CSV/NDJSON请求体，产出 (行号, 记录, 错误信息)"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if mimetype == 'text/csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+    
+    for line_no, line in enumerate(text, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"JSON解析失败: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "每行必须是JSON对象"
+            continue
+        yield line_no, record, None
+
+@app.route('/api/employees/bulk', methods=['POST'])
+def bulk_import_employees():
+    """批量导入员工（流式读取CSV或NDJSON请求体，分块事务写入）"""
+    try:
+        if request.mimetype not in BULK_IMPORT_TYPES:
+            return jsonify(APIResponse(
+                False, f"不支持的内容类型，请使用: {', '.join(BULK_IMPORT_TYPES)}"
+            ).to_dict()), 415
+        
+        total = 0
+        inserted = 0
+        failed = 0
+        errors = []
+        chunk = []
+        pending = []
+        
+        def record_errors(row_errors):
+            nonlocal failed
+            failed += len(row_errors)
+            room = BULK_MAX_REPORTED_ERRORS - len(errors)
+            if room > 0:
+                errors.extend(row_errors[:room])
+        
+        def collect(future):
+            # 单个块写入失败只影响该块的行，已提交的块照常计入结果
+            nonlocal inserted
+            lines, future = future
+            try:
+                count, row_errors = future.result()
+            except Exception as e:
+                count, row_errors = 0, [{'line': line_no, 'errors': [f"写入失败: {e}"]} for line_no in lines]
+            inserted += count
+            record_errors(row_errors)
+        
+        def flush():
+            # 写入与后续解析并行进行，限制在途块数以控制内存
+            pending.append(([row[0] for row in chunk], submit_write(bulk_insert_employees, list(chunk))))
+            chunk.clear()
+            while len(pending) > BULK_MAX_PENDING_CHUNKS:
+                collect(pending.pop(0))
+        
+        for line_no, record, error in iter_import_records(request.stream, request.mimetype):
+            total += 1
+            if error:
+                record_errors([{'line': line_no, 'errors': [error]}])
+                continue
+            
+            data = {field: str(record[field]).strip() for field in BULK_IMPORT_FIELDS
+                    if record.get(field) not in (None, '')}
+            employee = Employee.from_dict(data)
+            
+            # 未提供工号的行在写入时按块分配
+            auto_id = not employee.employee_id
+            if auto_id:
+                employee.employee_id = PENDING_EMPLOYEE_ID
+            if not employee.hr_account:
+                employee.hr_account = f"{employee.name.lower()}@company.com"
+            
+            row_errors = employee.validate()
+            if row_errors:
+                record_errors([{'line': line_no, 'errors': row_errors}])
+                continue
+            
+            chunk.append((line_no, employee.name, None if auto_id else employee.employee_id,
+                          employee.department, employee.hr_account, employee.status))
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                flush()
+        
+        if chunk:
+            flush()
+        for future in pending:
+            collect(future)
+        
+        errors.sort(key=lambda item: item['line'])
+        return jsonify(APIResponse(
+            failed == 0,
+            f"批量导入完成：共 {total} 行，成功 {inserted} 行，失败 {failed} 行",
+            {'total': total, 'inserted': inserted, 'failed': failed, 'errors': errors}
+        ).to_dict())
+        
+    except Exception as e:
+        return jsonify(APIResponse(False, f"批量导入失败: {str(e)}").to_dict()), 500
+
 @app.route('/api/employees/<int:emp_id>', methods=['PUT'])
 def update_employee(emp_id):
     """更新员工信息"""
@@ -159,38 +429,24 @@ def update_employee(emp_id):
         if not data:
             return jsonify(APIResponse(False, "请提供更新信息").to_dict()), 400
         
-        # 检查员工是否存在
-        existing = execute_query("SELECT * FROM employee WHERE id = ?", (emp_id,))
-        if not existing:
-            return jsonify(APIResponse(False, "员工不存在").to_dict()), 404
+        # 筛选允许更新的字段
+        fields = {field: data[field] for field in ['name', 'department', 'hr_account', 'status'] if field in data}
         
-        # 构建更新语句
-        update_fields = []
-        params = []
-        
-        allowed_fields = ['name', 'department', 'hr_account', 'status']
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = ?")
-                params.append(data[field])
-        
-        if not update_fields:
+        if not fields:
+            existing = execute_query("SELECT id FROM employee WHERE id = ?", (emp_id,))
+            if not existing:
+                return jsonify(APIResponse(False, "员工不存在").to_dict()), 404
             return jsonify(APIResponse(False, "没有提供有效的更新字段").to_dict()), 400
         
-        # 添加更新时间
-        update_fields.append("updated_at = CURRENT_TIMESTAMP")
-        params.append(emp_id)
-        
-        sql = f"UPDATE employee SET {', '.join(update_fields)} WHERE id = ?"
-        execute_query(sql, params)
-        
-        # 获取更新后的员工信息
-        updated_employee = execute_query("SELECT * FROM employee WHERE id = ?", (emp_id,))
+        # 更新并回读在写线程的同一个事务内完成
+        updated_employee = execute_write(update_employee_fields, emp_id, fields)
+        if updated_employee is None:
+            return jsonify(APIResponse(False, "员工不存在").to_dict()), 404
         
         return jsonify(APIResponse(
             True, 
             f"员工信息更新成功",
-            {'employee': updated_employee[0]}
+            {'employee': updated_employee}
         ).to_dict())
         
     except Exception as e:
@@ -200,25 +456,73 @@ def update_employee(emp_id):
 def delete_employee(emp_id):
     """删除员工（软删除，设置状态为离职）"""
     try:
-        # 检查员工是否存在
-        existing = execute_query("SELECT * FROM employee WHERE id = ?", (emp_id,))
-        if not existing:
-            return jsonify(APIResponse(False, "员工不存在").to_dict()), 404
-        
         # 软删除：设置状态为离职
-        execute_query("UPDATE employee SET status = '离职', updated_at = CURRENT_TIMESTAMP WHERE id = ?", (emp_id,))
+        employee = execute_write(update_employee_fields, emp_id, {'status': '离职'})
+        if employee is None:
+            return jsonify(APIResponse(False, "员工不存在").to_dict()), 404
         
-        return jsonify(APIResponse(True, f"员工 {existing[0]['name']} 已设置为离职状态").to_dict())
+        return jsonify(APIResponse(True, f"员工 {employee['name']} 已设置为离职状态").to_dict())
         
     except Exception as e:
         return jsonify(APIResponse(False, f"删除失败: {str(e)}").to_dict()), 500
 
+def format_sse(event, data, event_id=None):
+    """编码一条SSE消息"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+@app.route('/api/events', methods=['GET'])
+def employee_events():
+    """员工变更事件流（Server-Sent Events）
+
+    事件来自employee_changes变更日志，包含所有进程（simple_app、MCP服务器等）的写入：
+    推送 employee.created / employee.updated / employee.status_changed /
+    employee.deleted 事件，事件id为变更序号，每批变更之后推送一次刷新后的 stats。
+    连接建立时先推送当前统计；客户端积压过多事件或一批变更过大时推送 resync，
+    客户端应重新全量加载。每个连接独占一个工作线程，连接数达到
+    event_bus.MAX_SUBSCRIBERS 时返回503。
+    """
+    subscription = event_bus.subscribe()
+    if subscription is None:
+        return jsonify(APIResponse(False, "事件流连接数已达上限，请稍后重试").to_dict()), 503
+    change_feed.ensure_started()
+    
+    def stream():
+        try:
+            yield f"retry: {EVENTS_RETRY_MS}\n\n"
+            yield format_sse('stats', {'stats': response_cache.get_or_load(('stats',), fetch_statistics)})
+            while True:
+                if subscription.overflowed:
+                    subscription.reset()
+                    yield format_sse('resync', {})
+                    continue
+                item = subscription.get(timeout=EVENTS_HEARTBEAT_INTERVAL)
+                if item is None:
+                    # 心跳注释行，保持连接并及时发现客户端断开
+                    yield ": keepalive\n\n"
+                    continue
+                event_id, event, data = item
+                yield format_sse(event, data, event_id)
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # 生成器未开始迭代就关闭连接时也要释放订阅
+    response.call_on_close(lambda: event_bus.unsubscribe(subscription))
+    return response
+
 @app.route('/api/departments', methods=['GET'])
+@with_etag
 def get_departments():
     """获取所有部门列表"""
     try:
-        departments = execute_query("SELECT DISTINCT department FROM employee WHERE status = '在职' ORDER BY department")
-        dept_list = [dept['department'] for dept in departments]
+        dept_list = response_cache.get_or_load(('departments',), fetch_departments)
         
         return jsonify(APIResponse(
             True, 
@@ -230,30 +534,12 @@ def get_departments():
         return jsonify(APIResponse(False, f"查询失败: {str(e)}").to_dict()), 500
 
 @app.route('/api/stats', methods=['GET'])
+@with_etag
 def get_statistics():
     """获取统计信息"""
     try:
-        # 总员工数
-        total = execute_query("SELECT COUNT(*) as count FROM employee")[0]['count']
-        
-        # 在职员工数
-        active = execute_query("SELECT COUNT(*) as count FROM employee WHERE status = '在职'")[0]['count']
-        
-        # 各部门人数
-        dept_stats = execute_query("""
-            SELECT department, COUNT(*) as count 
-            FROM employee 
-            WHERE status = '在职' 
-            GROUP BY department 
-            ORDER BY count DESC
-        """)
-        
-        stats = {
-            'total_employees': total,
-            'active_employees': active,
-            'inactive_employees': total - active,
-            'department_stats': dept_stats
-        }
+        # 总数、在职数与各部门人数均来自触发器维护的汇总表
+        stats = response_cache.get_or_load(('stats',), fetch_statistics)
         
         return jsonify(APIResponse(
             True, 
@@ -264,6 +550,50 @@ def get_statistics():
     except Exception as e:
         return jsonify(APIResponse(False, f"统计失败: {str(e)}").to_dict()), 500
 
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """增量变更（长轮询）
+
+    since为上次返回的next_since；没有新变更时最多等待timeout秒（默认且最多
+    CHANGES_MAX_WAIT秒）。不带since时立即返回当前最新序号，用于首次全量加载
+    后建立同步起点。reset为真表示since已过期，需要重新全量加载。
+    等待中的请求独占一个工作线程，同时等待的请求超过CHANGES_MAX_WAITERS时
+    不再等待，立即返回当前结果。
+    """
+    try:
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify(APIResponse(True, "当前变更序号", {
+                'changes': [], 'next_since': latest_change_seq(), 'reset': False
+            }).to_dict())
+        
+        limit = request.args.get('limit', CHANGES_PAGE_SIZE, type=int)
+        wait = max(0.0, min(request.args.get('timeout', CHANGES_MAX_WAIT, type=float), CHANGES_MAX_WAIT))
+        waiting = wait > 0 and changes_waiters.acquire(blocking=False)
+        deadline = time.monotonic() + (wait if waiting else 0.0)
+        
+        # 只有数据版本变化时才查询变更日志，等待期间只读取PRAGMA data_version
+        checked_version = None
+        try:
+            while True:
+                version = get_data_version()
+                if version != checked_version:
+                    checked_version = version
+                    result = fetch_changes(since, limit)
+                    if result['changes'] or result['reset']:
+                        break
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(CHANGES_POLL_INTERVAL)
+        finally:
+            if waiting:
+                changes_waiters.release()
+        
+        return jsonify(APIResponse(True, f"共 {len(result['changes'])} 条变更", result).to_dict())
+        
+    except Exception as e:
+        return jsonify(APIResponse(False, f"查询变更失败: {str(e)}").to_dict()), 500
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify(APIResponse(False, "接口不存在").to_dict()), 404
@@ -280,13 +610,9 @@ def ai_chat():
         if not message:
             return jsonify(APIResponse(False, "消息内容不能为空").to_dict()), 400
         
-        # 使用asyncio运行异步函数
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            response = loop.run_until_complete(process_ai_request(message))
-        finally:
-            loop.close()
+        # 提交到常驻后台事件循环执行，超时则取消；
+        # 当前Flask工作线程在等待结果期间（最长AI_CHAT_TIMEOUT秒）仍被占用
+        response = background_loop.run(process_ai_request(message), timeout=AI_CHAT_TIMEOUT)
         
         return jsonify(APIResponse(
             True, 
@@ -294,6 +620,38 @@ def ai_chat():
             {'response': response}
         ).to_dict())
         
+    except TimeoutError:
+        return jsonify(APIResponse(False, "AI处理超时，请稍后重试").to_dict()), 504
+    except Exception as e:
+        return jsonify(APIResponse(False, f"AI处理失败: {str(e)}").to_dict()), 500
+
+@app.route('/api/ai/chat/batch', methods=['POST'])
+def ai_chat_batch():
+    """批量AI对话接口，按输入顺序返回每条消息的回复"""
+    try:
+        data = request.get_json()
+        messages = data.get('messages') if isinstance(data, dict) else None
+        if not isinstance(messages, list) or not messages:
+            return jsonify(APIResponse(False, "请提供消息列表messages").to_dict()), 400
+        if len(messages) > AI_BATCH_MAX_MESSAGES:
+            return jsonify(APIResponse(False, f"单次最多处理 {AI_BATCH_MAX_MESSAGES} 条消息").to_dict()), 400
+        if not all(isinstance(message, str) and message.strip() for message in messages):
+            return jsonify(APIResponse(False, "消息内容不能为空").to_dict()), 400
+        
+        messages = [message.strip() for message in messages]
+        responses = background_loop.run(process_ai_batch(messages), timeout=AI_BATCH_TIMEOUT)
+        
+        return jsonify(APIResponse(
+            True,
+            f"处理成功，共 {len(responses)} 条消息",
+            {'responses': [
+                {'message': message, 'response': response}
+                for message, response in zip(messages, responses)
+            ]}
+        ).to_dict())
+        
+    except TimeoutError:
+        return jsonify(APIResponse(False, "AI处理超时，请稍后重试").to_dict()), 504
     except Exception as e:
         return jsonify(APIResponse(False, f"AI处理失败: {str(e)}").to_dict()), 500
 
@@ -306,6 +664,7 @@ def internal_error(error):
     return jsonify(APIResponse(False, "服务器内部错误").to_dict()), 500
 
 if __name__ == '__main__':
+    init_database()
     print("启动HR系统后端服务...")
     print("API文档: http://localhost:8080/api/health")
     print("AI对话接口: http://localhost:8080/api/ai/chat")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+读穿透响应缓存模块
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# 默认缓存条目上限与过期时间（秒）
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 30.0
+
+class ResponseCache:
+    """带数据版本失效的LRU缓存
+
+    每个条目记录写入时的数据版本，读取时版本号变化（任何写入提交后）
+    即视为未命中；同时受条目数上限和TTL约束。
+    """
+    
+    def __init__(self, version_func, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.version_func = version_func
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'evictions': 0,
+        }
+    
+    def get_or_load(self, key, loader):
+        """命中时返回缓存值，否则调用loader加载并缓存
+
+        返回的对象会被多个请求共享，调用方不应修改。
+        """
+        version = self.version_func()
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_version, expires_at = entry
+                if entry_version == version and expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['stale'] += 1
+            self._stats['misses'] += 1
+        
+        # 加载前读取的版本号作为条目版本，加载期间发生的写入会让该条目在下次读取时失效
+        value = loader()
+        
+        with self._lock:
+            self._entries[key] = (value, version, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return value
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
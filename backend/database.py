@@ -6,17 +6,102 @@
 
 import sqlite3
 import os
-from datetime import datetime
+import argparse
+import asyncio
+import base64
+import functools
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from employee_schema import EMPLOYEE_FIELDS, FTS_MIN_TERM_LENGTH, SEARCH_LIMIT, fts_phrase
 
 # 数据库文件路径
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'hr_system.db')
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'hr_system.db')
+DB_PATH = DEFAULT_DB_PATH
+
+# 连接池配置
+POOL_SIZE = int(os.environ.get('HR_DB_POOL_SIZE', 8))
+POOL_TIMEOUT = float(os.environ.get('HR_DB_POOL_TIMEOUT', 5.0))
+# 空闲超过该秒数的连接在取出时做一次健康检查
+HEALTH_CHECK_INTERVAL = 30.0
+
+# 写队列配置：同一批次内的写操作合并为一个事务提交
+WRITE_BATCH_WINDOW = float(os.environ.get('HR_DB_WRITE_WINDOW', 0.002))
+WRITE_BATCH_MAX = 256
+# execute_write等待结果的最长秒数，超时抛出TimeoutError（写任务可能仍会执行）
+WRITE_TIMEOUT = float(os.environ.get('HR_DB_WRITE_TIMEOUT', 60.0))
+
+# 流式查询每次fetchmany的行数
+STREAM_BATCH_SIZE = 500
+
+# 分页查询单页最大行数
+MAX_PAGE_SIZE = 500
+
+# 工号序列：每个进程一次预留的工号数量
+ID_BLOCK_SIZE = int(os.environ.get('HR_ID_BLOCK_SIZE', 100))
 
-def init_database():
-    """初始化数据库，创建表结构"""
+# 允许通过update_employee_fields修改的字段
+EMPLOYEE_UPDATABLE_FIELDS = ('name', 'department', 'hr_account', 'status')
+
+# 变更日志：保留的最近变更条数（每新增CHANGELOG_TRIM_EVERY条裁剪一次），单次最多返回条数
+CHANGELOG_RETAIN = int(os.environ.get('HR_CHANGELOG_RETAIN', 10000))
+CHANGELOG_TRIM_EVERY = 500
+CHANGES_PAGE_SIZE = 1000
+# 变更日志记录的业务字段（updated_at每次更新都会变，不单独记录）
+CHANGELOG_COLUMNS = ('name', 'employee_id', 'department', 'hr_account', 'status')
+
+# 合成数据：常见姓氏及其相对频率（大致按人口占比）、名字用字、部门与状态的分布
+GENERATOR_SURNAMES = (
+    ('王', 71), ('李', 70), ('张', 66), ('刘', 54), ('陈', 45), ('杨', 31), ('黄', 24), ('赵', 20),
+    ('吴', 19), ('周', 18), ('徐', 15), ('孙', 15), ('马', 14), ('朱', 13), ('胡', 12), ('郭', 11),
+    ('何', 11), ('高', 10), ('林', 10), ('罗', 9), ('郑', 9), ('梁', 8), ('谢', 7), ('宋', 6),
+    ('唐', 6), ('许', 6), ('韩', 6), ('冯', 6), ('邓', 6), ('曹', 5), ('彭', 5), ('曾', 5),
+    ('肖', 5), ('田', 5), ('董', 5), ('袁', 4), ('潘', 4), ('于', 4), ('蒋', 4), ('蔡', 4),
+    ('欧阳', 1), ('司马', 1), ('上官', 1),
+)
+GENERATOR_GIVEN_CHARS = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰建国志红梅鹏飞宇浩然欣怡子涵雨轩晨阳佳琪思远文博嘉俊婷晓峰海燕丹'
+# 两字名所占比例
+GENERATOR_TWO_CHAR_RATIO = 0.7
+# 部门按人数从多到少排列，权重近似Zipf分布
+GENERATOR_DEPARTMENTS = (
+    ('技术部', 38), ('市场部', 17), ('销售部', 14), ('运营部', 9), ('客服部', 7), ('产品部', 5),
+    ('财务部', 3), ('人事部', 3), ('行政部', 2), ('法务部', 1), ('采购部', 1),
+)
+GENERATOR_STATUSES = (('在职', 82), ('离职', 18))
+# 没有HR账号的员工比例
+GENERATOR_NO_ACCOUNT_RATIO = 0.03
+# 入职时间分布在截至固定日期的若干年内；固定日期使相同种子在任何一天生成的数据都相同
+GENERATOR_YEARS = 8
+GENERATOR_END_DATE = datetime(2025, 1, 1)
+GENERATOR_BATCH_SIZE = 10000
+GENERATOR_CACHE_KB = 262144
+
+# 每个连接创建时执行一次的PRAGMA
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-16000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA busy_timeout=5000',
+)
+
+def init_database(verbose=True):
+    """初始化数据库，创建表结构
+
+    verbose为假时不输出任何信息（MCP服务器通过stdout通信，不能混入日志）。
+    """
     # 确保数据库目录存在
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     # 创建员工表
@@ -36,15 +121,137 @@ def init_database():
     # 创建索引
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_employee_name ON employee(name)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_employee_id ON employee(employee_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_department ON employee(department)')
+    # 列表按 created_at DESC, id DESC 键集分页，筛选列带上排序键以避免额外排序
+    cursor.execute('DROP INDEX IF EXISTS idx_department')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employee_created ON employee(created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_department_created ON employee(department, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_status_created ON employee(status, created_at, id)')
+    # 增量同步（如姓名词典）按 updated_at 拉取变更
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_employee_updated ON employee(updated_at)')
+    
+    # 工号序列表
+    ensure_id_sequence(conn)
+    
+    # employee表版本号，任何增删改都会递增，用于生成ETag
+    cursor.executescript('''
+        CREATE TABLE IF NOT EXISTS table_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO table_version (name, version) VALUES ('employee', 0);
+        CREATE TRIGGER IF NOT EXISTS employee_version_ai AFTER INSERT ON employee BEGIN
+            UPDATE table_version SET version = version + 1 WHERE name = 'employee';
+        END;
+        CREATE TRIGGER IF NOT EXISTS employee_version_au AFTER UPDATE ON employee BEGIN
+            UPDATE table_version SET version = version + 1 WHERE name = 'employee';
+        END;
+        CREATE TRIGGER IF NOT EXISTS employee_version_ad AFTER DELETE ON employee BEGIN
+            UPDATE table_version SET version = version + 1 WHERE name = 'employee';
+        END;
+    ''')
+    
+    # 数据库标识：建库时随机生成，删除重建后的数据库与旧库不会相同，
+    # 供员工目录快照等派生文件判断是否属于当前数据库
+    cursor.executescript('''
+        CREATE TABLE IF NOT EXISTS database_info (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        INSERT OR IGNORE INTO database_info (name, value) VALUES ('identity', lower(hex(randomblob(16))));
+    ''')
+    
+    # 变更日志，由触发器写入；seq单调递增且不复用，供增量同步使用
+    create_changelog(cursor)
+    
+    # 部门统计汇总表，由触发器增量维护
+    stats_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'department_stats'"
+    ).fetchone()
+    cursor.executescript('''
+        CREATE TABLE IF NOT EXISTS department_stats (
+            department TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (department, status)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS department_stats_ai AFTER INSERT ON employee BEGIN
+            INSERT INTO department_stats (department, status, count)
+            VALUES (new.department, COALESCE(new.status, ''), 1)
+            ON CONFLICT(department, status) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS department_stats_ad AFTER DELETE ON employee BEGIN
+            UPDATE department_stats SET count = count - 1
+            WHERE department = old.department AND status = COALESCE(old.status, '');
+            DELETE FROM department_stats
+            WHERE department = old.department AND status = COALESCE(old.status, '') AND count <= 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS department_stats_au AFTER UPDATE OF department, status ON employee
+        WHEN old.department IS NOT new.department OR old.status IS NOT new.status BEGIN
+            UPDATE department_stats SET count = count - 1
+            WHERE department = old.department AND status = COALESCE(old.status, '');
+            DELETE FROM department_stats
+            WHERE department = old.department AND status = COALESCE(old.status, '') AND count <= 0;
+            INSERT INTO department_stats (department, status, count)
+            VALUES (new.department, COALESCE(new.status, ''), 1)
+            ON CONFLICT(department, status) DO UPDATE SET count = count + 1;
+        END;
+    ''')
+    if not stats_exists:
+        rebuild_department_stats(conn)
+    
+    # 姓名子串搜索使用FTS5 trigram影子索引，由触发器与employee表保持同步
+    fts_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'employee_name_fts'"
+    ).fetchone()
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS employee_name_fts USING fts5(
+                name, content='employee', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS employee_name_fts_ai AFTER INSERT ON employee BEGIN
+                INSERT INTO employee_name_fts(rowid, name) VALUES (new.id, new.name);
+            END;
+            CREATE TRIGGER IF NOT EXISTS employee_name_fts_ad AFTER DELETE ON employee BEGIN
+                INSERT INTO employee_name_fts(employee_name_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            END;
+            CREATE TRIGGER IF NOT EXISTS employee_name_fts_au AFTER UPDATE OF name ON employee BEGIN
+                INSERT INTO employee_name_fts(employee_name_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO employee_name_fts(rowid, name) VALUES (new.id, new.name);
+            END;
+        ''')
+        if not fts_exists:
+            cursor.execute("INSERT INTO employee_name_fts(employee_name_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        if verbose:
+            print(f"当前SQLite不支持FTS5 trigram，姓名搜索将使用LIKE扫描: {e}")
     
     conn.commit()
     conn.close()
-    print(f"数据库初始化完成: {DB_PATH}")
+    _fts_available.pop(DB_PATH, None)
+    _initialized_paths.add(DB_PATH)
+    if verbose:
+        print(f"数据库初始化完成: {DB_PATH}")
+
+_initialized_paths = set()
+_initialized_lock = threading.Lock()
+
+def ensure_database():
+    """保证当前数据库已执行过init_database，每个进程每个数据库只执行一次
+
+    服务不经由 __main__ 启动时（如WSGI服务器、simple_app.py），汇总表、版本号表、
+    工号序列等由init_database创建的结构可能还不存在；init_database是幂等的。
+    """
+    if DB_PATH in _initialized_paths:
+        return
+    with _initialized_lock:
+        if DB_PATH not in _initialized_paths:
+            init_database(verbose=False)
 
 def insert_sample_data():
     """插入示例数据"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     # 检查是否已有数据
@@ -64,6 +271,7 @@ def insert_sample_data():
             INSERT INTO employee (name, employee_id, department, hr_account, status)
             VALUES (?, ?, ?, ?, ?)
         ''', sample_employees)
+        advance_id_sequence(conn, [employee[1] for employee in sample_employees])
         
         conn.commit()
         print(f"插入了 {len(sample_employees)} 条示例数据")
@@ -72,34 +280,1210 @@ def insert_sample_data():
     
     conn.close()
 
-def get_connection():
-    """获取数据库连接"""
-    return sqlite3.connect(DB_PATH)
+def _generated_batch(rng, start_num, count, position, total, span_end):
+    """生成一批员工元组 (姓名, 工号, 部门, HR账号, 状态, 创建时间, 更新时间)
 
-def execute_query(query, params=None):
-    """执行查询语句"""
+    position为本批第一行在全部total行中的序号，用于把创建时间按工号顺序铺开。
+    """
+    surnames, surname_weights = zip(*GENERATOR_SURNAMES)
+    departments, department_weights = zip(*GENERATOR_DEPARTMENTS)
+    statuses, status_weights = zip(*GENERATOR_STATUSES)
+    chars = GENERATOR_GIVEN_CHARS
+    span_seconds = GENERATOR_YEARS * 365 * 86400
+    span_start = span_end - timedelta(seconds=span_seconds)
+    
+    batch_surnames = rng.choices(surnames, surname_weights, k=count)
+    batch_departments = rng.choices(departments, department_weights, k=count)
+    batch_statuses = rng.choices(statuses, status_weights, k=count)
+    rows = []
+    for offset in range(count):
+        num = start_num + offset
+        given = rng.choice(chars)
+        if rng.random() < GENERATOR_TWO_CHAR_RATIO:
+            given += rng.choice(chars)
+        # 创建时间随工号递增并带少量抖动；多数员工创建后很快更新过，少数很久后才更新
+        created = span_start + timedelta(seconds=span_seconds * (position + offset) // total + rng.randrange(3600))
+        updated = created + timedelta(seconds=int(rng.random() ** 3 * (span_end - created).total_seconds()))
+        hr_account = None if rng.random() < GENERATOR_NO_ACCOUNT_RATIO else f"emp{num}@company.com"
+        rows.append((batch_surnames[offset] + given, format_employee_id(num), batch_departments[offset],
+                     hr_account, batch_statuses[offset],
+                     created.strftime('%Y-%m-%d %H:%M:%S'), updated.strftime('%Y-%m-%d %H:%M:%S')))
+    return rows
+
+def generate_employees(count, seed=0, batch_size=GENERATOR_BATCH_SIZE, verbose=True):
+    """向数据库追加count名合成员工，用于在本地复现生产规模的性能问题
+
+    姓名按常见姓氏频率生成，部门分布倾斜，状态混合，创建/更新时间分布在
+    GENERATOR_END_DATE之前的GENERATOR_YEARS年内；相同的种子和起始数据得到相同的结果。
+    不允许写入仓库自带的默认数据库。
+
+    为了批量写入的速度，插入期间临时删除employee表上的触发器，插入完成后
+    重建部门统计和姓名索引、递增表版本号，再由init_database恢复触发器。
+    这些行不写入变更日志，全部在一个事务内完成，应在服务停止时运行。
+    返回插入的条数。
+    """
+    if os.path.abspath(DB_PATH) == os.path.abspath(DEFAULT_DB_PATH):
+        raise ValueError("不能向默认数据库写入合成数据，请指定其他数据库文件")
+    init_database(verbose=False)
+    rng = random.Random(seed)
     conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        # 大事务不经过WAL，直接写数据库文件；索引维护使用更大的页缓存
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute(f'PRAGMA cache_size=-{GENERATOR_CACHE_KB}')
+        conn.execute('BEGIN IMMEDIATE')
+        triggers = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'employee'"
+        )]
+        for trigger in triggers:
+            conn.execute(f'DROP TRIGGER "{trigger}"')
+        
+        start_num = reserve_employee_ids(conn, count) if count else 0
+        span_end = GENERATOR_END_DATE
+        started = time.perf_counter()
+        for first in range(0, count, batch_size):
+            size = min(batch_size, count - first)
+            conn.executemany('''
+                INSERT INTO employee (name, employee_id, department, hr_account, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', _generated_batch(rng, start_num + first, size, first, count, span_end))
+            if verbose:
+                print(f"已生成 {first + size}/{count} 条 ({time.perf_counter() - started:.1f}s)")
+        
+        rebuild_department_stats(conn)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'employee_name_fts'").fetchone():
+            conn.execute("INSERT INTO employee_name_fts(employee_name_fts) VALUES ('rebuild')")
+        conn.execute("UPDATE table_version SET version = version + 1 WHERE name = 'employee'")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    # 恢复触发器（回滚时触发器未被删除，这里同样无副作用）
+    init_database(verbose=False)
+    conn = get_connection()
+    try:
+        conn.execute('PRAGMA optimize')
+    finally:
+        conn.close()
+    return count
+
+def create_changelog(cursor):
+    """创建变更日志表及其触发器
+
+    更新只在业务字段变化时记录，changed为逗号分隔的变化字段名；
+    每写入CHANGELOG_TRIM_EVERY条裁剪一次，只保留最近CHANGELOG_RETAIN条。
+    """
+    changed = ' || '.join(
+        f"CASE WHEN old.{column} IS NOT new.{column} THEN ',{column}' ELSE '' END"
+        for column in CHANGELOG_COLUMNS
+    )
+    cursor.executescript(f'''
+        CREATE TABLE IF NOT EXISTS employee_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            employee_row_id INTEGER NOT NULL,
+            changed TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TRIGGER IF NOT EXISTS employee_changes_ai AFTER INSERT ON employee BEGIN
+            INSERT INTO employee_changes (op, employee_row_id) VALUES ('insert', new.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS employee_changes_au AFTER UPDATE ON employee
+        WHEN ({changed}) != '' BEGIN
+            INSERT INTO employee_changes (op, employee_row_id, changed)
+            VALUES ('update', new.id, substr({changed}, 2));
+        END;
+        CREATE TRIGGER IF NOT EXISTS employee_changes_ad AFTER DELETE ON employee BEGIN
+            INSERT INTO employee_changes (op, employee_row_id) VALUES ('delete', old.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS employee_changes_trim AFTER INSERT ON employee_changes
+        WHEN new.seq % {CHANGELOG_TRIM_EVERY} = 0 BEGIN
+            DELETE FROM employee_changes WHERE seq <= new.seq - {CHANGELOG_RETAIN};
+        END;
+    ''')
+
+def compact_changes(conn, keep=CHANGELOG_RETAIN):
+    """写任务：只保留最近keep条变更日志（至少1条，以便判断游标是否过期），返回删除的条数"""
+    keep = max(1, keep)
+    return conn.execute(
+        "DELETE FROM employee_changes WHERE seq <= (SELECT COALESCE(MAX(seq), 0) FROM employee_changes) - ?",
+        (keep,)
+    ).rowcount
+
+def rebuild_department_stats(conn):
+    """根据employee表从头重新计算部门统计汇总表"""
+    conn.execute("DELETE FROM department_stats")
+    conn.execute('''
+        INSERT INTO department_stats (department, status, count)
+        SELECT department, COALESCE(status, ''), COUNT(*) FROM employee
+        GROUP BY department, COALESCE(status, '')
+    ''')
+
+def get_connection():
+    """获取一个独立的数据库连接（已应用PRAGMA，由调用方负责关闭）"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+class ConnectionPool:
+    """SQLite连接池
+
+    使用有界LIFO队列复用连接，连接在创建时统一应用PRAGMA；
+    空闲较久的连接在取出时做健康检查，失效则重建。
+    """
     
-    if params:
-        cursor.execute(query, params)
-    else:
-        cursor.execute(query)
+    def __init__(self, db_path, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self._stats = {
+            'acquired': 0,
+            'waited': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'health_check_failures': 0,
+            'timeouts': 0,
+        }
     
-    if query.strip().upper().startswith('SELECT'):
-        result = cursor.fetchall()
-        # 获取列名
-        columns = [description[0] for description in cursor.description]
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _is_healthy(self, conn):
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def acquire(self):
+        """取出一个连接，池满时最多等待timeout秒"""
+        if self._closed:
+            raise RuntimeError("连接池已关闭")
+        
+        start = time.perf_counter()
+        waited = False
+        try:
+            conn, released_at = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                released_at = time.monotonic()
+            else:
+                waited = True
+                try:
+                    conn, released_at = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats['timeouts'] += 1
+                    raise TimeoutError(f"等待数据库连接超时（{self.timeout}秒）")
+        
+        # 空闲较久的连接做健康检查
+        if time.monotonic() - released_at > HEALTH_CHECK_INTERVAL and not self._is_healthy(conn):
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+            conn = self._connect()
+        
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats['acquired'] += 1
+            if waited:
+                self._stats['waited'] += 1
+            self._stats['total_wait_ms'] += wait_ms
+            self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+        return conn
+    
+    def release(self, conn):
+        """归还连接，未结束的事务会被回滚"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        
+        if self._closed:
+            self._discard(conn)
+            return
+        
+        try:
+            self._idle.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            self._discard(conn)
+    
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+    
+    @contextmanager
+    def connection(self):
+        """以上下文管理器方式借用连接"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def close_all(self):
+        """关闭池中所有空闲连接"""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+    
+    def stats(self):
+        """获取连接池统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self.size
+            stats['created'] = self._created
+        stats['idle'] = self._idle.qsize()
+        stats['in_use'] = stats['created'] - stats['idle']
+        stats['avg_wait_ms'] = stats['total_wait_ms'] / stats['acquired'] if stats['acquired'] else 0.0
+        return stats
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """获取全局连接池（DB_PATH变化时重建）"""
+    global _pool
+    pool = _pool
+    if pool is None or pool.db_path != DB_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.db_path != DB_PATH:
+                if _pool is not None:
+                    _pool.close_all()
+                _pool = ConnectionPool(DB_PATH)
+            pool = _pool
+    return pool
+
+_version_conn = None
+_version_lock = threading.Lock()
+
+def get_data_version():
+    """返回数据库的数据版本号
+
+    使用一个专用连接读取 PRAGMA data_version：任何其他连接（包括写线程
+    和其他进程）提交写入后该值都会变化，可用于廉价地判断缓存是否失效。
+    """
+    global _version_conn
+    with _version_lock:
+        if _version_conn is None or _version_conn[0] != DB_PATH:
+            if _version_conn is not None:
+                _version_conn[1].close()
+            _version_conn = (DB_PATH, sqlite3.connect(DB_PATH, check_same_thread=False))
+        return _version_conn[1].execute('PRAGMA data_version').fetchone()[0]
+
+_employee_versions = {}
+
+def _employee_version_info():
+    """返回 (employee表版本号, 数据库标识)，数据版本未变化时复用上次读取的结果"""
+    data_version = get_data_version()
+    cached = _employee_versions.get(DB_PATH)
+    if cached is not None and cached[0] == data_version:
+        return cached[1]
+    row = execute_query("""
+        SELECT version, (SELECT value FROM database_info WHERE name = 'identity') AS identity
+        FROM table_version WHERE name = 'employee'
+    """)[0]
+    info = (row['version'], row['identity'])
+    _employee_versions[DB_PATH] = (data_version, info)
+    return info
+
+def get_employee_version():
+    """返回employee表的版本号（持久化，跨进程一致）
+
+    数据版本未变化时直接复用上次读取的结果，不访问数据库。
+    """
+    return _employee_version_info()[0]
+
+def get_database_identity():
+    """返回建库时生成的数据库标识（删除重建后会变化）"""
+    return _employee_version_info()[1]
+
+def pooled_connection():
+    """从全局连接池借用连接的上下文管理器"""
+    return get_pool().connection()
+
+def get_pool_stats():
+    """获取全局连接池统计信息"""
+    return get_pool().stats()
+
+class WriteQueue:
+    """单写线程队列
+
+    所有写操作都提交到专用写线程串行执行；在短时间窗口内到达的写操作
+    合并为一个事务提交（group commit），每个写操作使用独立的SAVEPOINT，
+    单个操作失败只回滚自身，不影响同批次的其他操作。
+    写线程因意外错误退出时，未完成和之后提交的任务都以异常结束，不会永久等待。
+    """
+    
+    def __init__(self, db_path, window=WRITE_BATCH_WINDOW, max_batch=WRITE_BATCH_MAX):
+        self.db_path = db_path
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {
+            'writes': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_batch': 0,
+        }
+        # 写线程意外退出的原因，非None时不再接受任务
+        self._crashed = None
+        self._thread = threading.Thread(target=self._run, name='hr-db-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, func, *args, **kwargs):
+        """提交写任务，返回Future
+
+        func以写连接为第一个参数被调用，不应自行commit/rollback，
+        其返回值作为Future的结果。
+        """
+        future = Future()
+        with self._lock:
+            if self._crashed is None:
+                self._queue.put((future, func, args, kwargs))
+                return future
+        future.set_exception(RuntimeError(f"写线程已退出: {self._crashed}"))
+        return future
+    
+    def in_writer_thread(self):
+        return threading.current_thread() is self._thread
+    
+    def is_alive(self):
+        return self._crashed is None and self._thread.is_alive()
+    
+    def stop(self):
+        """停止写线程（已提交的任务会先执行完）"""
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self):
+        conn = None
+        batch = []
+        try:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            
+            running = True
+            while running:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.window
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = self._queue.get(timeout=remaining)
+                        except queue.Empty:
+                            break
+                    if item is None:
+                        running = False
+                        break
+                    batch.append(item)
+                self._commit_batch(conn, batch)
+                batch = []
+        except BaseException as e:
+            self._fail_all(batch, e)
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    def _fail_all(self, batch, error):
+        """写线程意外退出：当前批次与队列中的任务全部以异常结束，之后不再接受任务"""
+        with self._lock:
+            self._crashed = error
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    batch.append(item)
+        print(f"数据库写线程异常退出: {error}", file=sys.stderr)
+        for future, _, _, _ in batch:
+            if not future.done():
+                future.set_exception(RuntimeError(f"写线程已退出: {error}"))
+    
+    def _commit_batch(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+        except sqlite3.Error as e:
+            for future, _, _, _ in batch:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            return
+        
+        # SQLite在SQLITE_FULL、IOERR等错误后可能已自行回滚整个事务
+        aborted = None
+        for future, func, args, kwargs in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            if aborted is not None:
+                outcomes.append((future, None, aborted))
+                continue
+            conn.execute('SAVEPOINT write_item')
+            try:
+                result = func(conn, *args, **kwargs)
+                conn.execute('RELEASE write_item')
+                outcomes.append((future, result, None))
+            except Exception as e:
+                outcomes.append((future, None, e))
+                try:
+                    conn.execute('ROLLBACK TO write_item')
+                    conn.execute('RELEASE write_item')
+                except sqlite3.Error:
+                    pass
+                if not conn.in_transaction:
+                    aborted = sqlite3.OperationalError(f"写事务已被回滚: {e}")
+        
+        if aborted is not None:
+            # 已成功的操作随事务一起丢失
+            outcomes = [(future, None, error or aborted) for future, _, error in outcomes]
+        else:
+            try:
+                conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    try:
+                        conn.execute('ROLLBACK')
+                    except sqlite3.Error:
+                        pass
+                outcomes = [(future, None, e) for future, _, _ in outcomes]
+        
+        failed = 0
+        for future, result, error in outcomes:
+            if error is not None:
+                failed += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['writes'] += len(outcomes)
+            self._stats['failed'] += failed
+            self._stats['max_batch'] = max(self._stats['max_batch'], len(outcomes))
+    
+    def stats(self):
+        """获取写队列统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        stats['avg_batch'] = stats['writes'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    """获取全局写队列（DB_PATH变化或写线程已退出时重建）"""
+    global _writer
+    writer = _writer
+    if writer is None or writer.db_path != DB_PATH or not writer.is_alive():
+        with _writer_lock:
+            if _writer is None or _writer.db_path != DB_PATH or not _writer.is_alive():
+                if _writer is not None:
+                    _writer.stop()
+                _writer = WriteQueue(DB_PATH)
+            writer = _writer
+    return writer
+
+def submit_write(func, *args, **kwargs):
+    """提交写任务到写线程，返回concurrent.futures.Future
+
+    协程中可用 ``await asyncio.wrap_future(submit_write(...))`` 等待结果。
+    """
+    return get_writer().submit(func, *args, **kwargs)
+
+def execute_write(func, *args, **kwargs):
+    """提交写任务并阻塞等待结果（最多WRITE_TIMEOUT秒）"""
+    writer = get_writer()
+    if writer.in_writer_thread():
+        raise RuntimeError("不能在写线程内部提交写任务")
+    return writer.submit(func, *args, **kwargs).result(timeout=WRITE_TIMEOUT)
+
+def get_writer_stats():
+    """获取全局写队列统计信息"""
+    return get_writer().stats()
+
+class AsyncDB:
+    """异步数据库接口
+
+    读操作在专用线程池中执行（每个工作线程从连接池借用连接），写操作
+    提交到写队列，协程等待期间不阻塞事件循环，多个请求可以真正并发。
+    """
+    
+    def __init__(self, workers=POOL_SIZE):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='hr-db-reader'
+                    )
+        return self._executor
+    
+    async def call(self, func, *args, **kwargs):
+        """在数据库线程池中执行阻塞的读函数"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+    
+    async def fetch(self, query, params=None):
+        """执行SELECT并返回字典列表"""
+        return await self.call(execute_query, query, params)
+    
+    async def fetch_one(self, query, params=None):
+        """执行SELECT并返回第一行，无结果时返回None"""
+        rows = await self.fetch(query, params)
+        return rows[0] if rows else None
+    
+    async def execute(self, query, params=None):
+        """经由写队列执行写语句，返回影响行数"""
+        return await self.write(_execute_statement, query, params)
+    
+    async def write(self, func, *args, **kwargs):
+        """经由写队列执行写任务"""
+        return await asyncio.wrap_future(submit_write(func, *args, **kwargs))
+    
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+# 全局异步数据库接口
+async_db = AsyncDB()
+
+def rows_to_dicts(cursor):
+    """将游标结果转换为字典列表"""
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def _execute_statement(conn, query, params):
+    return conn.execute(query, params or ()).rowcount
+
+def insert_employee(conn, name, employee_id, department, hr_account, status='在职'):
+    """写任务：插入员工并返回新记录，工号已存在时返回None"""
+    if conn.execute("SELECT 1 FROM employee WHERE employee_id = ?", (employee_id,)).fetchone():
+        return None
+    cursor = conn.execute("""
+        INSERT INTO employee (name, employee_id, department, hr_account, status)
+        VALUES (?, ?, ?, ?, ?)
+    """, (name, employee_id, department, hr_account, status))
+    advance_id_sequence(conn, [employee_id])
+    return rows_to_dicts(conn.execute("SELECT * FROM employee WHERE id = ?", (cursor.lastrowid,)))[0]
+
+def ensure_id_sequence(conn):
+    """创建工号序列表，并保证序列值不小于已有的最大工号"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS id_sequence (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO id_sequence (name, value)
+        SELECT 'employee', COALESCE(MAX(CAST(SUBSTR(employee_id, 4) AS INTEGER)), 0)
+        FROM employee WHERE employee_id LIKE 'EMP%'
+        ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)
+    ''')
+
+def reserve_employee_ids(conn, count):
+    """写任务：从序列表原子地预留count个工号，返回第一个工号的数字
+
+    序列表由init_database创建并按已有工号初始化，这里只做一次更新。
+    """
+    value = conn.execute(
+        "UPDATE id_sequence SET value = value + ? WHERE name = 'employee' RETURNING value", (count,)
+    ).fetchone()[0]
+    return value - count + 1
+
+def format_employee_id(num):
+    return f"EMP{num:03d}"
+
+def employee_id_number(employee_id):
+    """EMP+数字格式工号的数字部分，其他格式返回None"""
+    if employee_id and employee_id.startswith('EMP') and employee_id[3:].isdigit():
+        return int(employee_id[3:])
+    return None
+
+def advance_id_sequence(conn, employee_ids):
+    """写任务的一部分：显式指定的工号写入后，把序列推进到不小于这些工号
+
+    同时让本进程的工号分配器跳过已被占用的号码，之后自动分配的工号不会与之冲突。
+    """
+    numbers = [num for num in map(employee_id_number, employee_ids) if num is not None]
+    if not numbers:
+        return
+    highest = max(numbers)
+    conn.execute("UPDATE id_sequence SET value = MAX(value, ?) WHERE name = 'employee'", (highest,))
+    allocator = _id_allocator
+    if allocator is not None and allocator.db_path == DB_PATH:
+        allocator.skip_through(highest)
+
+def allocate_employee_ids(conn, count):
+    """在写事务内按块分配count个连续的新工号"""
+    start = reserve_employee_ids(conn, count)
+    return [format_employee_id(num) for num in range(start, start + count)]
+
+class EmployeeIdAllocator:
+    """进程内工号分配器
+
+    每次从序列表预留一整块工号（经由写队列提交），块内的工号直接在内存中
+    分配，无需额外查询；进程退出时未用完的工号会被跳过，不会重复。
+    """
+    
+    def __init__(self, db_path, block_size=ID_BLOCK_SIZE):
+        self.db_path = db_path
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 1
+        self._limit = 0
+    
+    def next_id(self):
+        """分配一个新工号（不能在写线程内调用）
+
+        预留新块时不持有锁，写线程中的 skip_through 因此不会与之互相等待；
+        并发预留多出来的块直接丢弃。
+        """
+        while True:
+            with self._lock:
+                if self._next <= self._limit:
+                    num = self._next
+                    self._next += 1
+                    return format_employee_id(num)
+            start = execute_write(reserve_employee_ids, self.block_size)
+            with self._lock:
+                if self._next > self._limit:
+                    self._next = start
+                    self._limit = start + self.block_size - 1
+    
+    def skip_through(self, num):
+        """跳过当前块中不大于num的工号（这些号码已被显式使用）"""
+        with self._lock:
+            if self._next <= num <= self._limit:
+                self._next = num + 1
+
+_id_allocator = None
+_id_allocator_lock = threading.Lock()
+
+def next_employee_id():
+    """分配一个新工号，所有新增员工的入口共用"""
+    global _id_allocator
+    with _id_allocator_lock:
+        if _id_allocator is None or _id_allocator.db_path != DB_PATH:
+            _id_allocator = EmployeeIdAllocator(DB_PATH)
+        allocator = _id_allocator
+    return allocator.next_id()
+
+def bulk_insert_employees(conn, rows):
+    """写任务：批量插入员工
+
+    rows为 (行号, 姓名, 工号或None, 部门, HR账号, 状态) 元组列表，工号为None的行
+    按块分配新工号（跳过本块中显式提供的工号）。已存在或重复的工号记为该行的错误，
+    不影响其他行；整块插入违反约束时改为逐行插入，只有出错的行被记为错误。
+    返回 (插入条数, 错误列表)。
+    """
+    errors = []
+    provided_ids = [row[2] for row in rows if row[2]]
+    existing = set()
+    for start in range(0, len(provided_ids), 500):
+        chunk = provided_ids[start:start + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        existing.update(r[0] for r in conn.execute(
+            f"SELECT employee_id FROM employee WHERE employee_id IN ({placeholders})", chunk
+        ))
+    
+    # 先推进序列越过本块显式提供的工号，新分配的工号自然不会与之冲突
+    advance_id_sequence(conn, [employee_id for employee_id in provided_ids if employee_id not in existing])
+    taken = set(provided_ids)
+    needed = sum(1 for row in rows if not row[2])
+    new_ids = []
+    while len(new_ids) < needed:
+        new_ids.extend(employee_id for employee_id in allocate_employee_ids(conn, needed - len(new_ids))
+                       if employee_id not in taken)
+    new_ids = iter(new_ids)
+    
+    values = []
+    for line_no, name, employee_id, department, hr_account, status in rows:
+        if not employee_id:
+            employee_id = next(new_ids)
+        elif employee_id in existing:
+            errors.append({'line': line_no, 'errors': [f"工号 {employee_id} 已存在"]})
+            continue
+        existing.add(employee_id)
+        values.append((line_no, name, employee_id, department, hr_account, status))
+    
+    insert = """
+        INSERT INTO employee (name, employee_id, department, hr_account, status)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    conn.execute('SAVEPOINT bulk_chunk')
+    try:
+        conn.executemany(insert, [value[1:] for value in values])
+        conn.execute('RELEASE bulk_chunk')
+        return len(values), errors
+    except sqlite3.IntegrityError:
+        conn.execute('ROLLBACK TO bulk_chunk')
+        conn.execute('RELEASE bulk_chunk')
+    
+    inserted = 0
+    for line_no, *value in values:
+        conn.execute('SAVEPOINT bulk_row')
+        try:
+            conn.execute(insert, value)
+            inserted += 1
+        except sqlite3.IntegrityError as e:
+            conn.execute('ROLLBACK TO bulk_row')
+            errors.append({'line': line_no, 'errors': [f"写入失败: {e}"]})
+        conn.execute('RELEASE bulk_row')
+    errors.sort(key=lambda item: item['line'])
+    return inserted, errors
+
+def update_employee_fields(conn, emp_id, fields):
+    """写任务：更新员工字段并返回更新后的记录，员工不存在时返回None"""
+    update_fields = []
+    params = []
+    for field in EMPLOYEE_UPDATABLE_FIELDS:
+        if field in fields:
+            update_fields.append(f"{field} = ?")
+            params.append(fields[field])
+    
+    update_fields.append("updated_at = CURRENT_TIMESTAMP")
+    params.append(emp_id)
+    
+    cursor = conn.execute(f"UPDATE employee SET {', '.join(update_fields)} WHERE id = ?", params)
+    if cursor.rowcount == 0:
+        return None
+    return rows_to_dicts(conn.execute("SELECT * FROM employee WHERE id = ?", (emp_id,)))[0]
+
+def execute_query(query, params=None):
+    """执行查询语句（写语句经由写队列执行）"""
+    if not query.strip().upper().startswith('SELECT'):
+        return execute_write(_execute_statement, query, params)
+    
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        
         # 转换为字典列表
-        result = [dict(zip(columns, row)) for row in result]
-    else:
-        conn.commit()
-        result = cursor.rowcount
+        result = rows_to_dicts(cursor)
     
-    conn.close()
     return result
 
-if __name__ == '__main__':
+def stream_query(query, params=None, batch_size=STREAM_BATCH_SIZE):
+    """流式执行查询，按批产出字典列表
+
+    使用fetchmany逐批读取，内存占用与结果集大小无关；
+    连接在生成器耗尽或被关闭时归还连接池。
+    """
+    with pooled_connection() as conn:
+        cursor = conn.execute(query, params or ())
+        columns = [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [dict(zip(columns, row)) for row in rows]
+
+_fts_available = {}
+
+def name_fts_available():
+    """当前数据库是否已建立姓名trigram索引"""
+    available = _fts_available.get(DB_PATH)
+    if available is None:
+        available = bool(execute_query(
+            "SELECT name FROM sqlite_master WHERE name = 'employee_name_fts'"
+        ))
+        _fts_available[DB_PATH] = available
+    return available
+
+def like_pattern(term):
+    """将检索词转为按字面子串匹配的LIKE模式（配合 ESCAPE '\\' 使用）"""
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def has_ascii_letters(term):
+    """检索词是否含ASCII字母：LIKE对ASCII字母不区分大小写，此时不能用二进制比较的姓名索引"""
+    return any('a' <= ch <= 'z' or 'A' <= ch <= 'Z' for ch in term)
+
+def select_list(fields=None, table=None):
+    """生成SELECT列清单；fields须已经过parse_fields校验，None表示全部列"""
+    prefix = f"{table}." if table else ''
+    if not fields:
+        return prefix + '*'
+    return ', '.join(prefix + field for field in fields)
+
+def search_employees(term, limit=SEARCH_LIMIT, offset=0, fields=None):
+    """按姓名搜索员工，结果按 精确匹配 > 前缀匹配 > 子串匹配 排序
+
+    与原来的 name LIKE '%检索词%' 一样对ASCII字母不区分大小写。
+    检索词不少于3个字符时走trigram索引；其余含ASCII字母的检索词直接用
+    LIKE扫描；不含ASCII字母的检索词（大多数两字中文姓名）先用姓名索引取
+    精确和前缀匹配，不足limit时再按姓名顺序扫描子串匹配。
+    offset为跳过的结果条数，用于分页；fields为只查询的列。
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    offset = max(0, offset)
+    
+    rank = "CASE WHEN lower(e.name) = lower(?) THEN 0 WHEN lower(substr(e.name, 1, ?)) = lower(?) THEN 1 ELSE 2 END"
+    if len(term) >= FTS_MIN_TERM_LENGTH and name_fts_available():
+        return execute_query(f"""
+            SELECT {select_list(fields, 'e')} FROM employee_name_fts f JOIN employee e ON e.id = f.rowid
+            WHERE employee_name_fts MATCH ?
+            ORDER BY {rank}, e.name, e.id
+            LIMIT ? OFFSET ?
+        """, (fts_phrase(term), term, len(term), term, limit, offset))
+    
+    if has_ascii_letters(term):
+        return execute_query(f"""
+            SELECT {select_list(fields, 'e')} FROM employee e WHERE e.name LIKE ? ESCAPE '\\'
+            ORDER BY {rank}, e.name, e.id
+            LIMIT ? OFFSET ?
+        """, (like_pattern(term), term, len(term), term, limit, offset))
+    
+    # 精确和前缀匹配：姓名索引范围扫描
+    prefix_range = (term, term + '\U0010ffff')
+    employees = execute_query(f"""
+        SELECT {select_list(fields)} FROM employee WHERE name >= ? AND name < ?
+        ORDER BY name != ?, name, id LIMIT ? OFFSET ?
+    """, prefix_range + (term, limit, offset))
+    
+    if len(employees) < limit:
+        # 子串匹配的偏移量要扣除排在前面的前缀匹配条数
+        substring_offset = 0
+        if offset:
+            prefix_count = execute_query(
+                "SELECT COUNT(*) AS count FROM employee WHERE name >= ? AND name < ?", prefix_range
+            )[0]['count']
+            substring_offset = max(0, offset - prefix_count)
+        employees += execute_query(f"""
+            SELECT {select_list(fields)} FROM employee
+            WHERE name LIKE ? ESCAPE '\\' AND NOT (name >= ? AND name < ?)
+            ORDER BY name, id LIMIT ? OFFSET ?
+        """, (like_pattern(term),) + prefix_range + (limit - len(employees), substring_offset))
+    return employees
+
+def count_search_matches(term):
+    """统计姓名包含检索词的员工数"""
+    if len(term) >= FTS_MIN_TERM_LENGTH and name_fts_available():
+        return execute_query(
+            "SELECT COUNT(*) AS count FROM employee_name_fts WHERE employee_name_fts MATCH ?",
+            (fts_phrase(term),)
+        )[0]['count']
+    return execute_query(
+        "SELECT COUNT(*) AS count FROM employee WHERE name LIKE ? ESCAPE '\\'", (like_pattern(term),)
+    )[0]['count']
+
+def fetch_search_page(term, limit=SEARCH_LIMIT, cursor=None, fields=None):
+    """分页搜索员工，返回 {'employees', 'next_cursor'}
+
+    搜索结果按相关度排序而非时间顺序，游标记录的是已返回的条数。
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    employees = search_employees(term, limit + 1, offset, fields)
+    next_cursor = None
+    if len(employees) > limit:
+        employees = employees[:limit]
+        next_cursor = encode_offset_cursor(offset + limit)
+    return {'employees': employees, 'next_cursor': next_cursor}
+
+def fetch_statistics():
+    """从部门统计汇总表读取员工统计信息"""
+    rows = execute_query("SELECT department, status, count FROM department_stats ORDER BY count DESC, department")
+    total = sum(row['count'] for row in rows)
+    dept_stats = [{'department': row['department'], 'count': row['count']}
+                  for row in rows if row['status'] == '在职']
+    active = sum(row['count'] for row in dept_stats)
+    return {
+        'total_employees': total,
+        'active_employees': active,
+        'inactive_employees': total - active,
+        'department_stats': dept_stats
+    }
+
+def fetch_departments():
+    """从部门统计汇总表读取有在职员工的部门列表"""
+    departments = execute_query(
+        "SELECT department FROM department_stats WHERE status = '在职' AND count > 0 ORDER BY department"
+    )
+    return [dept['department'] for dept in departments]
+
+def latest_change_seq():
+    """当前最新的变更序号（没有任何变更时为0）"""
+    return execute_query(
+        "SELECT COALESCE(MAX(seq), 0) AS seq FROM employee_changes"
+    )[0]['seq']
+
+def _merge_change(delta, op, changed):
+    """把同一员工的后续变更合并进已有的增量"""
+    if op == 'delete':
+        delta.update(op='delete', changed=None)
+    elif op == 'insert':
+        delta.update(op='insert', changed=None)
+    elif delta['op'] == 'update':
+        delta['changed'] = list(dict.fromkeys(delta['changed'] + changed))
+
+def fetch_changes(since, limit=CHANGES_PAGE_SIZE):
+    """读取seq大于since的变更，按员工合并为增量
+
+    返回 {'changes', 'next_since', 'reset'}：
+    - 同一员工的多次变更合并为一条，seq取最后一次；新增给出整行，更新只给出
+      变化的字段，删除只给出id
+    - since早于已裁剪掉的日志时reset为真，调用方需要全量重新加载
+    """
+    limit = max(1, min(limit, CHANGES_PAGE_SIZE))
+    with pooled_connection() as conn:
+        conn.execute('BEGIN')
+        try:
+            oldest, latest = conn.execute(
+                "SELECT MIN(seq), COALESCE(MAX(seq), 0) FROM employee_changes"
+            ).fetchone()
+            if since > latest or (oldest is not None and since < oldest - 1):
+                # 游标来自别的数据库或已被裁剪
+                return {'changes': [], 'next_since': latest, 'reset': True}
+            
+            rows = conn.execute(
+                "SELECT seq, op, employee_row_id, changed FROM employee_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (since, limit)
+            ).fetchall()
+            
+            deltas = {}
+            for seq, op, row_id, changed in rows:
+                columns = changed.split(',') if changed else []
+                delta = deltas.pop(row_id, None)
+                if delta is None:
+                    delta = {'op': op, 'id': row_id, 'changed': columns if op == 'update' else None}
+                else:
+                    _merge_change(delta, op, columns)
+                delta['seq'] = seq
+                # 重新插入，使结果按最后一次变更的seq排序
+                deltas[row_id] = delta
+            
+            live_ids = [row_id for row_id, delta in deltas.items() if delta['op'] != 'delete']
+            current = {}
+            for start in range(0, len(live_ids), 500):
+                chunk = live_ids[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                for employee in rows_to_dicts(conn.execute(
+                    f"SELECT * FROM employee WHERE id IN ({placeholders})", chunk
+                )):
+                    current[employee['id']] = employee
+        finally:
+            conn.execute('COMMIT')
+    
+    changes = []
+    for row_id, delta in deltas.items():
+        employee = current.get(row_id)
+        if delta['op'] != 'delete' and employee is None:
+            delta.update(op='delete', changed=None)
+        if delta['op'] == 'insert':
+            delta['employee'] = employee
+        elif delta['op'] == 'update':
+            delta['employee'] = {column: employee[column] for column in delta['changed'] + ['updated_at']}
+        if delta['changed'] is None:
+            del delta['changed']
+        changes.append(delta)
+    
+    return {
+        'changes': changes,
+        'next_since': rows[-1][0] if rows else since,
+        'reset': False
+    }
+
+def encode_cursor(created_at, row_id):
+    """将分页位置编码为不透明游标"""
+    raw = json.dumps([created_at, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """解析分页游标，返回 (created_at, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, row_id = json.loads(raw)
+        # 游标来自客户端，值的类型必须与 (created_at, id) 一致才能用作查询参数
+        if not isinstance(created_at, str) or not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValueError(token)
+        return created_at, row_id
+    except (ValueError, TypeError) as e:
+        raise ValueError("无效的分页游标") from e
+
+def encode_offset_cursor(offset):
+    """将结果偏移量编码为不透明游标"""
+    return base64.urlsafe_b64encode(json.dumps({'offset': offset}).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_offset_cursor(token):
+    """解析偏移量游标"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        return max(0, int(json.loads(raw)['offset']))
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("无效的分页游标") from e
+
+def parse_fields(fields):
+    """解析字段投影参数（逗号分隔的字符串或列表），未指定时返回None表示全部字段"""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    fields = tuple(dict.fromkeys(field.strip() for field in fields if field and field.strip()))
+    unknown = [field for field in fields if field not in EMPLOYEE_FIELDS]
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(unknown)}，可选字段: {', '.join(EMPLOYEE_FIELDS)}")
+    return fields or None
+
+def project_rows(rows, fields):
+    """只保留指定字段；fields为None时原样返回"""
+    if fields is None:
+        return rows
+    return [{field: row[field] for field in fields} for row in rows]
+
+def summarize_employees(where_clause='1=1', params=None):
+    """统计满足条件的员工数，并按部门和状态分组计数"""
+    rows = execute_query(f"""
+        SELECT department, status, COUNT(*) AS count FROM employee
+        WHERE {where_clause} GROUP BY department, status
+    """, params)
+    by_department = {}
+    by_status = {}
+    for row in rows:
+        by_department[row['department']] = by_department.get(row['department'], 0) + row['count']
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['count']
+    return {
+        'total': sum(row['count'] for row in rows),
+        'by_department': dict(sorted(by_department.items(), key=lambda item: (-item[1], item[0]))),
+        'by_status': by_status
+    }
+
+def fetch_employee_page(where_clause='1=1', params=None, limit=None, cursor=None, include_total=False,
+                        fields=None):
+    """按 created_at DESC, id DESC 键集分页查询员工
+
+    limit为None时返回全部匹配行；否则最多返回limit行（不超过MAX_PAGE_SIZE），
+    还有后续数据时next_cursor为下一页游标。include_total为真时附带总数。
+    fields为只查询的列（经parse_fields校验）；分页时额外查询游标所需的列。
+    """
+    params = list(params or [])
+    conditions = [where_clause]
+    page_params = list(params)
+    
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        conditions.append("(created_at, id) < (?, ?)")
+        page_params.extend([created_at, row_id])
+    
+    query_fields = fields
+    if fields and limit is not None:
+        query_fields = tuple(dict.fromkeys(fields + ('created_at', 'id')))
+    
+    sql = (f"SELECT {select_list(query_fields)} FROM employee WHERE {' AND '.join(conditions)} "
+           f"ORDER BY created_at DESC, id DESC")
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        sql += " LIMIT ?"
+        page_params.append(limit + 1)
+    
+    employees = execute_query(sql, page_params)
+    next_cursor = None
+    if limit is not None and len(employees) > limit:
+        employees = employees[:limit]
+        next_cursor = encode_cursor(employees[-1]['created_at'], employees[-1]['id'])
+    if query_fields != fields:
+        employees = project_rows(employees, fields)
+    
+    page = {'employees': employees, 'next_cursor': next_cursor}
+    if include_total:
+        page['total'] = execute_query(
+            f"SELECT COUNT(*) AS count FROM employee WHERE {where_clause}", params
+        )[0]['count']
+    return page
+
+def main():
+    parser = argparse.ArgumentParser(description="HR系统数据库工具")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('init', help="初始化数据库并插入示例数据（默认）")
+    subparsers.add_parser('rebuild-stats', help="从employee表重新计算部门统计汇总表")
+    compact_parser = subparsers.add_parser('compact-changes', help="裁剪变更日志，只保留最近的记录")
+    compact_parser.add_argument('--keep', type=int, default=CHANGELOG_RETAIN, help="保留的变更条数")
+    generate_parser = subparsers.add_parser('generate', help="追加生成合成员工数据，用于性能测试")
+    generate_parser.add_argument('--rows', type=int, required=True, help="生成的员工数")
+    generate_parser.add_argument('--seed', type=int, default=0, help="随机种子，相同种子生成相同数据")
+    generate_parser.add_argument('--batch-size', type=int, default=GENERATOR_BATCH_SIZE, help="每批插入的行数")
+    generate_parser.add_argument('--db', required=True, help="目标数据库文件（不能是系统默认数据库）")
+    args = parser.parse_args()
+    
+    if args.command == 'generate':
+        global DB_PATH
+        if os.path.abspath(args.db) == os.path.abspath(DEFAULT_DB_PATH):
+            parser.error("--db 不能是系统默认数据库，请指定新的数据库文件")
+        DB_PATH = os.path.abspath(args.db)
+        started = time.perf_counter()
+        generate_employees(args.rows, args.seed, args.batch_size)
+        print(f"已向 {DB_PATH} 写入 {args.rows} 名合成员工，用时 {time.perf_counter() - started:.1f}s")
+        return
+    
+    if args.command == 'compact-changes':
+        init_database()
+        deleted = execute_write(compact_changes, args.keep)
+        print(f"已删除 {deleted} 条变更日志")
+        return
+    
+    if args.command == 'rebuild-stats':
+        init_database()
+        execute_write(rebuild_department_stats)
+        print("部门统计汇总表已重建")
+        return
+    
     # 初始化数据库
     init_database()
     # 插入示例数据
@@ -109,4 +1493,7 @@ if __name__ == '__main__':
     employees = execute_query('SELECT * FROM employee')
     print(f"\n当前员工数据：")
     for emp in employees:
-        print(f"- {emp['name']} ({emp['employee_id']}) - {emp['department']} - {emp['status']}")
\ No newline at end of file
+        print(f"- {emp['name']} ({emp['employee_id']}) - {emp['department']} - {emp['status']}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
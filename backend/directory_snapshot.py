@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+员工目录快照 - 把employee表导出为只读的定长记录文件，各进程内存映射后
+按 id / 工号 / 姓名前缀 二分查找，不经过SQL
+
+文件布局（小端）：
+    头部     魔数、数据库标识、代数（即导出时的employee表版本号）、记录数、记录长度、各字段宽度
+    记录区   按id升序排列的定长记录
+    姓名索引 按 (姓名, id) 排序的记录下标（uint32）
+    工号索引 按工号排序的记录下标（uint32）
+
+本模块不导入数据库模块，调用方把 database 模块（或同等接口的对象）传给
+EmployeeDirectory，因此后端和MCP服务器都可以使用。
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_MAGIC = b'HRDIR002'
+# 快照文件与数据库文件放在同一目录
+SNAPSHOT_SUFFIX = '-directory'
+# 发现快照过期后等待该秒数再重建，合并连续写入触发的重建
+REBUILD_DELAY = 0.05
+
+# 记录中的字符串字段，顺序即存储顺序
+SNAPSHOT_FIELDS = ('name', 'employee_id', 'department', 'hr_account', 'status', 'created_at', 'updated_at')
+# 数据库标识为32位十六进制字符串（database_info表中的identity）
+IDENTITY_SIZE = 32
+HEADER = struct.Struct(f'<8s{IDENTITY_SIZE}sQII{len(SNAPSHOT_FIELDS)}I')
+INDEX_ENTRY = struct.Struct('<I')
+# 记录开头：id 和 NULL 标记位
+RECORD_PREFIX = struct.Struct('<qB')
+
+def snapshot_path(db_path: str) -> str:
+    return db_path + SNAPSHOT_SUFFIX
+
+def _encode_column(values) -> List[bytes]:
+    return [b'' if value is None else (value if isinstance(value, str) else str(value)).encode('utf-8')
+            for value in values]
+
+def write_snapshot(path: str, rows: List[tuple], generation: int, identity: str):
+    """把按id升序排列的员工行 (id, *SNAPSHOT_FIELDS) 写成快照文件，identity为所属数据库的标识
+
+    先写临时文件再 os.replace 原子替换，读者要么看到旧文件要么看到完整的新文件。
+    多个进程同时重建时后写者覆盖先写者；即使较旧的快照覆盖了较新的，读者也会
+    因代数与数据库版本不符而退回SQL并重新安排重建，不会读到过期数据。
+    """
+    count = len(rows)
+    columns = list(zip(*rows)) or [()] * (len(SNAPSHOT_FIELDS) + 1)
+    ids = columns[0]
+
+    # 按列编码，宽度取该列最长值；NULL记在每条记录的标记位里
+    encoded = [_encode_column(column) for column in columns[1:]]
+    widths = [max(map(len, column), default=0) or 1 for column in encoded]
+    nulls = [0] * count
+    for position, column in enumerate(columns[1:]):
+        if None in column:
+            for index, value in enumerate(column):
+                if value is None:
+                    nulls[index] |= 1 << position
+
+    record = struct.Struct('<qB' + ''.join(f'{width}s' for width in widths))
+    body = bytearray(HEADER.size + count * (record.size + 2 * INDEX_ENTRY.size))
+    HEADER.pack_into(body, 0, SNAPSHOT_MAGIC, identity.encode('ascii'), generation, count, record.size, *widths)
+
+    offset = HEADER.size
+    pack_into = record.pack_into
+    for values in zip(ids, nulls, *encoded):
+        pack_into(body, offset, *values)
+        offset += record.size
+
+    for field in ('name', 'employee_id'):
+        column = encoded[SNAPSHOT_FIELDS.index(field)]
+        # 记录已按id排序，稳定排序后同名记录仍按id排列
+        order = sorted(range(count), key=column.__getitem__)
+        struct.pack_into(f'<{count}I', body, offset, *order)
+        offset += count * INDEX_ENTRY.size
+
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def read_generation(path: str, identity: str) -> int:
+    """读取快照文件头部的代数，文件不存在、损坏或属于其他数据库时返回-1"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return -1
+    if len(header) < HEADER.size or header[:8] != SNAPSHOT_MAGIC:
+        return -1
+    _, file_identity, generation = HEADER.unpack(header)[:3]
+    if file_identity.decode('ascii', 'replace') != identity:
+        return -1
+    return generation
+
+class DirectorySnapshot:
+    """一个已映射到内存的快照文件（只读、不可变）
+
+    查找直接在映射内存上二分，只在命中后解码该条记录。
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        magic, identity, self.generation, self.count, record_size, *widths = HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"不是员工目录快照文件: {path}")
+        self.identity = identity.decode('ascii', 'replace')
+        self._record = struct.Struct('<qB' + ''.join(f'{width}s' for width in widths))
+        if self._record.size != record_size:
+            raise ValueError(f"快照文件记录长度不一致: {path}")
+
+        # 每个字段在记录内的偏移和宽度
+        self._fields = {}
+        field_offset = RECORD_PREFIX.size
+        for field, width in zip(SNAPSHOT_FIELDS, widths):
+            self._fields[field] = (field_offset, width)
+            field_offset += width
+
+        self._records_at = HEADER.size
+        self._name_index_at = self._records_at + self.count * record_size
+        self._employee_id_index_at = self._name_index_at + self.count * INDEX_ENTRY.size
+
+    def _record_offset(self, index: int) -> int:
+        return self._records_at + index * self._record.size
+
+    def _field_bytes(self, index: int, field: str) -> bytes:
+        field_offset, width = self._fields[field]
+        start = self._record_offset(index) + field_offset
+        return self._mm[start:start + width].rstrip(b'\0')
+
+    def _indexed(self, index_at: int, position: int) -> int:
+        return INDEX_ENTRY.unpack_from(self._mm, index_at + position * INDEX_ENTRY.size)[0]
+
+    def _lower_bound(self, index_at: int, field: str, key: bytes) -> int:
+        """索引中第一个字段值 >= key 的位置"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._field_bytes(self._indexed(index_at, middle), field) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _decode(self, index: int) -> Dict[str, Any]:
+        row_id, nulls, *values = self._record.unpack_from(self._mm, self._record_offset(index))
+        employee = {'id': row_id}
+        for position, (field, value) in enumerate(zip(SNAPSHOT_FIELDS, values)):
+            employee[field] = None if nulls & (1 << position) else value.rstrip(b'\0').decode('utf-8')
+        return employee
+
+    def by_id(self, row_id: int) -> Optional[Dict[str, Any]]:
+        """按主键查找（记录区按id排序）"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            middle_id = struct.unpack_from('<q', self._mm, self._record_offset(middle))[0]
+            if middle_id < row_id:
+                low = middle + 1
+            elif middle_id > row_id:
+                high = middle
+            else:
+                return self._decode(middle)
+        return None
+
+    def by_employee_id(self, employee_id: str) -> Optional[Dict[str, Any]]:
+        """按工号查找"""
+        key = employee_id.encode('utf-8')
+        position = self._lower_bound(self._employee_id_index_at, 'employee_id', key)
+        if position < self.count:
+            index = self._indexed(self._employee_id_index_at, position)
+            if self._field_bytes(index, 'employee_id') == key:
+                return self._decode(index)
+        return None
+
+    def by_name_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按姓名前缀查找，结果按 (姓名, id) 排序"""
+        key = prefix.encode('utf-8')
+        employees = []
+        position = self._lower_bound(self._name_index_at, 'name', key)
+        while position < self.count and (limit is None or len(employees) < limit):
+            index = self._indexed(self._name_index_at, position)
+            if not self._field_bytes(index, 'name').startswith(key):
+                break
+            employees.append(self._decode(index))
+            position += 1
+        return employees
+
+    def by_name(self, name: str) -> List[Dict[str, Any]]:
+        """按姓名精确查找（可能重名）"""
+        return [employee for employee in self.by_name_prefix(name) if employee['name'] == name]
+
+    def close(self):
+        self._mm.close()
+
+class EmployeeDirectory:
+    """进程内的快照读取器，同时负责在快照过期时后台重建
+
+    fresh() 只在快照的数据库标识与当前数据库相同、代数等于employee表当前
+    版本号时返回快照，否则返回None（调用方退回SQL查询）并安排一次后台重建，
+    因此读到的数据不会比数据库旧，数据库删除重建后也不会读到旧库的数据。
+    版本号与标识由 get_employee_version / get_database_identity 提供，
+    数据未变化时不查询数据库。
+    替换快照只是一次引用赋值，正在使用旧快照的读者不受影响。
+    """
+
+    def __init__(self, database, rebuild_delay=REBUILD_DELAY):
+        self._db = database
+        self.rebuild_delay = rebuild_delay
+        self._snapshot: Optional[DirectorySnapshot] = None
+        self._lock = threading.Lock()
+        self._rebuild_pending = False
+        self.stats = {'hits': 0, 'stale': 0, 'rebuilds': 0, 'swaps': 0}
+
+    def _current(self) -> Optional[DirectorySnapshot]:
+        """返回当前快照，磁盘上的文件被替换后换用新文件"""
+        path = snapshot_path(self._db.DB_PATH)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.file_key == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            try:
+                candidate = DirectorySnapshot(path)
+            except (OSError, ValueError):
+                return snapshot
+            if (snapshot is None or candidate.identity != snapshot.identity
+                    or candidate.generation >= snapshot.generation):
+                # 旧快照不主动close，交给垃圾回收，避免打断仍在读的线程
+                self._snapshot = candidate
+                self.stats['swaps'] += 1
+                return candidate
+            return snapshot
+
+    def fresh(self) -> Optional[DirectorySnapshot]:
+        """返回与数据库一致的快照；快照缺失或过期时返回None并安排重建"""
+        snapshot = self._current()
+        if (snapshot is not None and snapshot.identity == self._db.get_database_identity()
+                and snapshot.generation == self._db.get_employee_version()):
+            self.stats['hits'] += 1
+            return snapshot
+        self.stats['stale'] += 1
+        self.schedule_rebuild()
+        return None
+
+    def schedule_rebuild(self):
+        """安排一次后台重建，已有待执行的重建时直接返回"""
+        with self._lock:
+            if self._rebuild_pending:
+                return
+            self._rebuild_pending = True
+        threading.Thread(target=self._delayed_rebuild, name='directory-snapshot', daemon=True).start()
+
+    def _delayed_rebuild(self):
+        time.sleep(self.rebuild_delay)
+        with self._lock:
+            self._rebuild_pending = False
+        try:
+            self.rebuild()
+        except Exception as e:
+            # MCP服务器的stdout是协议通道，日志只能写到stderr
+            print(f"重建员工目录快照失败: {e}", file=sys.stderr)
+
+    def rebuild(self) -> bool:
+        """在一个读事务内读取版本号和全部员工并写出快照
+
+        磁盘上属于同一数据库的快照已不旧于当前版本时跳过，返回False。
+        """
+        path = snapshot_path(self._db.DB_PATH)
+        with self._db.pooled_connection() as conn:
+            conn.execute('BEGIN')
+            try:
+                generation, identity = conn.execute("""
+                    SELECT version, (SELECT value FROM database_info WHERE name = 'identity')
+                    FROM table_version WHERE name = 'employee'
+                """).fetchone()
+                if read_generation(path, identity) >= generation:
+                    return False
+                rows = conn.execute(
+                    f"SELECT id, {', '.join(SNAPSHOT_FIELDS)} FROM employee ORDER BY id"
+                ).fetchall()
+            finally:
+                conn.execute('COMMIT')
+        write_snapshot(path, rows, generation, identity)
+        self.stats['rebuilds'] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return dict(self.stats,
+                    generation=snapshot.generation if snapshot else None,
+                    records=snapshot.count if snapshot else 0)
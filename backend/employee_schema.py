@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+员工表字段与检索常量 - 后端、数据模型与MCP服务器共用
+
+不导入其他模块，MCP服务器不导入数据库模块也能据此生成工具列表。
+"""
+
+# employee表的全部列，字段投影只允许选择这些列
+EMPLOYEE_FIELDS = ('id', 'name', 'employee_id', 'department', 'hr_account', 'status',
+                   'created_at', 'updated_at')
+
+# 姓名搜索默认返回条数；trigram索引要求检索词至少3个字符
+SEARCH_LIMIT = 50
+FTS_MIN_TERM_LENGTH = 3
+
+def fts_phrase(term):
+    """将检索词转为FTS5短语查询"""
+    return '"' + term.replace('"', '""') + '"'
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事件总线 - 把employee_changes变更日志转为员工变更事件，推送给SSE连接的订阅者
+
+变更日志由employee表上的触发器写入，因此无论写入来自app.py、simple_app.py、
+MCP服务器还是命令行工具，本进程的订阅者都能收到；后台线程只在有订阅者时
+跟踪日志，数据版本（PRAGMA data_version）未变化时不查询。
+"""
+
+import itertools
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import database
+from database import fetch_changes, fetch_statistics, get_data_version, latest_change_seq, CHANGES_PAGE_SIZE
+
+# 每个订阅者最多积压的事件数，超过后丢弃并通知客户端重新同步
+SUBSCRIBER_QUEUE_SIZE = 256
+# 同时连接的订阅者上限：在线程化的werkzeug服务器上每个SSE连接独占一个工作线程
+MAX_SUBSCRIBERS = 32
+# 变更日志的轮询间隔（秒）
+FEED_POLL_INTERVAL = 0.1
+# 一次轮询到的变更超过该条数（如批量导入）时只推送resync，由客户端重新全量加载
+FEED_MAX_EVENTS = 200
+
+class Subscription:
+    """一个订阅者的事件队列"""
+
+    def __init__(self, max_size=SUBSCRIBER_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=max_size)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float) -> Optional[Tuple[int, str, Any]]:
+        """等待下一个事件，超时返回None"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def reset(self):
+        """丢弃积压的事件（客户端将重新全量加载）"""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self.overflowed = False
+
+class EventBus:
+    """线程安全的发布/订阅
+
+    发布者不会被慢订阅者阻塞：订阅者队列满时该订阅者被标记为溢出。
+    """
+
+    def __init__(self, max_subscribers=MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._published = 0
+        self._rejected = 0
+
+    def subscribe(self) -> Optional[Subscription]:
+        """新增订阅者，已达上限时返回None"""
+        subscription = Subscription()
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self._rejected += 1
+                return None
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, event: str, data: Any, event_id: Optional[int] = None):
+        """发布事件；event_id缺省时使用总线内的自增编号"""
+        with self._lock:
+            if event_id is None:
+                event_id = next(self._ids)
+            subscribers = list(self._subscribers)
+            self._published += 1
+        for subscription in subscribers:
+            subscription.put((event_id, event, data))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self._published,
+                'rejected': self._rejected,
+                'overflowed': sum(1 for subscription in self._subscribers if subscription.overflowed)
+            }
+
+def change_events(changes: List[Dict[str, Any]]) -> List[Tuple[int, str, Dict[str, Any]]]:
+    """把fetch_changes返回的增量转为 (变更序号, 事件名, 数据) 列表
+
+    新增为 employee.created（整行）；更新只带id和变化的字段，状态变化时为
+    employee.status_changed，否则为 employee.updated；删除为 employee.deleted。
+    """
+    events = []
+    for change in changes:
+        if change['op'] == 'insert':
+            events.append((change['seq'], 'employee.created', {'employee': change['employee']}))
+        elif change['op'] == 'update':
+            event = 'employee.status_changed' if 'status' in change['changed'] else 'employee.updated'
+            events.append((change['seq'], event, {
+                'employee': dict(change['employee'], id=change['id']), 'changed': change['changed']
+            }))
+        else:
+            events.append((change['seq'], 'employee.deleted', {'id': change['id']}))
+    return events
+
+class ChangeFeed:
+    """后台线程：跟踪变更日志并把新变更发布到事件总线
+
+    没有订阅者时不访问数据库；有订阅者后从当时最新的变更序号开始跟踪，
+    每批变更之后发布一次刷新后的统计。
+    """
+
+    def __init__(self, bus: EventBus, poll_interval=FEED_POLL_INTERVAL, max_events=FEED_MAX_EVENTS):
+        self.bus = bus
+        self.poll_interval = poll_interval
+        self.max_events = max_events
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'polls': 0, 'events': 0, 'resyncs': 0, 'errors': 0}
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='employee-change-feed', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        since = None
+        db_path = None
+        checked_version = None
+        while True:
+            try:
+                if not self.bus.has_subscribers() or db_path != database.DB_PATH:
+                    since = None
+                    db_path = database.DB_PATH
+                elif since is None:
+                    # 先读版本号再读序号，两者之间提交的变更会在下一轮被发现
+                    checked_version = get_data_version()
+                    since = latest_change_seq()
+                else:
+                    version = get_data_version()
+                    if version != checked_version:
+                        checked_version = version
+                        since = self.poll(since)
+            except Exception as e:
+                self.stats['errors'] += 1
+                since = None
+                print(f"读取员工变更日志失败: {e}", file=sys.stderr)
+            time.sleep(self.poll_interval)
+
+    def poll(self, since: int) -> int:
+        """发布since之后的全部变更，返回新的变更序号"""
+        self.stats['polls'] += 1
+        changes = []
+        while True:
+            result = fetch_changes(since, CHANGES_PAGE_SIZE)
+            if result['reset']:
+                return self._resync(result['next_since'])
+            if result['next_since'] == since:
+                break
+            since = result['next_since']
+            changes.extend(result['changes'])
+            if len(changes) > self.max_events:
+                return self._resync(latest_change_seq())
+
+        if changes:
+            for seq, event, data in change_events(changes):
+                self.bus.publish(event, data, seq)
+            self.stats['events'] += len(changes)
+            self.bus.publish('stats', {'stats': fetch_statistics()})
+        return since
+
+    def _resync(self, since: int) -> int:
+        self.stats['resyncs'] += 1
+        self.bus.publish('resync', {})
+        return since
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+# 全局事件总线及其变更日志来源
+event_bus = EventBus()
+change_feed = ChangeFeed(event_bus)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+员工姓名/部门名称词典 - 从数据库加载已知名称，在消息中一次扫描找出最长匹配
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import database
+from database import fetch_changes, get_data_version, pooled_connection, CHANGES_PAGE_SIZE
+
+# 超过该秒数强制全量重新加载，兜底修正增量同步遗漏的变更
+FULL_RELOAD_INTERVAL = 300.0
+
+class Gazetteer:
+    """已知员工姓名与部门名称的词典
+
+    名称按长度分桶存放在哈希表中；扫描时在每个位置从最长的已知长度开始
+    查表，取最左最长的匹配，名称长度有上限，因此扫描与消息长度成线性。
+    内存中只保存 姓名→人数；数据版本变化时按employee_changes变更日志增量同步，
+    新增员工直接计数，改名或删除（无法得知旧姓名）时按姓名分组全量重新加载。
+    """
+    
+    def __init__(self, full_reload_interval=FULL_RELOAD_INTERVAL):
+        self.full_reload_interval = full_reload_interval
+        self._lock = threading.Lock()
+        # (名称→标签集合, 已知名称长度降序)，整体替换，扫描时不会读到不一致的组合
+        self._index: Tuple[Dict[str, Set[str]], Tuple[int, ...]] = ({}, ())
+        self._name_counts: Dict[str, int] = {}
+        self._departments: Set[str] = set()
+        self._db_path = None
+        self._version = None
+        self._since = 0
+        self._loaded_at = 0.0
+    
+    def refresh(self):
+        """与数据库同步（数据版本未变化时不访问数据库）"""
+        version = get_data_version()
+        with self._lock:
+            expired = time.monotonic() - self._loaded_at > self.full_reload_interval
+            if self._db_path != database.DB_PATH or expired or not self._sync_changes(version):
+                self._full_reload()
+            self._version = version
+    
+    def _full_reload(self):
+        # 姓名计数与变更序号在同一读事务中读取，后续增量从该序号开始
+        with pooled_connection() as conn:
+            conn.execute('BEGIN')
+            try:
+                self._since = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM employee_changes"
+                ).fetchone()[0]
+                self._name_counts = dict(conn.execute(
+                    "SELECT name, COUNT(*) FROM employee GROUP BY name"
+                ).fetchall())
+                self._departments = {row[0] for row in conn.execute(
+                    "SELECT DISTINCT department FROM department_stats"
+                )}
+            finally:
+                conn.execute('COMMIT')
+        self._db_path = database.DB_PATH
+        self._loaded_at = time.monotonic()
+        self._rebuild_entries()
+    
+    def _sync_changes(self, version) -> bool:
+        """应用变更日志中的新增员工，遇到改名、删除或日志已裁剪时返回False"""
+        if version == self._version:
+            return True
+        added: Dict[str, int] = {}
+        since = self._since
+        while True:
+            result = fetch_changes(since, CHANGES_PAGE_SIZE)
+            if result['reset']:
+                return False
+            for change in result['changes']:
+                if change['op'] == 'delete' or (change['op'] == 'update' and 'name' in change['changed']):
+                    return False
+                if change['op'] == 'insert':
+                    name = change['employee']['name']
+                    added[name] = added.get(name, 0) + 1
+            if result['next_since'] == since:
+                break
+            since = result['next_since']
+        
+        for name, count in added.items():
+            self._name_counts[name] = self._name_counts.get(name, 0) + count
+        self._since = since
+        self._departments = {row['department'] for row in database.execute_query(
+            "SELECT DISTINCT department FROM department_stats"
+        )}
+        self._rebuild_entries()
+        return True
+    
+    def _rebuild_entries(self):
+        entries: Dict[str, Set[str]] = {}
+        for name in self._name_counts:
+            entries.setdefault(name, set()).add('name')
+        for department in self._departments:
+            entries.setdefault(department, set()).add('department')
+        self._index = (entries, tuple(sorted({len(surface) for surface in entries}, reverse=True)))
+    
+    def find(self, text: str) -> List[Tuple[int, str, Set[str]]]:
+        """扫描文本，返回不重叠的最左最长匹配 (起始位置, 名称, 标签集合)"""
+        entries, lengths = self._index
+        matches = []
+        i = 0
+        n = len(text)
+        while i < n:
+            for length in lengths:
+                if i + length <= n:
+                    labels = entries.get(text[i:i + length])
+                    if labels:
+                        matches.append((i, text[i:i + length], labels))
+                        i += length
+                        break
+            else:
+                i += 1
+        return matches
+    
+    def find_names(self, text: str) -> List[str]:
+        """文本中出现的已知员工姓名（按出现顺序）"""
+        return [surface for _, surface, labels in self.find(text) if 'name' in labels]
+    
+    def find_departments(self, text: str) -> List[str]:
+        """文本中出现的已知部门名称（按出现顺序）"""
+        return [surface for _, surface, labels in self.find(text) if 'department' in labels]
+    
+    def first(self, text: str, label: str) -> Optional[str]:
+        for _, surface, labels in self.find(text):
+            if label in labels:
+                return surface
+        return None
+
+# 全局词典实例
+gazetteer = Gazetteer()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+意图识别引擎 - 关键词自动机预筛选 + 预编译正则，单次扫描确定候选意图
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+# 姓名与部门的字符集合：排除标点和在句式中作为分隔的字
+NAME = r'(?P<name>[^\s，,。！？!?、：:的到把将部]{1,10})'
+DEPARTMENT = r'(?P<department>[^\s，,。！？!?、：:的到]{1,10}?部)'
+
+class KeywordAutomaton:
+    """Aho-Corasick关键词自动机，一次线性扫描找出文本中出现的所有关键词标签"""
+    
+    def __init__(self, keywords: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[frozenset] = [frozenset()]
+        
+        for keyword, labels in keywords.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(frozenset())
+                state = next_state
+            self._output[state] = self._output[state] | frozenset(labels)
+        
+        # 广度优先构建失败指针，并合并后缀状态的输出
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] | self._output[self._fail[next_state]]
+    
+    def find_labels(self, text: str) -> set:
+        """返回文本中出现的关键词对应的标签集合"""
+        labels = set()
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if self._output[state]:
+                labels |= self._output[state]
+        return labels
+
+@dataclass
+class IntentRule:
+    """意图规则：触发关键词 + 按顺序尝试的预编译正则"""
+    intent: str
+    priority: int
+    keywords: Tuple[str, ...]
+    patterns: Tuple[Pattern, ...]
+    entity_names: Tuple[str, ...] = field(default=('name',))
+
+INTENT_RULES = (
+    IntentRule(
+        intent='update',
+        priority=0,
+        keywords=('修改', '更改', '改为', '改成', '调到', '转到', '调往', '调整', '把', '将'),
+        patterns=tuple(re.compile(p) for p in (
+            rf'把{NAME}的?部门?(?:改为|改成|修改为|更改为|调整为|调到|转到|换到){DEPARTMENT}',
+            rf'(?:修改|更改|调整){NAME}的部门(?:改为|改成|为|成|到){DEPARTMENT}',
+            rf'(?:将|把)?{NAME}(?:调到|转到|调往|调入){DEPARTMENT}',
+        )),
+        entity_names=('name', 'department'),
+    ),
+    IntentRule(
+        intent='create',
+        priority=1,
+        keywords=('新增', '添加', '创建', '入职'),
+        patterns=tuple(re.compile(p) for p in (
+            rf'(?:新增|添加|创建|入职)(?:一[个名位])?新?员工{NAME}(?:到|[，,\s]*(?:部门)?[是为]?){DEPARTMENT}',
+            rf'(?:新增|添加|创建)(?:一[个名位])?新?员工{NAME}[，,\s]*(?:在|属于){DEPARTMENT}',
+            # 省略"员工"的说法，如"添加赵六到技术部"、"新增赵六，部门技术部"
+            rf'(?:新增|添加|创建){NAME}(?:到|[，,\s]*部门[是为]?){DEPARTMENT}',
+        )),
+        entity_names=('name', 'department'),
+    ),
+    IntentRule(
+        intent='query',
+        priority=2,
+        keywords=('查询', '查找', '搜索', '查', '找', '信息', '账号', '资料', '哪个部门', '什么部门'),
+        patterns=tuple(re.compile(p) for p in (
+            rf'(?:查询|查找|搜索|查一下|查|找)(?:一下)?(?:员工)?{NAME}',
+            rf'{NAME}的(?:人事账号|账号|信息|资料|部门)',
+            rf'{NAME}(?:在|是)(?:哪个|哪一个|什么)部门',
+        )),
+    ),
+)
+
+class IntentEngine:
+    """意图识别引擎
+
+    先用关键词自动机一次扫描选出候选意图，再按优先级（修改 > 新增 > 查询）
+    依次尝试候选意图的预编译正则，第一个匹配即为结果；记录每个意图的匹配耗时。
+    """
+    
+    def __init__(self, rules: Iterable[IntentRule] = INTENT_RULES):
+        self.rules = sorted(rules, key=lambda rule: rule.priority)
+        keywords: Dict[str, set] = {}
+        for rule in self.rules:
+            for keyword in rule.keywords:
+                keywords.setdefault(keyword, set()).add(rule.intent)
+        self.automaton = KeywordAutomaton(keywords)
+        self._lock = threading.Lock()
+        self._timing = {rule.intent: {'attempts': 0, 'matches': 0, 'total_ns': 0} for rule in self.rules}
+    
+    def match(self, message: str) -> Dict[str, Any]:
+        """识别意图并提取实体，返回 {'intent': ..., 'entities': {...}}"""
+        message = message.strip()
+        candidates = self.automaton.find_labels(message)
+        
+        for rule in self.rules:
+            if rule.intent not in candidates:
+                continue
+            start = time.perf_counter_ns()
+            entities = self._match_rule(rule, message)
+            self._record(rule.intent, time.perf_counter_ns() - start, entities is not None)
+            if entities is not None:
+                return {'intent': rule.intent, 'entities': entities}
+        
+        return {'intent': 'unknown', 'entities': {}}
+    
+    def _match_rule(self, rule: IntentRule, message: str) -> Optional[Dict[str, str]]:
+        for pattern in rule.patterns:
+            match = pattern.search(message)
+            if match:
+                return {name: match.group(name) for name in rule.entity_names}
+        return None
+    
+    def _record(self, intent: str, elapsed_ns: int, matched: bool):
+        with self._lock:
+            timing = self._timing[intent]
+            timing['attempts'] += 1
+            timing['total_ns'] += elapsed_ns
+            if matched:
+                timing['matches'] += 1
+    
+    def timing_stats(self) -> Dict[str, Dict[str, float]]:
+        """每个意图的尝试次数、匹配次数和平均匹配耗时（微秒）"""
+        with self._lock:
+            stats = {intent: dict(timing) for intent, timing in self._timing.items()}
+        for timing in stats.values():
+            timing['avg_us'] = timing['total_ns'] / timing['attempts'] / 1000 if timing['attempts'] else 0.0
+        return stats
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台事件循环模块 - 在常驻线程中运行asyncio事件循环，供同步的Flask处理函数提交协程
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+
+class BackgroundLoop:
+    """常驻后台线程的事件循环
+
+    所有协程共享同一个事件循环，因此可以复用异步资源（数据库线程池、
+    缓存等）；等待超时的协程会被取消。
+    """
+    
+    def __init__(self, name='hr-async-loop'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self):
+        # 无锁快路径：_thread 在 _loop 赋值且循环已运行之后才发布
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return self._loop
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+                    loop.close()
+                
+                thread = threading.Thread(target=run, name=self.name, daemon=True)
+                self._loop = loop
+                thread.start()
+                ready.wait()
+                self._thread = thread
+            return self._loop
+    
+    def submit(self, coro):
+        """提交协程，返回concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+    
+    def run(self, coro, timeout=None):
+        """提交协程并等待结果，超时后取消协程并抛出TimeoutError
+
+        协程在后台事件循环上执行，但调用线程（如Flask工作线程）在等待期间
+        一直阻塞，最长timeout秒。
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"协程执行超时（{timeout}秒）")
+    
+    def stop(self):
+        """停止事件循环线程"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            thread = self._thread
+            self._thread = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            thread.join()
+            self._loop = None
+
+# 全局后台事件循环
+background_loop = BackgroundLoop()
+atexit.register(background_loop.stop)
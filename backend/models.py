@@ -8,6 +8,8 @@ from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 
+from employee_schema import FTS_MIN_TERM_LENGTH, fts_phrase
+
 @dataclass
 class Employee:
     """员工数据模型"""
@@ -73,14 +75,21 @@ class EmployeeQuery:
     department: Optional[str] = None
     status: Optional[str] = None
     
-    def to_sql_where(self):
-        """转换为SQL WHERE条件"""
+    def to_sql_where(self, use_fts=False):
+        """转换为SQL WHERE条件
+
+        use_fts为真且姓名不少于FTS_MIN_TERM_LENGTH个字符时，姓名子串匹配改用trigram索引。
+        """
         conditions = []
         params = []
         
         if self.name:
-            conditions.append("name LIKE ?")
-            params.append(f"%{self.name}%")
+            if use_fts and len(self.name) >= FTS_MIN_TERM_LENGTH:
+                conditions.append("id IN (SELECT rowid FROM employee_name_fts WHERE employee_name_fts MATCH ?)")
+                params.append(fts_phrase(self.name))
+            else:
+                conditions.append("name LIKE ?")
+                params.append(f"%{self.name}%")
         
         if self.employee_id:
             conditions.append("employee_id = ?")
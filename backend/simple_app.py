@@ -9,6 +9,10 @@ from flask_cors import CORS
 import sqlite3
 import os
 import json
+import database
+from database import ensure_database, next_employee_id
+from gazetteer import gazetteer
+from directory_snapshot import EmployeeDirectory
 
 app = Flask(__name__)
 CORS(app)
@@ -16,6 +20,9 @@ CORS(app)
 # 数据库路径
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'hr_system.db')
 
+# 员工目录快照：按姓名查找时优先走内存映射
+employee_directory = EmployeeDirectory(database)
+
 class APIResponse:
     def __init__(self, success=True, message="", data=None):
         self.success = success
@@ -29,6 +36,11 @@ class APIResponse:
             'data': self.data
         }
 
+@app.before_request
+def prepare_database():
+    """首个请求前创建工号序列、版本号等表结构（姓名词典、目录快照和工号分配依赖它们）"""
+    ensure_database()
+
 def get_db_connection():
     """获取数据库连接"""
     conn = sqlite3.connect(DB_PATH)
@@ -84,8 +96,8 @@ def create_employee():
         cursor = conn.cursor()
         
         # 生成员工ID和HR账号
-        employee_id = f"EMP{hash(name) % 10000:04d}"
-        hr_account = f"HR{name[:2]}{hash(name) % 10000:04d}"
+        employee_id = next_employee_id()
+        hr_account = f"HR{name[:2]}{employee_id[3:]}"
         
         cursor.execute("""
             INSERT INTO employee (name, employee_id, department, hr_account, status)
@@ -140,6 +152,7 @@ def update_employee(employee_id):
             params.append(data['status'])
         
         if update_fields:
+            update_fields.append("updated_at = CURRENT_TIMESTAMP")
             params.append(employee_id)
             cursor.execute(f"UPDATE employee SET {', '.join(update_fields)} WHERE id = ?", params)
             conn.commit()
@@ -187,21 +200,22 @@ def process_hr_request(message):
     
     # 查询员工信息
     if any(keyword in message for keyword in ['查询', '搜索', '找', '查找']):
-        # 提取姓名
-        names = ['张三', '李四', '王五', '赵六', '孙七', '王小敏']
-        found_name = None
-        for name in names:
-            if name in message:
-                found_name = name
-                break
+        # 提取姓名：在已知员工姓名词典中找最长匹配
+        gazetteer.refresh()
+        found_name = gazetteer.first(message, 'name')
         
         if found_name:
             try:
-                conn = get_db_connection()
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM employee WHERE name = ?", (found_name,))
-                employee = cursor.fetchone()
-                conn.close()
+                snapshot = employee_directory.fresh()
+                if snapshot is not None:
+                    matches = snapshot.by_name(found_name)
+                    employee = matches[0] if matches else None
+                else:
+                    conn = get_db_connection()
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT * FROM employee WHERE name = ?", (found_name,))
+                    employee = cursor.fetchone()
+                    conn.close()
                 
                 if employee:
                     return f"找到员工信息：\n姓名：{employee['name']}\n部门：{employee['department']}\nHR账号：{employee['hr_account']}\n状态：{employee['status']}"
@@ -234,8 +248,8 @@ def process_hr_request(message):
                     return f"员工 {name} 已存在"
                 
                 # 生成员工ID和HR账号
-                employee_id = f"EMP{hash(name) % 10000:04d}"
-                hr_account = f"HR{name[:2]}{hash(name) % 10000:04d}"
+                employee_id = next_employee_id()
+                hr_account = f"HR{name[:2]}{employee_id[3:]}"
                 
                 cursor.execute("""
                     INSERT INTO employee (name, employee_id, department, hr_account, status)
@@ -280,7 +294,7 @@ def process_hr_request(message):
                     return f"未找到员工 {name}"
                 
                 # 更新部门
-                cursor.execute("UPDATE employee SET department = ? WHERE name = ?", (new_department, name))
+                cursor.execute("UPDATE employee SET department = ?, updated_at = CURRENT_TIMESTAMP WHERE name = ?", (new_department, name))
                 conn.commit()
                 conn.close()
                 
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步数据库层并发基准测试
+
+在临时数据库上比较两种方式在不同并发度下的吞吐量：
+  blocking - 协程内直接调用阻塞的数据库函数（改造前的做法）
+  async    - 通过 async_db 在线程池中执行，协程之间真正并发
+
+用法：
+    python benchmarks/async_db_concurrency.py --rows 50000 --requests 400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import database
+from database import async_db, search_employees
+
+SURNAMES = '张李王赵孙周吴郑冯陈'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚'
+
+def seed_database(rows):
+    """在临时目录中创建并填充数据库"""
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    database.init_database()
+    employees = [
+        (f"{SURNAMES[i % len(SURNAMES)]}{GIVEN_NAMES[i % len(GIVEN_NAMES)]}{i}", f"B{i:07d}",
+         f"部门{i % 20}", f"user{i}@company.com", '在职')
+        for i in range(rows)
+    ]
+    conn = database.get_connection()
+    conn.executemany("""
+        INSERT INTO employee (name, employee_id, department, hr_account, status)
+        VALUES (?, ?, ?, ?, ?)
+    """, employees)
+    conn.commit()
+    conn.close()
+
+async def blocking_request(term):
+    return search_employees(term)
+
+async def async_request(term):
+    return await async_db.call(search_employees, term)
+
+async def run_level(handler, concurrency, requests):
+    """以固定并发度执行requests个请求，返回每秒请求数
+
+    检索词均为不存在的两字姓名片段，每个请求都要完整扫描姓名，模拟慢查询。
+    """
+    terms = [f"无{GIVEN_NAMES[i % len(GIVEN_NAMES)]}" for i in range(requests)]
+    queue = asyncio.Queue()
+    for term in terms:
+        queue.put_nowait(term)
+    
+    async def worker():
+        while not queue.empty():
+            await handler(queue.get_nowait())
+    
+    # 心跳协程测量事件循环被阻塞的最长时间
+    max_stall = 0.0
+    done = False
+    
+    async def heartbeat():
+        nonlocal max_stall
+        interval = 0.001
+        while not done:
+            tick = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_stall = max(max_stall, time.perf_counter() - tick - interval)
+    
+    monitor = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await monitor
+    return requests / elapsed, max_stall * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="异步数据库层并发基准测试")
+    parser.add_argument('--rows', type=int, default=50000, help="临时数据库中的员工数")
+    parser.add_argument('--requests', type=int, default=400, help="每个并发度执行的请求数")
+    parser.add_argument('--levels', default='1,2,4,8,16', help="并发度列表，逗号分隔")
+    parser.add_argument('--json', dest='json_path', help="将结果写入JSON文件")
+    args = parser.parse_args()
+    
+    seed_database(args.rows)
+    levels = [int(level) for level in args.levels.split(',')]
+    results = []
+    
+    print(f"CPU核数: {os.cpu_count()}（吞吐量加速比受核数限制，事件循环阻塞时间不受影响）")
+    print(f"{'并发度':>6} {'blocking req/s':>16} {'async req/s':>14} {'加速比':>8} "
+          f"{'blocking阻塞ms':>16} {'async阻塞ms':>13}")
+    for level in levels:
+        blocking, blocking_stall = asyncio.run(run_level(blocking_request, level, args.requests))
+        concurrent, async_stall = asyncio.run(run_level(async_request, level, args.requests))
+        results.append({
+            'concurrency': level,
+            'blocking_rps': blocking,
+            'async_rps': concurrent,
+            'blocking_max_loop_stall_ms': blocking_stall,
+            'async_max_loop_stall_ms': async_stall,
+        })
+        print(f"{level:>9} {blocking:>16.1f} {concurrent:>14.1f} {concurrent / blocking:>9.2f}x "
+              f"{blocking_stall:>16.1f} {async_stall:>13.1f}")
+    
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': args.rows, 'requests': args.requests, 'cpu_count': os.cpu_count(),
+                   'results': results}, f, indent=2)
+    
+    async_db.shutdown()
+
+if __name__ == '__main__':
+    main()
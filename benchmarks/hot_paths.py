@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内热点路径微基准测试
+
+在用 database.generate_employees 生成的临时数据库上，用 timeit 测量：
+  execute_query  - 查询并把行转换为字典
+  to_sql_where   - EmployeeQuery 生成 WHERE 条件
+  employee       - Employee.from_dict / to_dict / validate
+  extract        - AIService.extract_intent_and_entities（带姓名词典）
+每项先自动确定单轮执行次数，再重复多轮取中位数，结果可写入JSON；
+--compare 比较两次结果，单次耗时变慢超过阈值的项记为回归并以非零状态退出。
+
+用法：
+    python benchmarks/hot_paths.py --rows 20000 --json before.json
+    python benchmarks/hot_paths.py --filter extract --repeat 9
+    python benchmarks/hot_paths.py --compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+import database
+from ai_service import AIService
+from gazetteer import Gazetteer
+from models import Employee, EmployeeQuery
+
+# 每轮计时的最短时长（秒），由 timeit 的 autorange 决定执行次数
+MIN_ROUND_TIME = 0.2
+# 默认的回归阈值：单次耗时中位数比基线慢10%以上
+DEFAULT_THRESHOLD = 0.10
+
+def seed_database(rows, seed):
+    """在临时目录中创建数据库并生成rows名合成员工"""
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(), 'hot_paths.db')
+    database.generate_employees(rows, seed, verbose=False)
+
+def build_benchmarks():
+    """返回 {名称: 无参函数}，所有输入在这里准备好，计时只覆盖调用本身"""
+    row = database.execute_query("SELECT * FROM employee ORDER BY id LIMIT 1")[0]
+    employee = Employee.from_dict(row)
+    sample = database.execute_query("SELECT name, department FROM employee ORDER BY id LIMIT 1")[0]
+    name, department = sample['name'], sample['department']
+
+    gazetteer = Gazetteer()
+    gazetteer.refresh()
+    service = AIService(gazetteer)
+    messages = {
+        'query': f"查询{name}的人事账号",
+        'create': "新增一个员工王小敏，部门是市场部",
+        'update': f"把{name}的部门改为行政部",
+        'unknown': "今天天气怎么样",
+    }
+
+    benchmarks = {
+        'execute_query.rows_1': lambda: database.execute_query(
+            "SELECT * FROM employee WHERE id = ?", (row['id'],)),
+        'execute_query.rows_50': lambda: database.execute_query(
+            "SELECT * FROM employee ORDER BY id LIMIT 50"),
+        'execute_query.rows_500': lambda: database.execute_query(
+            "SELECT * FROM employee ORDER BY id LIMIT 500"),
+        'to_sql_where.empty': lambda: EmployeeQuery().to_sql_where(),
+        'to_sql_where.all_fields': lambda: EmployeeQuery(
+            name=name, employee_id=row['employee_id'], department=department, status='在职').to_sql_where(),
+        'to_sql_where.fts': lambda: EmployeeQuery(name=name + '测试').to_sql_where(use_fts=True),
+        'employee.from_dict': lambda: Employee.from_dict(row),
+        'employee.to_dict': employee.to_dict,
+        'employee.validate': employee.validate,
+    }
+    for intent, message in messages.items():
+        benchmarks[f'extract.{intent}'] = lambda message=message: service.extract_intent_and_entities(message)
+    return benchmarks
+
+def measure(func, repeat):
+    """返回每次调用耗时（微秒）的统计"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < MIN_ROUND_TIME:
+        number = max(1, int(number * MIN_ROUND_TIME / elapsed))
+    rounds = [total / number * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'number': number,
+        'median_us': statistics.median(rounds),
+        'min_us': min(rounds),
+        'stdev_us': statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+    }
+
+def run(args):
+    seed_database(args.rows, args.seed)
+    benchmarks = build_benchmarks()
+    selected = [name for name in benchmarks if not args.filter or any(f in name for f in args.filter)]
+
+    report = {
+        'config': {'rows': args.rows, 'seed': args.seed, 'repeat': args.repeat,
+                   'python': sys.version.split()[0], 'sqlite': database.sqlite3.sqlite_version},
+        'results': {},
+    }
+    print(f"合成员工 {args.rows} 名，每项重复 {args.repeat} 轮")
+    print(f"{'基准':<28}{'中位数 µs':>12}{'最小 µs':>12}{'标准差':>10}{'次数/轮':>10}")
+    for name in selected:
+        result = measure(benchmarks[name], args.repeat)
+        report['results'][name] = result
+        print(f"{name:<28}{result['median_us']:>12.2f}{result['min_us']:>12.2f}"
+              f"{result['stdev_us']:>10.2f}{result['number']:>10}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+def compare(baseline_path, current_path, threshold):
+    """比较两次结果的单次耗时中位数，返回回归项数"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    with open(current_path, encoding='utf-8') as f:
+        current = json.load(f)['results']
+
+    regressions = 0
+    print(f"{'基准':<28}{'基线 µs':>12}{'当前 µs':>12}{'变化':>10}")
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            print(f"{name:<28}{'仅在' + ('当前' if name in current else '基线') + '结果中':>34}")
+            continue
+        before = baseline[name]['median_us']
+        after = current[name]['median_us']
+        change = after / before - 1 if before else 0.0
+        flag = ''
+        if change > threshold:
+            regressions += 1
+            flag = '  ❌ 回归'
+        elif change < -threshold:
+            flag = '  ✅ 提升'
+        print(f"{name:<28}{before:>12.2f}{after:>12.2f}{change:>+10.1%}{flag}")
+
+    print(f"\n阈值 {threshold:.0%}，回归 {regressions} 项")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="进程内热点路径微基准测试")
+    parser.add_argument('--rows', type=int, default=20000, help="临时数据库中的合成员工数")
+    parser.add_argument('--seed', type=int, default=0, help="合成数据的随机种子")
+    parser.add_argument('--repeat', type=int, default=7, help="每项重复计时的轮数")
+    parser.add_argument('--filter', action='append', help="只运行名称包含该字符串的基准（可重复）")
+    parser.add_argument('--json', dest='json_path', help="将结果写入JSON文件")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help="比较两个JSON结果文件")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="回归阈值（相对变化，默认0.10即慢10%%）")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    sys.exit(run(args))
+
+if __name__ == '__main__':
+    main()
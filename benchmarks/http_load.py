@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP负载测试
+
+在临时数据库上启动本地服务（app.py 或 simple_app.py），按请求组合并发回放：
+  scenarios - test_scenarios.py 中三个核心场景的AI对话消息
+  crud      - 新增员工与修改员工部门
+  list      - 员工列表
+  stats     - 统计信息与部门列表（simple_app.py 没有这两个接口，自动跳过）
+报告每个接口的请求数、错误数、每秒请求数以及 p50/p95/p99 延迟，可写入JSON用于回归对比。
+
+用法：
+    python benchmarks/http_load.py --target app --concurrency 16 --ramp-up 2 --duration 20
+    python benchmarks/http_load.py --target simple --mix scenarios,list --mode asyncio --json result.json
+"""
+
+import argparse
+import asyncio
+import http.client
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from intent_corpus import scenario_corpus
+
+SURNAMES = '张李王赵孙周吴郑冯陈'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚'
+DEPARTMENTS = ('技术部', '市场部', '人事部', '财务部', '行政部')
+
+# 各请求组合包含的操作；操作名同时作为报告中的接口名
+MIXES = {
+    'scenarios': ('chat.query', 'chat.create', 'chat.update'),
+    'crud': ('employees.create', 'employees.update'),
+    'list': ('employees.list',),
+    'stats': ('stats', 'departments'),
+}
+# simple_app.py 未提供的接口
+SIMPLE_UNSUPPORTED = {'stats', 'departments'}
+# 等待服务启动的最长秒数
+SERVER_START_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 30.0
+
+def seed_database(db_path, rows):
+    """创建数据库并写入示例数据及rows名随机员工"""
+    sys.path.insert(0, os.path.join(ROOT, 'backend'))
+    import database
+    database.DB_PATH = db_path
+    database.init_database()
+    database.insert_sample_data()
+    employees = [
+        (line_no, f"{SURNAMES[line_no % len(SURNAMES)]}{GIVEN_NAMES[line_no % len(GIVEN_NAMES)]}{line_no}",
+         None, DEPARTMENTS[line_no % len(DEPARTMENTS)], f"load{line_no}@company.com", '在职')
+        for line_no in range(rows)
+    ]
+    database.execute_write(database.bulk_insert_employees, employees)
+    return database
+
+def serve(target, db_path, rows, port):
+    """在当前进程中初始化临时数据库并启动服务（由负载测试以子进程方式调用）"""
+    database = seed_database(db_path, rows)
+    if target == 'simple':
+        import simple_app as server_module
+        server_module.DB_PATH = database.DB_PATH
+    else:
+        import app as server_module
+
+    from werkzeug.serving import make_server
+    make_server('127.0.0.1', port, server_module.app, threaded=True).serve_forever()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(target, rows):
+    """以子进程启动服务，返回 (进程, API基础URL)"""
+    port = free_port()
+    db_path = os.path.join(tempfile.mkdtemp(), 'load.db')
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', '--target', target,
+         '--db', db_path, '--rows', str(rows), '--port', str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}/api"
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"服务进程退出，返回码 {process.returncode}")
+        try:
+            status, _ = http_request(base_url, 'GET', '/health')
+            if status == 200:
+                return process, base_url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("等待服务启动超时")
+
+def http_request(base_url, method, path, body=None, connection=None):
+    """发送一个请求，返回 (状态码, 响应体)；connection为可复用的HTTPConnection"""
+    url = urlsplit(base_url)
+    conn = connection or http.client.HTTPConnection(url.hostname, url.port, timeout=REQUEST_TIMEOUT)
+    headers = {'Accept-Encoding': 'gzip'}
+    payload = None
+    if body is not None:
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    try:
+        conn.request(method, url.path + path, body=payload, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        if response.will_close:
+            conn.close()
+        return response.status, data
+    finally:
+        if connection is None:
+            conn.close()
+
+def fetch_employee_ids(base_url, target):
+    """读取服务中现有员工的id，修改员工时从中随机选取"""
+    path = '/employees' if target == 'simple' else '/employees?fields=id'
+    with urllib.request.urlopen(base_url + path, timeout=REQUEST_TIMEOUT) as response:
+        body = json.load(response)
+    return [employee['id'] for employee in body['data']['employees']]
+
+class Workload:
+    """按请求组合生成请求 (操作名, 方法, 路径, 请求体)
+
+    employee_ids为修改员工时可选的id，请求组合包含 employees.update 时必须非空。
+    """
+
+    def __init__(self, mixes, target, employee_ids, seed):
+        self.target = target
+        self.employee_ids = employee_ids
+        self.operations = [
+            operation for mix in mixes for operation in MIXES[mix]
+            if not (target == 'simple' and operation in SIMPLE_UNSUPPORTED)
+        ]
+        if not self.operations:
+            raise ValueError("所选请求组合在该服务上没有可执行的接口")
+        if 'employees.update' in self.operations and not employee_ids:
+            raise ValueError("服务中没有员工，无法执行 employees.update")
+        self.messages = {'query': [], 'create': [], 'update': []}
+        for message, intent in scenario_corpus():
+            self.messages[intent].append(message)
+        self._seed = seed
+        self._counter = itertools.count()
+        self._local = threading.local()
+
+    def _random(self):
+        # 每个线程独立的随机数生成器，结果可复现且无需加锁
+        rng = getattr(self._local, 'rng', None)
+        if rng is None:
+            rng = self._local.rng = random.Random(f"{self._seed}-{threading.get_ident()}")
+        return rng
+
+    def next_request(self):
+        rng = self._random()
+        operation = rng.choice(self.operations)
+        unique = next(self._counter)
+
+        if operation.startswith('chat.'):
+            message = rng.choice(self.messages[operation.split('.')[1]])
+            return operation, 'POST', '/ai/chat', {'message': message}
+        if operation == 'employees.create':
+            return operation, 'POST', '/employees', {
+                'name': f"压测{unique}", 'department': rng.choice(DEPARTMENTS)
+            }
+        if operation == 'employees.update':
+            return operation, 'PUT', f"/employees/{rng.choice(self.employee_ids)}", {
+                'department': rng.choice(DEPARTMENTS)
+            }
+        if operation == 'employees.list':
+            department = rng.choice(DEPARTMENTS)
+            if self.target == 'simple':
+                return operation, 'GET', '/employees', None
+            return operation, 'GET', '/employees?' + urlencode({'department': department, 'limit': 50}), None
+        if operation == 'stats':
+            return operation, 'GET', '/stats', None
+        return operation, 'GET', '/departments', None
+
+class Recorder:
+    """记录每个请求的开始时间、延迟和结果"""
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def record(self, operation, started, latency, ok):
+        with self._lock:
+            self.samples.append((operation, started, latency, ok))
+
+def percentile(sorted_values, fraction):
+    """最近秩法百分位"""
+    if not sorted_values:
+        return None
+    # 先舍去浮点误差（如 0.07 * 100 = 7.000000000000001）再向上取整
+    rank = max(1, math.ceil(round(fraction * len(sorted_values), 9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(samples, window):
+    """汇总测量窗口内的样本"""
+    latencies = sorted(latency for _, _, latency, _ in samples)
+    errors = sum(1 for _, _, _, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': len(samples) / window if window > 0 else 0.0,
+        'p50_ms': _ms(percentile(latencies, 0.50)),
+        'p95_ms': _ms(percentile(latencies, 0.95)),
+        'p99_ms': _ms(percentile(latencies, 0.99)),
+        'max_ms': _ms(latencies[-1] if latencies else None),
+    }
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+def run_threads(base_url, workload, recorder, concurrency, ramp_up, stop_at):
+    """线程模式：每个线程一个连接，按ramp-up依次启动"""
+    start = time.monotonic()
+
+    def worker(index):
+        time.sleep(ramp_up * index / concurrency)
+        url = urlsplit(base_url)
+        connection = http.client.HTTPConnection(url.hostname, url.port, timeout=REQUEST_TIMEOUT)
+        while time.monotonic() < stop_at:
+            operation, method, path, body = workload.next_request()
+            started = time.monotonic()
+            try:
+                status, _ = http_request(base_url, method, path, body, connection)
+                ok = status < 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                ok = False
+            recorder.record(operation, started - start, time.monotonic() - started, ok)
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+async def async_http_request(base_url, method, path, body=None):
+    """asyncio模式的最小HTTP/1.1客户端（每个请求一个连接），返回状态码"""
+    url = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    try:
+        payload = b''
+        if body is not None:
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        head = (f"{method} {url.path}{path} HTTP/1.1\r\nHost: {url.hostname}:{url.port}\r\n"
+                f"Accept-Encoding: gzip\r\nConnection: close\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n")
+        writer.write(head.encode('ascii') + payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+async def run_asyncio(base_url, workload, recorder, concurrency, ramp_up, stop_at):
+    """asyncio模式：concurrency个协程并发发送请求"""
+    start = time.monotonic()
+
+    async def worker(index):
+        await asyncio.sleep(ramp_up * index / concurrency)
+        while time.monotonic() < stop_at:
+            operation, method, path, body = workload.next_request()
+            started = time.monotonic()
+            try:
+                status = await asyncio.wait_for(async_http_request(base_url, method, path, body), REQUEST_TIMEOUT)
+                ok = status < 400
+            except (OSError, ValueError, IndexError, asyncio.TimeoutError):
+                ok = False
+            recorder.record(operation, started - start, time.monotonic() - started, ok)
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+
+def main():
+    parser = argparse.ArgumentParser(description="HR系统HTTP负载测试")
+    parser.add_argument('--target', choices=('app', 'simple'), default='app', help="被测服务")
+    parser.add_argument('--mix', default='scenarios,crud,list,stats',
+                        help=f"请求组合，逗号分隔，可选 {', '.join(MIXES)}")
+    parser.add_argument('--mode', choices=('threads', 'asyncio'), default='threads', help="并发方式")
+    parser.add_argument('--concurrency', type=int, default=8, help="并发数")
+    parser.add_argument('--ramp-up', type=float, default=1.0, help="逐个启动全部并发所用秒数，期间的请求不计入结果")
+    parser.add_argument('--duration', type=float, default=10.0, help="测量时长（秒，不含ramp-up）")
+    parser.add_argument('--rows', type=int, default=1000, help="临时数据库中的种子员工数")
+    parser.add_argument('--seed', type=int, default=42, help="请求序列的随机种子")
+    parser.add_argument('--base-url', help="使用已在运行的本地服务（不启动子进程，不写入种子数据）")
+    parser.add_argument('--json', dest='json_path', help="将结果写入JSON文件")
+    # 以下参数供负载测试启动服务子进程时使用
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.target, args.db, args.rows, args.port)
+        return
+
+    mixes = [mix.strip() for mix in args.mix.split(',') if mix.strip()]
+    unknown = [mix for mix in mixes if mix not in MIXES]
+    if unknown:
+        parser.error(f"未知的请求组合: {', '.join(unknown)}")
+    if args.base_url and urlsplit(args.base_url).hostname not in ('127.0.0.1', 'localhost'):
+        parser.error("只允许对本地服务进行负载测试")
+
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        print(f"启动 {args.target} 服务（种子员工 {args.rows} 名）...")
+        process, base_url = start_server(args.target, args.rows)
+
+    try:
+        employee_ids = fetch_employee_ids(base_url, args.target) if 'crud' in mixes else []
+        workload = Workload(mixes, args.target, employee_ids, args.seed)
+        recorder = Recorder()
+        stop_at = time.monotonic() + args.ramp_up + args.duration
+        print(f"{args.mode} 模式，并发 {args.concurrency}，ramp-up {args.ramp_up}s，测量 {args.duration}s")
+        if args.mode == 'asyncio':
+            asyncio.run(run_asyncio(base_url, workload, recorder, args.concurrency, args.ramp_up, stop_at))
+        else:
+            run_threads(base_url, workload, recorder, args.concurrency, args.ramp_up, stop_at)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    # 只统计ramp-up结束后开始的请求
+    measured = [sample for sample in recorder.samples if sample[1] >= args.ramp_up]
+    report = {
+        'config': {
+            'target': args.target, 'mix': mixes, 'mode': args.mode, 'concurrency': args.concurrency,
+            'ramp_up': args.ramp_up, 'duration': args.duration, 'rows': args.rows, 'seed': args.seed,
+        },
+        'total': summarize(measured, args.duration),
+        'endpoints': {
+            operation: summarize([sample for sample in measured if sample[0] == operation], args.duration)
+            for operation in sorted({sample[0] for sample in measured})
+        },
+    }
+
+    print(f"{'接口':<18}{'请求数':>8}{'错误':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, result in list(report['endpoints'].items()) + [('合计', report['total'])]:
+        print(f"{name:<18}{result['requests']:>10}{result['errors']:>8}{result['rps']:>9.1f}"
+              f"{result['p50_ms'] or 0:>9.1f}{result['p95_ms'] or 0:>9.1f}{result['p99_ms'] or 0:>9.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
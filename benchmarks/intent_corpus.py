@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+意图识别语料基准测试
+
+语料由 AIService.get_help_message() 中的示例与 test_scenarios.py 中三个场景的
+测试消息构建，另补充若干变体和无关消息；报告意图准确率、实体准确率、
+每秒处理消息数以及各意图的平均匹配耗时。
+
+用法：
+    python benchmarks/intent_corpus.py --iterations 2000
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from ai_service import AIService
+from intent_engine import IntentEngine
+
+# 帮助信息中各小节标题对应的意图
+HELP_SECTION_INTENTS = {'查询': 'query', '新增': 'create', '修改': 'update'}
+
+# test_scenarios.py 中场景函数对应的意图
+SCENARIO_INTENTS = {
+    'test_scenario_1_query': 'query',
+    'test_scenario_2_create': 'create',
+    'test_scenario_3_update': 'update',
+}
+
+# 人工标注的实体
+EXPECTED_ENTITIES = {
+    '查询张三的人事账号': {'name': '张三'},
+    '搜索李四的信息': {'name': '李四'},
+    '找王五的资料': {'name': '王五'},
+    '新增一个员工王小敏，部门是市场部': {'name': '王小敏', 'department': '市场部'},
+    '添加员工赵六到技术部': {'name': '赵六', 'department': '技术部'},
+    '创建员工孙七，部门财务部': {'name': '孙七', 'department': '财务部'},
+    '把李四的部门改为行政部': {'name': '李四', 'department': '行政部'},
+    '修改张三的部门为人事部': {'name': '张三', 'department': '人事部'},
+    '将王五调到市场部': {'name': '王五', 'department': '市场部'},
+}
+
+# 补充的变体与无关消息
+EXTRA_CORPUS = [
+    ('查询一下员工李四', 'query', {'name': '李四'}),
+    ('张三的信息', 'query', {'name': '张三'}),
+    ('新增员工王小敏部门是市场部', 'create', {'name': '王小敏', 'department': '市场部'}),
+    ('把孙七调到技术部', 'update', {'name': '孙七', 'department': '技术部'}),
+    # 原正则版本支持、省略"员工"或以"在哪个部门"提问的说法
+    ('添加赵六到技术部', 'create', {'name': '赵六', 'department': '技术部'}),
+    ('新增赵六，部门技术部', 'create', {'name': '赵六', 'department': '技术部'}),
+    ('张三在哪个部门', 'query', {'name': '张三'}),
+    ('李四是什么部门的', 'query', {'name': '李四'}),
+    ('你好', 'unknown', {}),
+    ('今天天气怎么样', 'unknown', {}),
+]
+
+def help_corpus():
+    """从帮助信息中按小节提取示例消息"""
+    corpus = []
+    intent = None
+    for line in AIService().get_help_message().splitlines():
+        for keyword, section_intent in HELP_SECTION_INTENTS.items():
+            if line.startswith(tuple('🔍➕✏')) and keyword in line:
+                intent = section_intent
+        example = re.search(r'"([^"]+)"', line)
+        if example and intent:
+            corpus.append((example.group(1), intent))
+    return corpus
+
+def scenario_corpus():
+    """从test_scenarios.py的场景函数中提取test_messages（静态解析，不导入）"""
+    with open(os.path.join(ROOT, 'test_scenarios.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    corpus = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in SCENARIO_INTENTS:
+            for stmt in ast.walk(node):
+                if isinstance(stmt, ast.Assign) and any(
+                    isinstance(target, ast.Name) and target.id == 'test_messages' for target in stmt.targets
+                ):
+                    corpus.extend((message, SCENARIO_INTENTS[node.name]) for message in ast.literal_eval(stmt.value))
+    return corpus
+
+def build_corpus():
+    """合并并去重，返回 (消息, 意图, 实体或None) 列表"""
+    corpus = {}
+    for message, intent in help_corpus() + scenario_corpus():
+        corpus[message] = (intent, EXPECTED_ENTITIES.get(message))
+    for message, intent, entities in EXTRA_CORPUS:
+        corpus[message] = (intent, entities)
+    return [(message, intent, entities) for message, (intent, entities) in corpus.items()]
+
+def main():
+    parser = argparse.ArgumentParser(description="意图识别语料基准测试")
+    parser.add_argument('--iterations', type=int, default=2000, help="语料重复执行的轮数")
+    parser.add_argument('--json', dest='json_path', help="将结果写入JSON文件")
+    args = parser.parse_args()
+    
+    corpus = build_corpus()
+    engine = IntentEngine()
+    
+    failures = []
+    intent_correct = 0
+    entity_checked = 0
+    entity_correct = 0
+    for message, intent, entities in corpus:
+        result = engine.match(message)
+        if result['intent'] == intent:
+            intent_correct += 1
+        if entities is not None:
+            entity_checked += 1
+            if result['intent'] == intent and result['entities'] == entities:
+                entity_correct += 1
+        if result['intent'] != intent or (entities is not None and result['entities'] != entities):
+            failures.append({'message': message, 'expected': [intent, entities], 'actual': result})
+    
+    # 吞吐量测试使用新的引擎实例，避免准确率阶段的计时混入
+    engine = IntentEngine()
+    messages = [message for message, _, _ in corpus]
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        for message in messages:
+            engine.match(message)
+    elapsed = time.perf_counter() - start
+    
+    report = {
+        'corpus_size': len(corpus),
+        'intent_accuracy': intent_correct / len(corpus),
+        'entity_accuracy': entity_correct / entity_checked if entity_checked else None,
+        'messages_per_second': args.iterations * len(messages) / elapsed,
+        'per_intent_timing': engine.timing_stats(),
+        'failures': failures,
+    }
+    
+    print(f"语料条数: {report['corpus_size']}")
+    print(f"意图准确率: {report['intent_accuracy']:.1%}")
+    if report['entity_accuracy'] is not None:
+        print(f"实体准确率: {report['entity_accuracy']:.1%}（{entity_checked} 条标注）")
+    print(f"吞吐量: {report['messages_per_second']:.0f} 条/秒")
+    for intent, timing in report['per_intent_timing'].items():
+        print(f"  {intent:<7} 尝试 {timing['attempts']:>8}  匹配 {timing['matches']:>8}  平均 {timing['avg_us']:.2f} µs")
+    for failure in failures:
+        print(f"❌ {failure['message']}: 期望 {failure['expected']}，实际 {failure['actual']}")
+    
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+测试公用夹具：每个测试使用独立的临时数据库
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+import database
+
+# 测试结束后仍在运行的后台线程（如快照重建）会读取DB_PATH，
+# 在整个会话期间把它指向临时目录，避免触碰仓库中的数据库文件
+database.DB_PATH = os.path.join(tempfile.mkdtemp(), 'hr.db')
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """包含5条示例数据的临时数据库"""
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'hr.db'))
+    database.init_database(verbose=False)
+    database.insert_sample_data()
+    return database
+
+@pytest.fixture
+def client(db):
+    """app.py 的Flask测试客户端"""
+    import app
+    return app.app.test_client()
@@ -2,14 +2,74 @@
 const API_BASE_URL = 'http://localhost:9000/api';
 let currentEmployees = [];
 let currentEditingEmployee = null;
+// 事件流连接及是否已建立（建立后由服务器推送变更，不再重复请求列表和统计）
+let eventSource = null;
+let liveUpdates = false;
 
 // 页面加载完成后初始化
 document.addEventListener('DOMContentLoaded', function() {
     loadEmployees();
     loadDepartments();
     loadStatistics();
+    connectEvents();
 });
 
+// 订阅后端的员工变更事件流（后端不支持时保持原来的手动刷新）
+function connectEvents() {
+    if (!window.EventSource) return;
+    
+    eventSource = new EventSource(`${API_BASE_URL}/events`);
+    
+    eventSource.onopen = function() {
+        if (liveUpdates) {
+            // 断线重连期间可能漏掉事件，重新加载一次
+            loadEmployees();
+            loadStatistics();
+        }
+        liveUpdates = true;
+    };
+    
+    eventSource.onerror = function() {
+        if (!liveUpdates) {
+            eventSource.close();
+            eventSource = null;
+        }
+    };
+    
+    ['employee.created', 'employee.updated', 'employee.status_changed'].forEach(type => {
+        eventSource.addEventListener(type, event => applyEmployeeEvent(JSON.parse(event.data)));
+    });
+    eventSource.addEventListener('employee.deleted', event => removeEmployee(JSON.parse(event.data).id));
+    eventSource.addEventListener('resync', () => {
+        loadEmployees();
+        loadStatistics();
+    });
+    eventSource.addEventListener('stats', event => displayStatistics(JSON.parse(event.data).stats));
+}
+
+// 将推送的员工记录合并到当前列表并按当前筛选条件重新显示
+// 更新事件只包含变化的字段，合并到已有记录；列表中没有的员工只在新增时加入
+function applyEmployeeEvent(data) {
+    const employee = data.employee;
+    const index = currentEmployees.findIndex(emp => emp.id === employee.id);
+    if (index >= 0) {
+        currentEmployees[index] = { ...currentEmployees[index], ...employee };
+    } else if (!data.changed) {
+        currentEmployees.unshift(employee);
+    } else {
+        return;
+    }
+    searchEmployees();
+}
+
+// 从当前列表中移除被删除的员工
+function removeEmployee(id) {
+    const index = currentEmployees.findIndex(emp => emp.id === id);
+    if (index < 0) return;
+    currentEmployees.splice(index, 1);
+    searchEmployees();
+}
+
 // 标签切换功能
 function showTab(tabName) {
     // 隐藏所有标签内容
@@ -26,7 +86,8 @@ function showTab(tabName) {
     // 激活对应的标签按钮
     event.target.classList.add('active');
     
-    // 根据标签加载相应数据
+    // 根据标签加载相应数据（已连接事件流时数据由服务器推送，无需重新请求）
+    if (liveUpdates) return;
     if (tabName === 'employee-list') {
         loadEmployees();
     } else if (tabName === 'statistics') {
@@ -281,7 +342,7 @@ async function addEmployee(event) {
         if (response.success) {
             showMessage(response.message, 'success');
             document.getElementById('addEmployeeForm').reset();
-            loadEmployees(); // 刷新员工列表
+            if (!liveUpdates) loadEmployees(); // 未连接事件流时手动刷新员工列表
         } else {
             showMessage(response.message, 'error');
         }
@@ -343,7 +404,7 @@ async function updateEmployee(event) {
         if (response.success) {
             showMessage(response.message, 'success');
             closeEditModal();
-            loadEmployees(); // 刷新员工列表
+            if (!liveUpdates) loadEmployees(); // 未连接事件流时手动刷新员工列表
         } else {
             showMessage(response.message, 'error');
         }
@@ -369,7 +430,7 @@ async function deleteEmployee(employeeId, employeeName) {
         
         if (response.success) {
             showMessage(response.message, 'success');
-            loadEmployees(); // 刷新员工列表
+            if (!liveUpdates) loadEmployees(); // 未连接事件流时手动刷新员工列表
         } else {
             showMessage(response.message, 'error');
         }
@@ -386,15 +447,7 @@ async function loadStatistics() {
         const response = await apiRequest('/stats');
         
         if (response.success) {
-            const stats = response.data.stats;
-            
-            // 更新统计卡片
-            document.getElementById('totalEmployees').textContent = stats.total_employees;
-            document.getElementById('activeEmployees').textContent = stats.active_employees;
-            document.getElementById('inactiveEmployees').textContent = stats.inactive_employees;
-            
-            // 更新部门统计图表
-            displayDepartmentChart(stats.department_stats);
+            displayStatistics(response.data.stats);
         } else {
             showMessage(response.message, 'error');
         }
@@ -403,6 +456,16 @@ async function loadStatistics() {
     }
 }
 
+function displayStatistics(stats) {
+    // 更新统计卡片
+    document.getElementById('totalEmployees').textContent = stats.total_employees;
+    document.getElementById('activeEmployees').textContent = stats.active_employees;
+    document.getElementById('inactiveEmployees').textContent = stats.inactive_employees;
+    
+    // 更新部门统计图表
+    displayDepartmentChart(stats.department_stats);
+}
+
 function displayDepartmentChart(departmentStats) {
     const chartContainer = document.getElementById('departmentChart');
     chartContainer.innerHTML = '';
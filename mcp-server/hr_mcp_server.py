@@ -6,44 +6,191 @@ HR系统MCP服务器
 """
 
 import asyncio
+import importlib
+import importlib.util
 import json
 import sys
 import os
-import sqlite3
-import requests
+import time
 from typing import Any, Dict, List, Optional
 
-# 添加父目录到路径，以便导入backend模块
+_STARTED_AT = time.perf_counter()
+
+# 添加父目录到路径，以便导入backend模块；后端模块之间以顶层模块名互相导入，
+# backend目录本身也要加入路径
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend'))
+
+# 只含常量的轻量模块，生成工具列表不需要导入数据库模块
+from employee_schema import EMPLOYEE_FIELDS, SEARCH_LIMIT
+
+# 只探测MCP库是否存在，真正导入推迟到启动完整服务器时
+MCP_AVAILABLE = importlib.util.find_spec("mcp") is not None
+
+class LazyModule:
+    """首次访问属性时才导入的模块代理"""
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+    
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+    
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# 后端数据库模块：第一次调用工具时才导入并初始化
+db = LazyModule("backend.database")
+# 员工目录快照，按工号查找时优先走内存映射
+directory = LazyModule("backend.directory_snapshot")
+_employee_directory = None
+
+# 写工具：批量调用时在同一个事务中执行
+WRITE_TOOLS = ("create_employee", "update_employee")
+# 批量调用单次最多包含的调用数
+BATCH_MAX_CALLS = 50
 
-try:
-    from mcp.server.models import InitializationOptions
-    from mcp.server import NotificationOptions, Server
-    from mcp.types import (
-        Resource,
-        Tool,
-        TextContent,
-        ImageContent,
-        EmbeddedResource,
-        LoggingLevel
-    )
-    MCP_AVAILABLE = True
-except ImportError:
-    print("MCP库未安装，将使用简化版本")
-    MCP_AVAILABLE = False
+# 查询类工具共用的参数定义
+FIELDS_PROPERTY = {
+    "type": "array",
+    "items": {"type": "string", "enum": list(EMPLOYEE_FIELDS)},
+    "description": "只返回指定字段（可选，默认返回全部字段）"
+}
+SUMMARY_PROPERTY = {
+    "type": "boolean",
+    "description": "只返回计数统计，不返回员工明细（可选）"
+}
 
-from backend.database import execute_query, get_connection
+def setup_database():
+    """导入后端数据库模块并确保表结构存在（首次调用工具时执行）"""
+    db.init_database(verbose=False)
 
-# 后端API基础URL
-API_BASE_URL = "http://localhost:5000/api"
+def fetch_employees_by_employee_ids(employee_ids: List[str]) -> List[Dict[str, Any]]:
+    """按工号批量读取员工：目录快照与数据库一致时直接查快照，否则执行一次IN查询"""
+    global _employee_directory
+    if _employee_directory is None:
+        _employee_directory = directory.EmployeeDirectory(db)
+    snapshot = _employee_directory.fresh()
+    if snapshot is not None:
+        employees = (snapshot.by_employee_id(employee_id) for employee_id in employee_ids)
+        return [employee for employee in employees if employee is not None]
+    if not employee_ids:
+        return []
+    placeholders = ', '.join('?' * len(employee_ids))
+    return db.execute_query(f"SELECT * FROM employee WHERE employee_id IN ({placeholders})", employee_ids)
+
+def encode_result(result: Dict[str, Any]) -> str:
+    """将工具结果编码为紧凑JSON"""
+    return json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+
+class BatchWriteAborted(Exception):
+    """批量写入中有调用失败，整个写事务回滚"""
+    
+    def __init__(self, results):
+        super().__init__(results[-1]["message"])
+        self.results = results
+
+def create_employee_job(conn, name: str, department: str, employee_id: str,
+                        hr_account: str = None) -> Dict[str, Any]:
+    """写任务：创建员工（查重、插入、回读在同一个事务内完成）"""
+    if not hr_account:
+        hr_account = f"{name.lower()}@company.com"
+    
+    new_employee = db.insert_employee(conn, name, employee_id, department, hr_account)
+    if new_employee is None:
+        return {
+            "success": False,
+            "message": f"工号 {employee_id} 已存在"
+        }
+    
+    return {
+        "success": True,
+        "message": f"员工 {name} 创建成功",
+        "data": {"employee": new_employee}
+    }
+
+def update_employee_job(conn, name: str, **kwargs) -> Dict[str, Any]:
+    """写任务：按姓名更新员工信息（查找、更新、回读在同一个事务内完成）"""
+    employees = db.rows_to_dicts(conn.execute("SELECT * FROM employee WHERE name = ?", (name,)))
+    
+    if not employees:
+        return {
+            "success": False,
+            "message": f"未找到员工 {name}"
+        }
+    
+    if len(employees) > 1:
+        return {
+            "success": False,
+            "message": f"找到多个名为 {name} 的员工，请提供更具体的信息",
+            "data": {"employees": employees}
+        }
+    
+    # 筛选允许更新的字段
+    allowed_fields = ['department', 'hr_account', 'status']
+    fields = {field: kwargs[field] for field in allowed_fields if kwargs.get(field)}
+    
+    if not fields:
+        return {
+            "success": False,
+            "message": "没有提供有效的更新字段"
+        }
+    
+    updated_employee = db.update_employee_fields(conn, employees[0]['id'], fields)
+    return {
+        "success": True,
+        "message": f"员工 {name} 信息更新成功",
+        "data": {"employee": updated_employee}
+    }
+
+def batch_write_job(conn, ops) -> List[Dict[str, Any]]:
+    """写任务：按顺序执行多个写调用，任一失败则抛出异常使整个事务回滚"""
+    results = []
+    for job, kwargs in ops:
+        result = job(conn, **kwargs)
+        results.append(result)
+        if not result["success"]:
+            raise BatchWriteAborted(results)
+    return results
 
 class HRMCPServer:
     """HR系统MCP服务器"""
     
     def __init__(self):
         if MCP_AVAILABLE:
+            from mcp.server import Server
             self.server = Server("hr-assistant")
         self.tools = self._register_tools()
+        self._db_ready = False
+        self._db_lock = asyncio.Lock()
+        self.handlers = {
+            "search_employee": lambda args: self.search_employee(
+                args["name"],
+                args.get("limit", SEARCH_LIMIT),
+                args.get("cursor"),
+                args.get("fields"),
+                args.get("summary", False)
+            ),
+            "get_employee_by_id": lambda args: self.get_employee_by_id(args["employee_id"], args.get("fields")),
+            "get_employees_by_ids": lambda args: self.get_employees_by_ids(args["employee_ids"], args.get("fields")),
+            "create_employee": lambda args: self.create_employee(**args),
+            "update_employee": lambda args: self.update_employee(**args),
+            "list_employees": lambda args: self.list_employees(
+                args.get("department"),
+                args.get("status"),
+                args.get("limit"),
+                args.get("cursor"),
+                args.get("include_total", False),
+                args.get("fields"),
+                args.get("summary", False)
+            ),
+            "get_departments": lambda args: self.get_departments(),
+            "batch": lambda args: self.batch(args["calls"]),
+        }
     
     def _register_tools(self):
         """注册工具函数"""
@@ -57,7 +204,17 @@ class HRMCPServer:
                         "name": {
                             "type": "string",
                             "description": "员工姓名（支持部分匹配）"
-                        }
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": f"每页最多返回的员工数（可选，默认{SEARCH_LIMIT}）"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "上一页返回的next_cursor（可选）"
+                        },
+                        "fields": FIELDS_PROPERTY,
+                        "summary": SUMMARY_PROPERTY
                     },
                     "required": ["name"]
                 }
@@ -71,11 +228,28 @@ class HRMCPServer:
                         "employee_id": {
                             "type": "string",
                             "description": "员工工号，如EMP001"
-                        }
+                        },
+                        "fields": FIELDS_PROPERTY
                     },
                     "required": ["employee_id"]
                 }
             },
+            "get_employees_by_ids": {
+                "name": "get_employees_by_ids",
+                "description": "根据多个工号一次性获取员工详细信息",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "employee_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "员工工号列表，如[\"EMP001\", \"EMP002\"]"
+                        },
+                        "fields": FIELDS_PROPERTY
+                    },
+                    "required": ["employee_ids"]
+                }
+            },
             "create_employee": {
                 "name": "create_employee",
                 "description": "创建新员工记录",
@@ -141,7 +315,21 @@ class HRMCPServer:
                         "status": {
                             "type": "string",
                             "description": "员工状态：在职或离职（可选）"
-                        }
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "每页最多返回的员工数（可选，不提供则返回全部）"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "上一页返回的next_cursor（可选）"
+                        },
+                        "include_total": {
+                            "type": "boolean",
+                            "description": "是否返回匹配总数（可选）"
+                        },
+                        "fields": FIELDS_PROPERTY,
+                        "summary": SUMMARY_PROPERTY
                     }
                 }
             },
@@ -152,14 +340,54 @@ class HRMCPServer:
                     "type": "object",
                     "properties": {}
                 }
+            },
+            "batch": {
+                "name": "batch",
+                "description": "批量执行多个工具调用：相邻的只读调用并发执行，相邻的写调用"
+                               "（create_employee/update_employee）在同一个事务中原子执行，任一失败则整组回滚",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "calls": {
+                            "type": "array",
+                            "description": f"按顺序执行的工具调用列表（最多{BATCH_MAX_CALLS}个，不能嵌套batch）",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "tool": {
+                                        "type": "string",
+                                        "description": "工具名称"
+                                    },
+                                    "arguments": {
+                                        "type": "object",
+                                        "description": "工具参数"
+                                    }
+                                },
+                                "required": ["tool"]
+                            }
+                        }
+                    },
+                    "required": ["calls"]
+                }
             }
         }
         return tools
     
-    async def search_employee(self, name: str) -> Dict[str, Any]:
+    async def search_employee(self, name: str, limit: int = SEARCH_LIMIT, cursor: str = None,
+                              fields: List[str] = None, summary: bool = False) -> Dict[str, Any]:
         """搜索员工"""
         try:
-            employees = execute_query("SELECT * FROM employee WHERE name LIKE ? ORDER BY name", (f"%{name}%",))
+            if summary:
+                count = await db.async_db.call(db.count_search_matches, name)
+                return {
+                    "success": count > 0,
+                    "message": f"姓名包含'{name}'的员工共 {count} 名",
+                    "data": {"total": count}
+                }
+            
+            fields = db.parse_fields(fields)
+            page = await db.async_db.call(db.fetch_search_page, name, limit, cursor, fields)
+            employees = page['employees']
             
             if not employees:
                 return {
@@ -171,7 +399,7 @@ class HRMCPServer:
             return {
                 "success": True,
                 "message": f"找到 {len(employees)} 名员工",
-                "data": {"employees": employees}
+                "data": {"employees": employees, "next_cursor": page['next_cursor']}
             }
         except Exception as e:
             return {
@@ -180,10 +408,12 @@ class HRMCPServer:
                 "data": {"employees": []}
             }
     
-    async def get_employee_by_id(self, employee_id: str) -> Dict[str, Any]:
+    async def get_employee_by_id(self, employee_id: str, fields: List[str] = None) -> Dict[str, Any]:
         """根据工号获取员工信息"""
         try:
-            employees = execute_query("SELECT * FROM employee WHERE employee_id = ?", (employee_id,))
+            fields = db.parse_fields(fields)
+            employees = await db.async_db.call(fetch_employees_by_employee_ids, [employee_id])
+            employees = db.project_rows(employees, fields)
             
             if not employees:
                 return {
@@ -202,46 +432,41 @@ class HRMCPServer:
                 "message": f"查询失败: {str(e)}"
             }
     
-    async def create_employee(self, name: str, department: str, employee_id: str = None, hr_account: str = None) -> Dict[str, Any]:
-        """创建新员工"""
+    async def get_employees_by_ids(self, employee_ids: List[str], fields: List[str] = None) -> Dict[str, Any]:
+        """根据多个工号获取员工信息（目录快照或一次IN查询）"""
         try:
-            # 如果没有提供工号，自动生成
-            if not employee_id:
-                result = execute_query("SELECT employee_id FROM employee WHERE employee_id LIKE 'EMP%' ORDER BY employee_id DESC LIMIT 1")
-                if result:
-                    last_id = result[0]['employee_id']
-                    num = int(last_id[3:]) + 1
-                    employee_id = f"EMP{num:03d}"
-                else:
-                    employee_id = "EMP001"
+            fields = db.parse_fields(fields)
+            employee_ids = list(dict.fromkeys(employee_ids))
+            employees = await db.async_db.call(fetch_employees_by_employee_ids, employee_ids)
             
-            # 如果没有提供HR账号，自动生成
-            if not hr_account:
-                hr_account = f"{name.lower()}@company.com"
+            by_id = {emp['employee_id']: emp for emp in employees}
+            missing = [employee_id for employee_id in employee_ids if employee_id not in by_id]
             
-            # 检查工号是否已存在
-            existing = execute_query("SELECT id FROM employee WHERE employee_id = ?", (employee_id,))
-            if existing:
-                return {
-                    "success": False,
-                    "message": f"工号 {employee_id} 已存在"
+            return {
+                "success": bool(by_id),
+                "message": f"找到 {len(by_id)} 名员工" + (f"，未找到: {', '.join(missing)}" if missing else ""),
+                "data": {
+                    "employees": db.project_rows(
+                        [by_id[employee_id] for employee_id in employee_ids if employee_id in by_id], fields
+                    ),
+                    "missing": missing
                 }
-            
-            # 插入新员工
-            sql = """
-                INSERT INTO employee (name, employee_id, department, hr_account, status)
-                VALUES (?, ?, ?, ?, '在职')
-            """
-            execute_query(sql, (name, employee_id, department, hr_account))
-            
-            # 获取新创建的员工信息
-            new_employee = execute_query("SELECT * FROM employee WHERE employee_id = ?", (employee_id,))
-            
+            }
+        except Exception as e:
             return {
-                "success": True,
-                "message": f"员工 {name} 创建成功",
-                "data": {"employee": new_employee[0]}
+                "success": False,
+                "message": f"查询失败: {str(e)}",
+                "data": {"employees": [], "missing": []}
             }
+    
+    async def create_employee(self, name: str, department: str, employee_id: str = None, hr_account: str = None) -> Dict[str, Any]:
+        """创建新员工"""
+        try:
+            # 如果没有提供工号，自动生成
+            if not employee_id:
+                employee_id = await db.async_db.call(db.next_employee_id)
+            
+            return await db.async_db.write(create_employee_job, name, department, employee_id, hr_account)
         except Exception as e:
             return {
                 "success": False,
@@ -251,65 +476,19 @@ class HRMCPServer:
     async def update_employee(self, name: str, **kwargs) -> Dict[str, Any]:
         """更新员工信息"""
         try:
-            # 先查找员工
-            employees = execute_query("SELECT * FROM employee WHERE name = ?", (name,))
-            
-            if not employees:
-                return {
-                    "success": False,
-                    "message": f"未找到员工 {name}"
-                }
-            
-            if len(employees) > 1:
-                return {
-                    "success": False,
-                    "message": f"找到多个名为 {name} 的员工，请提供更具体的信息",
-                    "data": {"employees": employees}
-                }
-            
-            employee = employees[0]
-            emp_id = employee['id']
-            
-            # 构建更新语句
-            update_fields = []
-            params = []
-            
-            allowed_fields = ['department', 'hr_account', 'status']
-            for field in allowed_fields:
-                if field in kwargs and kwargs[field]:
-                    update_fields.append(f"{field} = ?")
-                    params.append(kwargs[field])
-            
-            if not update_fields:
-                return {
-                    "success": False,
-                    "message": "没有提供有效的更新字段"
-                }
-            
-            # 添加更新时间
-            update_fields.append("updated_at = CURRENT_TIMESTAMP")
-            params.append(emp_id)
-            
-            sql = f"UPDATE employee SET {', '.join(update_fields)} WHERE id = ?"
-            execute_query(sql, params)
-            
-            # 获取更新后的员工信息
-            updated_employee = execute_query("SELECT * FROM employee WHERE id = ?", (emp_id,))
-            
-            return {
-                "success": True,
-                "message": f"员工 {name} 信息更新成功",
-                "data": {"employee": updated_employee[0]}
-            }
+            return await db.async_db.write(update_employee_job, name, **kwargs)
         except Exception as e:
             return {
                 "success": False,
                 "message": f"更新失败: {str(e)}"
             }
     
-    async def list_employees(self, department: str = None, status: str = None) -> Dict[str, Any]:
+    async def list_employees(self, department: str = None, status: str = None, limit: int = None,
+                             cursor: str = None, include_total: bool = False,
+                             fields: List[str] = None, summary: bool = False) -> Dict[str, Any]:
         """获取员工列表"""
         try:
+            fields = db.parse_fields(fields)
             conditions = []
             params = []
             
@@ -322,14 +501,23 @@ class HRMCPServer:
                 params.append(status)
             
             where_clause = " AND ".join(conditions) if conditions else "1=1"
-            sql = f"SELECT * FROM employee WHERE {where_clause} ORDER BY created_at DESC"
             
-            employees = execute_query(sql, params)
+            if summary:
+                counts = await db.async_db.call(db.summarize_employees, where_clause, params)
+                return {
+                    "success": True,
+                    "message": f"查询成功，共有 {counts['total']} 名员工",
+                    "data": counts
+                }
+            
+            page = await db.async_db.call(db.fetch_employee_page, where_clause, params, limit=limit,
+                                       cursor=cursor, include_total=include_total, fields=fields)
+            count = page.get('total', len(page['employees']))
             
             return {
                 "success": True,
-                "message": f"查询成功，共找到 {len(employees)} 名员工",
-                "data": {"employees": employees}
+                "message": f"查询成功，共找到 {count} 名员工",
+                "data": page
             }
         except Exception as e:
             return {
@@ -341,8 +529,7 @@ class HRMCPServer:
     async def get_departments(self) -> Dict[str, Any]:
         """获取部门列表"""
         try:
-            departments = execute_query("SELECT DISTINCT department FROM employee WHERE status = '在职' ORDER BY department")
-            dept_list = [dept['department'] for dept in departments]
+            dept_list = await db.async_db.call(db.fetch_departments)
             
             return {
                 "success": True,
@@ -356,28 +543,105 @@ class HRMCPServer:
                 "data": {"departments": []}
             }
     
+    async def batch(self, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """批量执行工具调用
+
+        按顺序把调用划分为连续的只读段和写段：只读段内并发执行；
+        写段在写线程的一个事务中执行，任一写调用失败则该段全部回滚。
+        """
+        if not isinstance(calls, list) or not calls:
+            return {"success": False, "message": "请提供调用列表calls"}
+        if len(calls) > BATCH_MAX_CALLS:
+            return {"success": False, "message": f"单次最多批量执行 {BATCH_MAX_CALLS} 个调用"}
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        segments = []
+        for index, call in enumerate(calls):
+            tool = call.get("tool") if isinstance(call, dict) else None
+            if tool == "batch" or tool not in self.handlers:
+                results[index] = {"success": False, "message": f"未知的工具: {tool}"}
+                continue
+            is_write = tool in WRITE_TOOLS
+            if segments and segments[-1][0] == is_write:
+                segments[-1][1].append(index)
+            else:
+                segments.append((is_write, [index]))
+        
+        for is_write, indexes in segments:
+            if is_write:
+                await self._run_write_segment(calls, indexes, results)
+            else:
+                segment_results = await asyncio.gather(*(
+                    self.handle_tool_call(calls[index]["tool"], calls[index].get("arguments") or {})
+                    for index in indexes
+                ))
+                for index, result in zip(indexes, segment_results):
+                    results[index] = result
+        
+        succeeded = sum(1 for result in results if result["success"])
+        return {
+            "success": succeeded == len(calls),
+            "message": f"批量执行 {len(calls)} 个调用，成功 {succeeded} 个",
+            "data": {"results": [
+                {"tool": call.get("tool") if isinstance(call, dict) else None, "result": result}
+                for call, result in zip(calls, results)
+            ]}
+        }
+    
+    async def _run_write_segment(self, calls, indexes, results):
+        """在一个事务中执行一组写调用"""
+        ops = []
+        try:
+            for index in indexes:
+                arguments = dict(calls[index].get("arguments") or {})
+                if calls[index]["tool"] == "create_employee":
+                    if not arguments.get("employee_id"):
+                        arguments["employee_id"] = await db.async_db.call(db.next_employee_id)
+                    ops.append((create_employee_job, arguments))
+                else:
+                    ops.append((update_employee_job, arguments))
+            
+            for index, result in zip(indexes, await db.async_db.write(batch_write_job, ops)):
+                results[index] = result
+        except BatchWriteAborted as e:
+            failed_at = len(e.results) - 1
+            for position, index in enumerate(indexes):
+                if position == failed_at:
+                    results[index] = e.results[failed_at]
+                else:
+                    results[index] = {
+                        "success": False,
+                        "message": f"同一事务中的调用失败，已回滚: {e}"
+                    }
+        except Exception as e:
+            for index in indexes:
+                results[index] = {"success": False, "message": f"批量写入失败: {str(e)}"}
+    
+    async def ensure_database(self):
+        """数据库初始化推迟到第一次调用工具，列出工具时不触碰数据库"""
+        if self._db_ready:
+            return
+        async with self._db_lock:
+            if not self._db_ready:
+                await asyncio.get_running_loop().run_in_executor(None, setup_database)
+                self._db_ready = True
+    
     async def handle_tool_call(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """处理工具调用"""
-        if tool_name == "search_employee":
-            return await self.search_employee(arguments["name"])
-        elif tool_name == "get_employee_by_id":
-            return await self.get_employee_by_id(arguments["employee_id"])
-        elif tool_name == "create_employee":
-            return await self.create_employee(**arguments)
-        elif tool_name == "update_employee":
-            return await self.update_employee(**arguments)
-        elif tool_name == "list_employees":
-            return await self.list_employees(
-                arguments.get("department"),
-                arguments.get("status")
-            )
-        elif tool_name == "get_departments":
-            return await self.get_departments()
-        else:
+        handler = self.handlers.get(tool_name)
+        if handler is None:
             return {
                 "success": False,
                 "message": f"未知的工具: {tool_name}"
             }
+        try:
+            await self.ensure_database()
+            return await handler(arguments)
+        except (KeyError, TypeError) as e:
+            return {
+                "success": False,
+                "message": f"参数错误: {str(e)}"
+            }
 
 # 简化版本的MCP服务器（当MCP库不可用时）
 class SimplifiedHRServer:
@@ -442,38 +706,103 @@ class SimplifiedHRServer:
         print("  create_employee {\"name\": \"新员工\", \"department\": \"技术部\"}")
         print("  update_employee {\"name\": \"张三\", \"department\": \"新部门\"}")
         print("  list_employees {\"department\": \"技术部\"}")
+        print("  list_employees {\"limit\": 20, \"fields\": [\"name\", \"employee_id\"]}")
+        print("  list_employees {\"summary\": true}")
         print("  get_departments")
+        print("  get_employees_by_ids {\"employee_ids\": [\"EMP001\", \"EMP002\"]}")
+        print("  batch {\"calls\": [{\"tool\": \"search_employee\", \"arguments\": {\"name\": \"张三\"}}]}")
+
+_MODULE_LOADED_AT = time.perf_counter()
+
+def use_scratch_database(database):
+    """把DB_PATH指向默认数据库的临时副本，返回副本所在的临时目录
+
+    只在 --import-profile 时使用，相关标准库在这里才导入，不拖慢正常启动。
+    """
+    import sqlite3
+    import tempfile
+    scratch_path = os.path.join(tempfile.mkdtemp(), os.path.basename(database.DB_PATH))
+    if os.path.exists(database.DB_PATH):
+        source = sqlite3.connect(f"file:{database.DB_PATH}?mode=ro", uri=True)
+        target = sqlite3.connect(scratch_path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+    database.DB_PATH = scratch_path
+    return os.path.dirname(scratch_path)
+
+def import_profile():
+    """输出冷启动各阶段耗时（写到stderr），用于排查启动变慢
+
+    数据库初始化在默认数据库的临时副本上执行，不修改原数据库。
+    """
+    stages = [("模块加载", _MODULE_LOADED_AT - _STARTED_AT)]
+    
+    def measure(label, func):
+        start = time.perf_counter()
+        result = func()
+        stages.append((label, time.perf_counter() - start))
+        return result
+    
+    if MCP_AVAILABLE:
+        measure("导入MCP SDK", lambda: (importlib.import_module("mcp.server"), importlib.import_module("mcp.types")))
+    server = measure("创建服务器和工具列表", HRMCPServer)
+    ready_for_list_tools = sum(seconds for _, seconds in stages)
+    database = measure("导入backend.database", lambda: importlib.import_module("backend.database"))
+    scratch_dir = use_scratch_database(database)
+    try:
+        measure("初始化数据库（首次调用工具时，临时副本）", setup_database)
+    finally:
+        import shutil
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    
+    for label, seconds in stages:
+        print(f"{seconds * 1000:8.1f} ms  {label}", file=sys.stderr)
+    print(f"{ready_for_list_tools * 1000:8.1f} ms  可响应list_tools", file=sys.stderr)
+    print(f"{sum(seconds for _, seconds in stages) * 1000:8.1f} ms  合计", file=sys.stderr)
+    print(f"工具数: {len(server.tools)}", file=sys.stderr)
 
 async def main():
     """主函数"""
     if MCP_AVAILABLE:
+        from mcp.types import Tool, TextContent
+        
         # 使用完整的MCP服务器
         server = HRMCPServer()
         
+        # 工具列表在启动时构建一次，之后每次list_tools直接返回
+        tool_list = [
+            Tool(
+                name=tool_info["name"],
+                description=tool_info["description"],
+                inputSchema=tool_info["inputSchema"]
+            )
+            for tool_info in server.tools.values()
+        ]
+        
         # 注册工具
         @server.server.list_tools()
         async def handle_list_tools() -> List[Tool]:
-            return [
-                Tool(
-                    name=tool_info["name"],
-                    description=tool_info["description"],
-                    inputSchema=tool_info["inputSchema"]
-                )
-                for tool_info in server.tools.values()
-            ]
+            return tool_list
         
         @server.server.call_tool()
         async def handle_call_tool(name: str, arguments: dict) -> List[TextContent]:
             result = await server.handle_tool_call(name, arguments)
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+            return [TextContent(type="text", text=encode_result(result))]
         
         # 运行服务器
         async with server.server.run_stdio():
             await asyncio.Event().wait()
     else:
         # 使用简化版本
+        print("MCP库未安装，将使用简化版本")
         server = SimplifiedHRServer()
         await server.run_interactive()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if "--import-profile" in sys.argv[1:]:
+        import_profile()
+    else:
+        asyncio.run(main())
\ No newline at end of file
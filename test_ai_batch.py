@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI批量对话测试：结果与逐条处理一致，后面的查询能看到前面的写入
+
+    python -m pytest test_ai_batch.py
+"""
+
+import asyncio
+
+import pytest
+
+from ai_service import AIService
+from gazetteer import Gazetteer
+
+def run_batch(messages):
+    return asyncio.run(AIService(Gazetteer()).process_batch(messages))
+
+def run_sequential(messages):
+    service = AIService(Gazetteer())
+
+    async def run():
+        return [await service.process_message(message) for message in messages]
+    return asyncio.run(run())
+
+def test_query_sees_earlier_create_and_update(db):
+    responses = run_batch(['新增一个员工王小敏，部门是市场部', '把王小敏的部门改为行政部', '查询王小敏'])
+    assert responses[0].startswith('员工创建成功')
+    assert "从'市场部'修改为'行政部'" in responses[1]
+    assert '王小敏' in responses[2] and '行政部' in responses[2]
+
+def test_query_sees_earlier_update_of_known_employee(db):
+    responses = run_batch(['查询李四', '把李四的部门改为行政部', '查询李四'])
+    assert '行政部' not in responses[0]
+    assert '行政部' in responses[2]
+
+@pytest.mark.parametrize('messages', [
+    ['查询张三', '把张三的部门改为财务部', '查询张三', '添加赵六到技术部', '张三在哪个部门', '查询赵六'],
+    ['今天天气怎么样', '新增赵六，部门技术部', '把赵六的部门改为人事部', '查询赵六', '把赵六的部门改为财务部'],
+])
+def test_batch_matches_sequential_processing(db, tmp_path, monkeypatch, messages):
+    batch = run_batch(messages)
+    # 在同样初始数据的另一个数据库上逐条处理
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'sequential.db'))
+    db.init_database(verbose=False)
+    db.insert_sample_data()
+    assert batch == run_sequential(messages)
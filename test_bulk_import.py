@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入测试（临时数据库，无需启动服务）
+
+    python -m pytest test_bulk_import.py
+"""
+
+import json
+
+import database
+
+def employee_ids():
+    return [row['employee_id'] for row in database.execute_query("SELECT employee_id FROM employee ORDER BY id")]
+
+def test_auto_id_skips_id_provided_in_same_chunk(db):
+    """自动分配的工号不能与同一块中显式提供的工号冲突"""
+    rows = [
+        (1, '甲', 'EMP006', '技术部', 'jia@company.com', '在职'),
+        (2, '乙', None, '技术部', 'yi@company.com', '在职'),
+    ]
+    inserted, errors = db.execute_write(db.bulk_insert_employees, rows)
+    assert (inserted, errors) == (2, [])
+    assert employee_ids()[-2:] == ['EMP006', 'EMP007']
+
+def test_duplicate_ids_are_row_errors(db):
+    """已存在及块内重复的工号记为该行错误，其余行照常写入"""
+    rows = [
+        (1, '甲', 'EMP001', '技术部', 'jia@company.com', '在职'),
+        (2, '乙', 'EMP100', '技术部', 'yi@company.com', '在职'),
+        (3, '丙', 'EMP100', '技术部', 'bing@company.com', '在职'),
+        (4, '丁', None, '技术部', 'ding@company.com', '在职'),
+    ]
+    inserted, errors = db.execute_write(db.bulk_insert_employees, rows)
+    assert inserted == 2
+    assert [error['line'] for error in errors] == [1, 3]
+
+def test_constraint_failure_falls_back_to_row_inserts(db):
+    """整块违反约束时逐行插入，只有违反约束的行失败"""
+    rows = [
+        (1, '甲', 'EMP200', '技术部', 'jia@company.com', '在职'),
+        (2, None, 'EMP201', '技术部', 'yi@company.com', '在职'),
+        (3, '丙', 'EMP202', '技术部', 'bing@company.com', '在职'),
+    ]
+    inserted, errors = db.execute_write(db.bulk_insert_employees, rows)
+    assert inserted == 2
+    assert [error['line'] for error in errors] == [2]
+    assert employee_ids()[-2:] == ['EMP200', 'EMP202']
+
+def test_bulk_endpoint_reports_row_errors(client):
+    """CSV导入：校验失败、工号重复的行报告行号，其余行导入成功"""
+    body = '\n'.join([
+        'name,employee_id,department,status',
+        '甲,EMP006,技术部,在职',
+        '乙,,技术部,在职',
+        ',EMP300,技术部,在职',
+        '丁,EMP001,技术部,在职',
+        '戊,EMP301,技术部,休假',
+    ])
+    response = client.post('/api/employees/bulk', data=body.encode('utf-8'), content_type='text/csv')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert (data['total'], data['inserted'], data['failed']) == (5, 2, 3)
+    assert [error['line'] for error in data['errors']] == [4, 5, 6]
+    assert 'EMP007' in employee_ids()
+
+def test_bulk_endpoint_ndjson_parse_errors(client):
+    """NDJSON导入：无法解析的行和非对象行记为错误"""
+    lines = [json.dumps({'name': '甲', 'department': '技术部'}, ensure_ascii=False), '{bad json', '[1, 2]']
+    response = client.post('/api/employees/bulk', data='\n'.join(lines).encode('utf-8'),
+                           content_type='application/x-ndjson')
+    data = response.get_json()['data']
+    assert (data['inserted'], data['failed']) == (1, 2)
+    assert [error['line'] for error in data['errors']] == [2, 3]
+
+def test_bulk_endpoint_rejects_unknown_content_type(client):
+    response = client.post('/api/employees/bulk', data=b'{}', content_type='application/json')
+    assert response.status_code == 415
+
+def test_bulk_endpoint_reports_failed_chunk(client, monkeypatch):
+    """某个块写入失败时返回已插入的行数，失败块的行记为错误"""
+    import app
+    original = app.bulk_insert_employees
+    calls = []
+
+    def flaky(conn, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("磁盘已满")
+        return original(conn, rows)
+
+    monkeypatch.setattr(app, 'bulk_insert_employees', flaky)
+    monkeypatch.setattr(app, 'BULK_CHUNK_SIZE', 2)
+    body = 'name,department\n' + '\n'.join(f'员工{i},技术部' for i in range(5))
+    response = client.post('/api/employees/bulk', data=body.encode('utf-8'), content_type='text/csv')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert (data['inserted'], data['failed']) == (3, 2)
+    assert [error['line'] for error in data['errors']] == [4, 5]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+变更日志与 /api/changes 长轮询测试
+
+    python -m pytest test_changes.py
+"""
+
+import threading
+import time
+
+def write(db, sql, params=()):
+    db.execute_write(lambda conn: conn.execute(sql, params))
+
+def test_changes_are_merged_per_employee(db):
+    since = db.latest_change_seq()
+    db.execute_write(db.insert_employee, '甲', 'EMP100', '技术部', 'jia@company.com')
+    write(db, "UPDATE employee SET department = '财务部' WHERE employee_id = 'EMP100'")
+    write(db, "UPDATE employee SET status = '离职' WHERE employee_id = 'EMP001'")
+    write(db, "UPDATE employee SET department = '行政部' WHERE employee_id = 'EMP001'")
+    write(db, "DELETE FROM employee WHERE employee_id = 'EMP002'")
+
+    result = db.fetch_changes(since)
+    assert not result['reset']
+    assert result['next_since'] == db.latest_change_seq()
+    by_id = {change['id']: change for change in result['changes']}
+    assert by_id[6]['op'] == 'insert' and by_id[6]['employee']['department'] == '财务部'
+    assert by_id[1]['op'] == 'update' and by_id[1]['changed'] == ['status', 'department']
+    assert set(by_id[1]['employee']) == {'status', 'department', 'updated_at'}
+    assert by_id[2] == {'op': 'delete', 'id': 2, 'seq': result['next_since']}
+
+def test_cursor_newer_than_latest_resets(db):
+    result = db.fetch_changes(db.latest_change_seq() + 100)
+    assert result == {'changes': [], 'next_since': db.latest_change_seq(), 'reset': True}
+
+def test_cursor_older_than_retained_window_resets(db):
+    since = db.latest_change_seq()
+    for department in ('财务部', '行政部', '人事部', '市场部'):
+        write(db, "UPDATE employee SET department = ? WHERE id = 1", (department,))
+    assert db.execute_write(db.compact_changes, 2) == since + 2
+    assert db.execute_query("SELECT COUNT(*) AS count FROM employee_changes")[0]['count'] == 2
+
+    assert db.fetch_changes(since)['reset']
+    # 紧挨着保留窗口之前的游标仍然有效
+    result = db.fetch_changes(db.latest_change_seq() - 2)
+    assert not result['reset'] and result['changes'][0]['employee']['department'] == '市场部'
+
+def test_trigger_trims_changelog(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'trim.db'))
+    monkeypatch.setattr(db, 'CHANGELOG_RETAIN', 3)
+    monkeypatch.setattr(db, 'CHANGELOG_TRIM_EVERY', 5)
+    db.init_database(verbose=False)
+    for i in range(10):
+        db.execute_write(db.insert_employee, f'员工{i}', f'EMP{100 + i}', '技术部', f'e{i}@company.com')
+    seqs = [row['seq'] for row in db.execute_query("SELECT seq FROM employee_changes ORDER BY seq")]
+    assert seqs == [8, 9, 10]
+
+def test_endpoint_without_since_returns_latest(client, db):
+    data = client.get('/api/changes').get_json()['data']
+    assert data == {'changes': [], 'next_since': db.latest_change_seq(), 'reset': False}
+
+def test_endpoint_long_poll_times_out_empty(client, db):
+    since = db.latest_change_seq()
+    started = time.monotonic()
+    data = client.get('/api/changes', query_string={'since': since, 'timeout': 0.3}).get_json()['data']
+    assert time.monotonic() - started >= 0.3
+    assert data == {'changes': [], 'next_since': since, 'reset': False}
+
+def test_endpoint_long_poll_wakes_on_write(client, db):
+    since = db.latest_change_seq()
+    timer = threading.Timer(0.2, write, (db, "UPDATE employee SET status = '休假' WHERE id = 3"))
+    timer.start()
+    started = time.monotonic()
+    data = client.get('/api/changes', query_string={'since': since, 'timeout': 10}).get_json()['data']
+    timer.join()
+    assert time.monotonic() - started < 5
+    assert [(change['op'], change['id']) for change in data['changes']] == [('update', 3)]
+
+def test_endpoint_reports_reset(client, db):
+    data = client.get('/api/changes', query_string={'since': db.latest_change_seq() + 1}).get_json()['data']
+    assert data['reset']
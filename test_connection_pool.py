@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连接池测试：并发借还、池耗尽超时、DB_PATH变化时重建
+
+    python -m pytest test_connection_pool.py
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from database import ConnectionPool
+
+def test_concurrent_checkout_never_shares_connection(db):
+    pool = ConnectionPool(db.DB_PATH, size=3)
+    in_use = set()
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        for _ in range(20):
+            with pool.connection() as conn:
+                with lock:
+                    if id(conn) in in_use:
+                        errors.append(id(conn))
+                    in_use.add(id(conn))
+                conn.execute("SELECT COUNT(*) FROM employee").fetchone()
+                with lock:
+                    in_use.discard(id(conn))
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = pool.stats()
+    assert stats['acquired'] == 240
+    assert stats['created'] <= 3
+    assert stats['in_use'] == 0 and stats['idle'] == stats['created']
+    assert stats['timeouts'] == 0
+    pool.close_all()
+
+def test_exhausted_pool_times_out(db):
+    pool = ConnectionPool(db.DB_PATH, size=2, timeout=0.1)
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+    assert pool.stats()['in_use'] == 2
+
+    # 等待中的请求在连接归还后拿到该连接
+    pool.timeout = 5
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    threading.Timer(0.1, pool.release, (held[0],)).start()
+    waiter.join()
+    assert acquired == [held[0]]
+    assert pool.stats()['waited'] == 1
+    pool.release(held[1])
+    pool.release(acquired[0])
+    pool.close_all()
+
+def test_release_rolls_back_open_transaction(db):
+    pool = ConnectionPool(db.DB_PATH, size=1)
+    conn = pool.acquire()
+    conn.execute("UPDATE employee SET status = '离职' WHERE id = 1")
+    assert conn.in_transaction
+    pool.release(conn)
+
+    with pool.connection() as again:
+        assert again is conn and not again.in_transaction
+        assert again.execute("SELECT status FROM employee WHERE id = 1").fetchone()[0] == '在职'
+    pool.close_all()
+
+def test_closed_pool_discards_returned_connections(db):
+    pool = ConnectionPool(db.DB_PATH, size=2)
+    conn = pool.acquire()
+    pool.close_all()
+    pool.release(conn)
+    assert pool.stats()['created'] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+def test_pool_rebuilt_when_db_path_changes(db, tmp_path, monkeypatch):
+    pool = db.get_pool()
+    assert db.get_pool() is pool
+    with db.pooled_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM employee").fetchone()[0] == 5
+
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'other.db'))
+    db.init_database(verbose=False)
+    rebuilt = db.get_pool()
+    assert rebuilt is not pool and rebuilt.db_path == db.DB_PATH
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    with db.pooled_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM employee").fetchone()[0] == 0
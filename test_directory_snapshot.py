@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+员工目录快照测试
+
+    python -m pytest test_directory_snapshot.py
+"""
+
+import os
+
+import pytest
+
+import directory_snapshot
+from directory_snapshot import EmployeeDirectory, snapshot_path
+
+def test_snapshot_matches_database(db):
+    """快照查找结果与SQL一致"""
+    # 不让fresh()安排的后台重建在测试结束、DB_PATH恢复后才执行
+    directory = EmployeeDirectory(db, rebuild_delay=3600)
+    assert directory.fresh() is None
+    assert directory.rebuild()
+    snapshot = directory.fresh()
+    assert snapshot is not None
+    for row in db.execute_query("SELECT * FROM employee"):
+        assert snapshot.by_id(row['id']) == row
+        assert snapshot.by_employee_id(row['employee_id']) == row
+        assert row in snapshot.by_name(row['name'])
+
+def test_stale_snapshot_is_not_used(db):
+    """写入后旧快照不再返回"""
+    directory = EmployeeDirectory(db, rebuild_delay=3600)
+    directory.rebuild()
+    db.execute_write(db.insert_employee, '甲', 'EMP100', '技术部', None)
+    assert directory.fresh() is None
+
+def test_failed_write_removes_temp_file(db, tmp_path, monkeypatch):
+    """写入失败时不留下临时文件"""
+    def fail_replace(src, dst):
+        raise OSError("模拟替换失败")
+
+    monkeypatch.setattr(directory_snapshot.os, 'replace', fail_replace)
+    with pytest.raises(OSError):
+        EmployeeDirectory(db).rebuild()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    assert not os.path.exists(snapshot_path(db.DB_PATH))
+
+def test_rebuild_failure_logs_to_stderr(db, monkeypatch, capsys):
+    """后台重建失败只写stderr，不污染stdout（MCP协议通道）"""
+    directory = EmployeeDirectory(db, rebuild_delay=0)
+
+    def fail():
+        raise RuntimeError("模拟重建失败")
+
+    monkeypatch.setattr(directory, 'rebuild', fail)
+    directory._delayed_rebuild()
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert '模拟重建失败' in captured.err
+
+def test_snapshot_of_recreated_database_is_not_used(db, tmp_path, monkeypatch):
+    """数据库删除重建后，残留的旧快照即使版本号相同也不会被使用"""
+    db.execute_write(lambda conn: conn.execute("UPDATE employee SET department = '部2' WHERE id = 1"))
+    old_directory = EmployeeDirectory(db, rebuild_delay=3600)
+    assert old_directory.rebuild()
+    old_version = db.get_employee_version()
+
+    # 在新路径上重建数据库，并把旧库的快照文件留在原处
+    new_path = str(tmp_path / 'recreated' / 'hr.db')
+    os.makedirs(os.path.dirname(new_path))
+    os.replace(snapshot_path(db.DB_PATH), snapshot_path(new_path))
+    monkeypatch.setattr(db, 'DB_PATH', new_path)
+    db.init_database(verbose=False)
+    db.insert_sample_data()
+    db.execute_write(lambda conn: conn.execute("UPDATE employee SET name = '新库员工' WHERE id = 1"))
+    assert db.get_employee_version() == old_version
+
+    directory = EmployeeDirectory(db, rebuild_delay=3600)
+    assert directory.fresh() is None
+    assert directory.rebuild()
+    assert directory.fresh().by_id(1)['name'] == '新库员工'
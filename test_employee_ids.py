@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工号分配测试（临时数据库，无需启动服务）
+
+    python -m pytest test_employee_ids.py
+"""
+
+import database
+
+def sequence_value():
+    return database.execute_query("SELECT value FROM id_sequence WHERE name = 'employee'")[0]['value']
+
+def test_sequence_seeded_from_existing_ids(db):
+    """init_database按已有最大工号初始化序列"""
+    assert sequence_value() == 5
+    assert db.next_employee_id() == 'EMP006'
+
+def test_reserve_does_not_rescan_employee_table(db):
+    """预留工号只更新序列表，不再按employee表重新计算"""
+    db.execute_write(db._execute_statement,
+                     "INSERT INTO employee (name, employee_id, department) VALUES ('甲', 'EMP050', '技术部')", None)
+    assert db.execute_write(db.reserve_employee_ids, 10) == 6
+
+def test_explicit_id_advances_sequence(db):
+    """显式工号写入后序列不小于该工号"""
+    db.execute_write(db.insert_employee, '甲', 'EMP040', '技术部', None)
+    assert sequence_value() == 40
+    db.execute_write(db.insert_employee, '乙', 'X-1', '技术部', None)
+    assert sequence_value() == 40
+
+def test_explicit_id_inside_current_block_is_skipped(db):
+    """显式使用了本进程当前块中的工号后，自动分配跳过它"""
+    assert db.next_employee_id() == 'EMP006'
+    db.execute_write(db.insert_employee, '甲', 'EMP007', '技术部', None)
+    assert db.next_employee_id() == 'EMP008'
+
+def test_auto_create_after_explicit_ids(client):
+    """API先显式指定工号，之后不指定工号的新增不会报工号已存在"""
+    response = client.post('/api/employees', json={'name': '甲', 'employee_id': 'EMP006', 'department': '技术部'})
+    assert response.status_code == 201
+    response = client.post('/api/employees', json={'name': '乙', 'department': '技术部'})
+    assert response.status_code == 201
+    assert response.get_json()['data']['employee']['employee_id'] == 'EMP007'
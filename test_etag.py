@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+条件GET与gzip响应测试
+
+    python -m pytest test_etag.py
+"""
+
+import sqlite3
+
+def test_conditional_get(client):
+    etag = client.get('/api/employees').headers['ETag']
+    assert client.get('/api/employees', headers={'If-None-Match': etag}).status_code == 304
+    client.post('/api/employees', json={'name': '甲', 'department': '技术部'})
+    assert client.get('/api/employees', headers={'If-None-Match': etag}).status_code == 200
+
+def test_version_lookup_failure_skips_etag(client, monkeypatch):
+    """读取版本号失败时返回不带ETag的正常响应，而不是500"""
+    import app
+
+    def fail():
+        raise sqlite3.OperationalError("no such table: table_version")
+
+    monkeypatch.setattr(app, 'get_employee_version', fail)
+    response = client.get('/api/employees', headers={'If-None-Match': '"get_employees-1"'})
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    assert client.get('/api/stats').status_code == 200
+
+def test_gzip_etag_requires_accept_encoding(client):
+    """gzip表示的ETag只在请求仍接受gzip时才能得到304"""
+    for i in range(20):
+        client.post('/api/employees', json={'name': f'员工{i}', 'department': '技术部'})
+    response = client.get('/api/employees', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    etag = response.headers['ETag']
+    assert etag.endswith('-gzip"')
+    assert client.get('/api/employees', headers={'If-None-Match': etag,
+                                                 'Accept-Encoding': 'gzip'}).status_code == 304
+    response = client.get('/api/employees', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
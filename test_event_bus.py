@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事件总线测试：变更日志中的写入（包括其他进程的写入）推送给订阅者
+
+    python -m pytest test_event_bus.py
+"""
+
+import sqlite3
+
+from event_bus import EventBus, ChangeFeed, change_events
+
+def drain(subscription):
+    events = []
+    while True:
+        item = subscription.get(timeout=0)
+        if item is None:
+            return events
+        events.append(item)
+
+def test_other_process_writes_are_published(db):
+    """通过独立连接（如simple_app、MCP服务器）写入的变更也会发布"""
+    bus = EventBus()
+    subscription = bus.subscribe()
+    feed = ChangeFeed(bus)
+    since = db.latest_change_seq()
+
+    conn = sqlite3.connect(db.DB_PATH)
+    with conn:
+        conn.execute("UPDATE employee SET status = '离职' WHERE employee_id = 'EMP001'")
+        conn.execute("UPDATE employee SET department = '行政部' WHERE employee_id = 'EMP002'")
+        conn.execute("DELETE FROM employee WHERE employee_id = 'EMP003'")
+    conn.close()
+
+    assert feed.poll(since) == db.latest_change_seq()
+    events = drain(subscription)
+    assert [event for _, event, _ in events] == [
+        'employee.status_changed', 'employee.updated', 'employee.deleted', 'stats'
+    ]
+    assert events[0][2] == {'employee': {'id': 1, 'status': '离职', 'updated_at': events[0][2]['employee']['updated_at']},
+                            'changed': ['status']}
+    assert events[2][2] == {'id': 3}
+    assert events[3][2]['stats']['total_employees'] == 4
+
+def test_large_batch_publishes_resync(db):
+    """一批变更超过上限时只推送resync"""
+    bus = EventBus()
+    subscription = bus.subscribe()
+    feed = ChangeFeed(bus, max_events=2)
+    since = db.latest_change_seq()
+    db.execute_write(lambda conn: conn.execute("UPDATE employee SET status = '休假'"))
+
+    assert feed.poll(since) == db.latest_change_seq()
+    assert [event for _, event, _ in drain(subscription)] == ['resync']
+
+def test_change_events_mapping():
+    changes = [
+        {'op': 'insert', 'id': 7, 'seq': 10, 'employee': {'id': 7, 'name': '甲'}, 'changed': None},
+        {'op': 'update', 'id': 8, 'seq': 11, 'employee': {'name': '乙'}, 'changed': ['name']},
+        {'op': 'delete', 'id': 9, 'seq': 12, 'changed': None},
+    ]
+    assert change_events(changes) == [
+        (10, 'employee.created', {'employee': {'id': 7, 'name': '甲'}}),
+        (11, 'employee.updated', {'employee': {'name': '乙', 'id': 8}, 'changed': ['name']}),
+        (12, 'employee.deleted', {'id': 9}),
+    ]
+
+def test_subscriber_limit():
+    bus = EventBus(max_subscribers=1)
+    first = bus.subscribe()
+    assert first is not None
+    assert bus.subscribe() is None
+    bus.unsubscribe(first)
+    assert bus.subscribe() is not None
+    assert bus.stats()['rejected'] == 1
+
+def test_events_endpoint_rejects_when_full(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app.event_bus, 'max_subscribers', 0)
+    response = client.get('/api/events')
+    assert response.status_code == 503
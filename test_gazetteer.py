@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+姓名/部门词典测试：按变更日志增量同步
+
+    python -m pytest test_gazetteer.py
+"""
+
+from gazetteer import Gazetteer
+
+def insert(db, name, employee_id, department='技术部'):
+    db.execute_write(lambda conn: conn.execute(
+        "INSERT INTO employee (name, employee_id, department, hr_account, status) VALUES (?, ?, ?, ?, '在职')",
+        (name, employee_id, department, f'{employee_id.lower()}@company.com')
+    ))
+
+def test_inserts_are_applied_incrementally(db, monkeypatch):
+    gazetteer = Gazetteer()
+    gazetteer.refresh()
+    assert gazetteer.find_names("张三和李四") == ['张三', '李四']
+
+    reloads = []
+    original = gazetteer._full_reload
+    monkeypatch.setattr(gazetteer, '_full_reload', lambda: (reloads.append(1), original()))
+    insert(db, '欧阳明', 'EMP100', '法务部')
+    gazetteer.refresh()
+    assert reloads == []
+    assert gazetteer.first("欧阳明去法务部", 'name') == '欧阳明'
+    assert gazetteer.find_departments("欧阳明去法务部") == ['法务部']
+
+def test_renames_and_deletes_reload_counts(db):
+    gazetteer = Gazetteer()
+    insert(db, '张三', 'EMP100')
+    gazetteer.refresh()
+
+    db.execute_write(lambda conn: conn.execute("UPDATE employee SET name = '张三丰' WHERE employee_id = 'EMP001'"))
+    gazetteer.refresh()
+    assert gazetteer.find_names("张三") == ['张三']
+    assert gazetteer.find_names("张三丰") == ['张三丰']
+
+    db.execute_write(lambda conn: conn.execute("DELETE FROM employee WHERE employee_id = 'EMP100'"))
+    gazetteer.refresh()
+    assert gazetteer.find_names("张三") == []
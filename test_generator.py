@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成员工数据生成测试
+
+    python -m pytest test_generator.py
+"""
+
+import pytest
+
+import database
+
+def generate(monkeypatch, path, rows, seed):
+    monkeypatch.setattr(database, 'DB_PATH', str(path))
+    database.generate_employees(rows, seed, batch_size=300, verbose=False)
+    return database.execute_query("SELECT * FROM employee ORDER BY id")
+
+def test_same_seed_same_data(tmp_path, monkeypatch):
+    """相同种子生成完全相同的数据（包括时间戳）"""
+    first = generate(monkeypatch, tmp_path / 'a.db', 1000, 7)
+    second = generate(monkeypatch, tmp_path / 'b.db', 1000, 7)
+    assert first == second
+    assert first != generate(monkeypatch, tmp_path / 'c.db', 1000, 8)
+
+def test_generated_data_is_consistent(tmp_path, monkeypatch):
+    """生成后派生表、序列和触发器都与数据一致"""
+    rows = generate(monkeypatch, tmp_path / 'hr.db', 1000, 1)
+    assert len({row['employee_id'] for row in rows}) == 1000
+    assert all(row['created_at'] <= row['updated_at'] for row in rows)
+    stats = database.execute_query("SELECT SUM(count) AS total FROM department_stats")[0]['total']
+    assert stats == 1000
+    assert database.next_employee_id() == 'EMP1001'
+    # 触发器已恢复：之后的写入进入变更日志
+    database.execute_write(database.insert_employee, '甲', 'X-1', '技术部', None)
+    assert database.latest_change_seq() == 1
+
+def test_refuses_default_database(monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', database.DEFAULT_DB_PATH)
+    with pytest.raises(ValueError):
+        database.generate_employees(10)
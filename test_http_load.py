@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP负载测试工具的单元测试：百分位计算与修改员工的id选取
+
+    python -m pytest test_http_load.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from http_load import Workload, percentile
+
+@pytest.mark.parametrize('fraction, expected', [(0.50, 50), (0.95, 95), (0.99, 99), (0.07, 7), (0.001, 1), (1.0, 100)])
+def test_percentile_nearest_rank(fraction, expected):
+    assert percentile(list(range(1, 101)), fraction) == expected
+
+def test_percentile_small_samples():
+    assert percentile([], 0.5) is None
+    assert percentile([10, 20], 0.5) == 10
+    assert percentile([10, 20, 30, 40], 0.5) == 20
+
+def test_update_uses_fetched_ids():
+    workload = Workload(['crud'], 'app', [17, 42], seed=1)
+    paths = {path for operation, _, path, _ in (workload.next_request() for _ in range(50))
+             if operation == 'employees.update'}
+    assert paths == {'/employees/17', '/employees/42'}
+
+def test_update_requires_ids():
+    with pytest.raises(ValueError):
+        Workload(['crud'], 'app', [], seed=1)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+意图识别引擎测试
+
+    python -m pytest test_intent_engine.py
+"""
+
+import pytest
+
+from intent_engine import IntentEngine
+
+@pytest.mark.parametrize('message, intent, entities', [
+    ('查询张三的人事账号', 'query', {'name': '张三'}),
+    ('张三在哪个部门', 'query', {'name': '张三'}),
+    ('新增一个员工王小敏，部门是市场部', 'create', {'name': '王小敏', 'department': '市场部'}),
+    ('添加员工赵六到技术部', 'create', {'name': '赵六', 'department': '技术部'}),
+    ('添加赵六到技术部', 'create', {'name': '赵六', 'department': '技术部'}),
+    ('新增赵六，部门技术部', 'create', {'name': '赵六', 'department': '技术部'}),
+    ('把李四的部门改为行政部', 'update', {'name': '李四', 'department': '行政部'}),
+    ('将王五调到市场部', 'update', {'name': '王五', 'department': '市场部'}),
+    ('今天天气怎么样', 'unknown', {}),
+])
+def test_match(message, intent, entities):
+    assert IntentEngine().match(message) == {'intent': intent, 'entities': entities}
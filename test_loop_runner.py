@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台事件循环测试
+
+    python -m pytest test_loop_runner.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from loop_runner import BackgroundLoop
+
+def test_concurrent_first_use():
+    """多个线程同时首次提交协程，都提交到同一个已运行的循环"""
+    runner = BackgroundLoop(name='test-loop')
+    barrier = threading.Barrier(16)
+    results = []
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    def worker():
+        barrier.wait()
+        results.append(runner.run(current_loop(), timeout=5))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 16 and len(set(map(id, results))) == 1
+    runner.stop()
+
+def test_timeout_cancels_coroutine():
+    runner = BackgroundLoop(name='test-loop')
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        runner.run(slow(), timeout=0.05)
+    assert cancelled.wait(1)
+    runner.stop()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MCP服务器测试：工具列表常量与后端共用，启动耗时诊断不修改数据库，批量调用
+
+    python -m pytest test_mcp_server.py
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import database
+import employee_schema
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mcp-server', 'hr_mcp_server.py')
+
+# MCP服务器使用 backend.database（与测试中的 database 是两个模块对象）；
+# 与conftest相同，整个会话把它的DB_PATH指向临时目录，后台线程不会触碰仓库中的数据库
+backend_database = importlib.import_module('backend.database')
+backend_database.DB_PATH = os.path.join(tempfile.mkdtemp(), 'hr.db')
+
+def load_server():
+    spec = importlib.util.spec_from_file_location('hr_mcp_server', SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_constants_shared_with_backend():
+    server = load_server()
+    assert server.SEARCH_LIMIT is employee_schema.SEARCH_LIMIT is database.SEARCH_LIMIT
+    assert server.EMPLOYEE_FIELDS is employee_schema.EMPLOYEE_FIELDS is database.EMPLOYEE_FIELDS
+    assert not server.db.loaded
+
+def test_import_profile_leaves_database_untouched(tmp_path, monkeypatch, capsys):
+    """--import-profile 在临时副本上初始化数据库，原数据库文件不变"""
+    server = load_server()
+    path = str(tmp_path / 'hr_system.db')
+    shutil.copy(database.DEFAULT_DB_PATH, path)
+    with open(path, 'rb') as f:
+        original = f.read()
+    monkeypatch.setattr(backend_database, 'DB_PATH', path)
+
+    server.import_profile()
+
+    with open(path, 'rb') as f:
+        assert f.read() == original
+    assert sorted(os.listdir(tmp_path)) == ['hr_system.db']
+    assert '初始化数据库' in capsys.readouterr().err
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """使用临时数据库（含5条示例数据）的MCP服务器"""
+    monkeypatch.setattr(backend_database, 'DB_PATH', str(tmp_path / 'mcp.db'))
+    backend_database.init_database(verbose=False)
+    backend_database.insert_sample_data()
+    return load_server().HRMCPServer()
+
+def call(tool, **arguments):
+    return {"tool": tool, "arguments": arguments}
+
+def batch_results(server, calls):
+    response = asyncio.run(server.batch(calls))
+    return response, [item["result"] for item in response["data"]["results"]]
+
+def test_failed_write_rolls_back_earlier_writes_in_segment(server):
+    """写段中后面的调用失败时，同段中已成功的写入一起回滚"""
+    response, results = batch_results(server, [
+        call("create_employee", name="周九", department="技术部"),
+        call("update_employee", name="张三", department="财务部"),
+        call("update_employee", name="不存在的人", department="财务部"),
+    ])
+    assert not response["success"]
+    assert [result["success"] for result in results] == [False, False, False]
+    assert "未找到员工" in results[2]["message"]
+    assert "已回滚" in results[0]["message"] and "已回滚" in results[1]["message"]
+    assert not backend_database.execute_query("SELECT id FROM employee WHERE name = '周九'")
+    assert backend_database.execute_query(
+        "SELECT department FROM employee WHERE name = '张三'")[0]["department"] == "技术部"
+
+def test_reads_see_earlier_writes_in_batch(server):
+    """读调用能看到批内更早的写入，看不到更晚的写入"""
+    _, results = batch_results(server, [
+        call("search_employee", name="周九"),
+        call("create_employee", name="周九", department="技术部", employee_id="EMP100"),
+        call("search_employee", name="周九"),
+        call("update_employee", name="周九", department="财务部"),
+        call("get_employee_by_id", employee_id="EMP100"),
+        call("list_employees", department="财务部", fields=["name"]),
+    ])
+    assert [result["success"] for result in results] == [False, True, True, True, True, True]
+    assert results[0]["data"]["employees"] == []
+    assert [employee["department"] for employee in results[2]["data"]["employees"]] == ["技术部"]
+    assert results[4]["data"]["employee"]["department"] == "财务部"
+    assert {"name": "周九"} in results[5]["data"]["employees"]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+员工列表键集分页测试
+
+    python -m pytest test_pagination.py
+"""
+
+import base64
+import json
+
+import pytest
+
+def add_employees(db, count, prefix):
+    db.execute_write(db.bulk_insert_employees, [
+        (line, f'{prefix}{line}', None, '技术部', f'{prefix}{line}@company.com', '在职') for line in range(count)
+    ])
+
+def fetch_all_pages(client, limit, between_pages=None, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, limit=limit)
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/employees', query_string=query)
+        assert response.status_code == 200
+        page = response.get_json()['data']
+        assert len(page['employees']) <= limit
+        ids.extend(employee['id'] for employee in page['employees'])
+        cursor = page['next_cursor']
+        pages += 1
+        if cursor is None:
+            return ids, pages
+        if between_pages:
+            between_pages(pages)
+
+def expected_ids(db):
+    return [row['id'] for row in db.execute_query("SELECT id FROM employee ORDER BY created_at DESC, id DESC")]
+
+@pytest.mark.parametrize('limit', [1, 2, 7, 500])
+def test_pages_cover_every_row_once(db, client, limit):
+    add_employees(db, 20, '分页')
+    ids, pages = fetch_all_pages(client, limit)
+    assert ids == expected_ids(db)
+    assert pages == max(1, -(-len(ids) // limit))
+
+def test_pages_with_field_projection(db, client):
+    add_employees(db, 10, '分页')
+    ids, _ = fetch_all_pages(client, 3, fields='id,name', department='技术部')
+    assert ids == [row['id'] for row in db.execute_query(
+        "SELECT id FROM employee WHERE department = '技术部' ORDER BY created_at DESC, id DESC")]
+
+def test_inserts_between_pages_cause_no_duplicates_or_gaps(db, client):
+    add_employees(db, 20, '分页')
+    before = expected_ids(db)
+    ids, pages = fetch_all_pages(client, 4, between_pages=lambda page: add_employees(db, 3, f'新增{page}_'))
+    # 新增的行排在已翻过的位置之前，不会出现在后续页中；原有的行恰好各出现一次
+    assert ids == before
+    assert len(expected_ids(db)) == len(before) + 3 * (pages - 1)
+
+def encode(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii').rstrip('=')
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor!',
+    encode([1]),
+    encode(['2024-01-01 00:00:00', 1, 2]),
+    encode([['2024-01-01'], 1]),
+    encode(['2024-01-01 00:00:00', 'x']),
+    encode({'created_at': 1, 'id': 2}),
+    base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'),
+])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get('/api/employees', query_string={'limit': 2, 'cursor': cursor})
+    assert response.status_code == 400
+    assert '游标' in response.get_json()['message']
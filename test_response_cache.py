@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应缓存测试：任何写入（包括其他进程的写入）都会使缓存失效
+
+    python -m pytest test_response_cache.py
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from cache import ResponseCache
+
+def counting_loader(db, calls):
+    def load():
+        calls.append(1)
+        return db.execute_query("SELECT COUNT(*) AS count FROM employee WHERE status = '在职'")[0]['count']
+    return load
+
+def test_write_invalidates_entry(db):
+    cache = ResponseCache(db.get_data_version)
+    calls = []
+    load = counting_loader(db, calls)
+    active = cache.get_or_load('active', load)
+    assert cache.get_or_load('active', load) == active
+    assert len(calls) == 1
+
+    db.execute_write(lambda conn: conn.execute("UPDATE employee SET status = '离职' WHERE id = 1"))
+    assert cache.get_or_load('active', load) == active - 1
+    assert len(calls) == 2
+    assert cache.stats()['stale'] == 1
+
+def test_other_process_write_invalidates_entry(db):
+    """其他进程提交的写入通过 PRAGMA data_version 感知"""
+    cache = ResponseCache(db.get_data_version)
+    calls = []
+    load = counting_loader(db, calls)
+    active = cache.get_or_load('active', load)
+
+    subprocess.run([sys.executable, '-c', (
+        "import sqlite3, sys\n"
+        "conn = sqlite3.connect(sys.argv[1])\n"
+        "conn.execute(\"UPDATE employee SET status = '离职' WHERE id IN (1, 2)\")\n"
+        "conn.commit()\n"
+    ), db.DB_PATH], check=True)
+
+    assert cache.get_or_load('active', load) == active - 2
+    assert len(calls) == 2
+
+def test_ttl_and_eviction():
+    cache = ResponseCache(lambda: 1, max_entries=2, ttl=0)
+    assert cache.get_or_load('a', lambda: 1) == 1
+    assert cache.get_or_load('a', lambda: 2) == 2
+
+    cache = ResponseCache(lambda: 1, max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.get_or_load(key, lambda: key)
+    assert cache.get_or_load('a', lambda: 'reloaded') == 'reloaded'
+    assert cache.stats()['evictions'] == 2
+
+@pytest.fixture
+def cached_client(client, db, monkeypatch):
+    """使用独立响应缓存的测试客户端，避免复用其他测试数据库的缓存条目"""
+    import app
+    cache = ResponseCache(db.get_data_version)
+    monkeypatch.setattr(app, 'response_cache', cache)
+    return client, cache
+
+def test_endpoint_write_invalidates_cached_responses(cached_client):
+    client, cache = cached_client
+    stats = client.get('/api/stats').get_json()['data']['stats']
+    listing = client.get('/api/employees', query_string={'include_total': 'true'}).get_json()['data']
+    assert client.get('/api/stats').get_json()['data']['stats'] == stats
+    assert cache.stats()['hits'] == 1
+
+    response = client.post('/api/employees', json={'name': '赵六', 'department': '技术部'})
+    assert response.status_code == 201
+    assert client.get('/api/stats').get_json()['data']['stats']['total_employees'] == stats['total_employees'] + 1
+    assert client.get('/api/employees', query_string={'include_total': 'true'}).get_json()['data']['total'] == listing['total'] + 1
+
+    client.put('/api/employees/1', json={'status': '离职'})
+    assert client.get('/api/stats').get_json()['data']['stats']['active_employees'] == stats['active_employees']
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+姓名搜索测试：排序、大小写与字面匹配
+
+    python -m pytest test_search.py
+"""
+
+import pytest
+
+from models import EmployeeQuery
+
+def insert_names(db, names):
+    db.execute_write(lambda conn: conn.executemany(
+        "INSERT INTO employee (name, employee_id, department, hr_account, status) VALUES (?, ?, '技术部', ?, '在职')",
+        [(name, f'EMP{900 + i}', f'user{i}@company.com') for i, name in enumerate(names)]
+    ))
+
+def names(rows):
+    return [row['name'] for row in rows]
+
+@pytest.mark.parametrize('term', ['al', 'AL', 'Al'])
+def test_short_ascii_terms_ignore_case(db, term):
+    insert_names(db, ['Al', 'Alice', 'Sally', 'bob'])
+    assert names(db.search_employees(term)) == ['Al', 'Alice', 'Sally']
+    assert db.count_search_matches(term) == 3
+
+@pytest.mark.parametrize('term', ['ali', 'ALI'])
+def test_long_ascii_terms_ignore_case(db, term):
+    insert_names(db, ['Ali', 'Alice', 'Kali', 'bob'])
+    assert names(db.search_employees(term)) == ['Ali', 'Alice', 'Kali']
+    assert db.count_search_matches(term) == 3
+
+def test_short_chinese_term_ranking_and_paging(db):
+    insert_names(db, ['张', '张三丰', '小张'])
+    assert names(db.search_employees('张')) == ['张', '张三', '张三丰', '小张']
+    assert names(db.search_employees('张', limit=2, offset=2)) == ['张三丰', '小张']
+
+def test_wildcards_match_literally(db):
+    insert_names(db, ['A_B', 'AxB', '5%'])
+    assert names(db.search_employees('_')) == ['A_B']
+    assert names(db.search_employees('%')) == ['5%']
+
+def test_query_fts_condition_uses_phrase_quoting():
+    where, params = EmployeeQuery(name='张"三"丰').to_sql_where(use_fts=True)
+    assert 'MATCH' in where
+    assert params == ['"张""三""丰"']
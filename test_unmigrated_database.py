@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+在未迁移的数据库（仓库自带数据库的副本）上直接导入服务模块，
+模拟不经由 __main__ 启动（如WSGI服务器）的情况
+
+    python -m pytest test_unmigrated_database.py
+"""
+
+import shutil
+
+import pytest
+
+import database
+
+@pytest.fixture
+def shipped_db(tmp_path, monkeypatch):
+    path = str(tmp_path / 'hr_system.db')
+    shutil.copy(database.DEFAULT_DB_PATH, path)
+    monkeypatch.setattr(database, 'DB_PATH', path)
+    return path
+
+def test_app_reads_and_writes(shipped_db):
+    import app
+    client = app.app.test_client()
+    response = client.get('/api/stats')
+    assert response.status_code == 200
+    etag = client.get('/api/employees').headers['ETag']
+    assert client.get('/api/employees', headers={'If-None-Match': etag}).status_code == 304
+    response = client.post('/api/employees', json={'name': '甲', 'department': '技术部'})
+    assert response.status_code == 201
+
+def test_simple_app_chat_create(shipped_db, monkeypatch):
+    import simple_app
+    monkeypatch.setattr(simple_app, 'DB_PATH', shipped_db)
+    client = simple_app.app.test_client()
+    response = client.post('/api/employees', json={'name': '甲', 'department': '技术部'})
+    assert response.get_json()['success']
+    response = client.post('/api/ai/chat', json={'message': '新增员工乙乙，部门是技术部'})
+    assert '成功创建员工' in response.get_json()['data']['response']
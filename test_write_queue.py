@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+写队列测试：SAVEPOINT隔离、group commit、提交失败与写线程异常退出
+
+    python -m pytest test_write_queue.py
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+import database
+from database import WriteQueue
+
+@pytest.fixture
+def writer(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE item (value TEXT NOT NULL UNIQUE)")
+    conn.close()
+    queue = WriteQueue(path, window=0)
+    yield queue
+    queue.stop()
+
+def values(writer):
+    conn = sqlite3.connect(writer.db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT value FROM item ORDER BY rowid")]
+    finally:
+        conn.close()
+
+def insert(conn, value):
+    conn.execute("INSERT INTO item (value) VALUES (?)", (value,))
+    return value
+
+def submit_as_one_batch(writer, tasks):
+    """先用一个阻塞任务占住写线程，使后续任务进入同一批次"""
+    started = threading.Event()
+    release = threading.Event()
+    blocker = writer.submit(lambda conn: started.set() or release.wait(5))
+    assert started.wait(5)
+    futures = [writer.submit(func, *args) for func, *args in tasks]
+    release.set()
+    blocker.result(timeout=5)
+    return futures
+
+def test_failed_write_rolls_back_only_its_savepoint(writer):
+    def insert_then_fail(conn):
+        insert(conn, 'b')
+        raise ValueError("模拟失败")
+
+    futures = submit_as_one_batch(writer, [(insert, 'a'), (insert_then_fail,), (insert, 'c')])
+    assert futures[0].result(timeout=5) == 'a'
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == 'c'
+    assert values(writer) == ['a', 'c']
+
+def test_writes_are_group_committed(writer):
+    before = writer.stats()['batches']
+    futures = submit_as_one_batch(writer, [(insert, str(i)) for i in range(10)])
+    assert [future.result(timeout=5) for future in futures] == [str(i) for i in range(10)]
+    stats = writer.stats()
+    assert stats['batches'] - before == 2
+    assert stats['max_batch'] == 10
+
+def test_failed_commit_fails_every_future(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'CONNECTION_PRAGMAS', database.CONNECTION_PRAGMAS + ('PRAGMA foreign_keys=ON',))
+    path = str(tmp_path / 'fk.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE item (value TEXT NOT NULL UNIQUE);
+        CREATE TABLE parent (id INTEGER PRIMARY KEY);
+        CREATE TABLE child (parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED);
+    ''')
+    conn.close()
+    writer = WriteQueue(path, window=0)
+    try:
+        # 延迟外键在COMMIT时才检查，整个批次提交失败
+        futures = submit_as_one_batch(writer, [
+            (insert, 'a'),
+            (lambda conn: conn.execute("INSERT INTO child (parent_id) VALUES (42)"),),
+        ])
+        for future in futures:
+            with pytest.raises(sqlite3.IntegrityError):
+                future.result(timeout=5)
+        assert values(writer) == []
+        assert writer.submit(insert, 'b').result(timeout=5) == 'b'
+    finally:
+        writer.stop()
+
+def test_transaction_lost_mid_batch_fails_whole_batch(writer):
+    """SQLite自行回滚整个事务后，同批次已成功和之后的操作都失败，写线程继续工作"""
+    def lose_transaction(conn):
+        conn.execute('ROLLBACK')
+        raise sqlite3.OperationalError("database or disk is full")
+
+    futures = submit_as_one_batch(writer, [(insert, 'a'), (lose_transaction,), (insert, 'c')])
+    for future in futures:
+        with pytest.raises(sqlite3.OperationalError):
+            future.result(timeout=5)
+    assert values(writer) == []
+    assert writer.submit(insert, 'd').result(timeout=5) == 'd'
+    assert writer.is_alive()
+
+def test_crashed_writer_fails_futures_and_is_replaced(db, monkeypatch):
+    writer = database.get_writer()
+
+    def crash(conn, batch):
+        raise SystemError("模拟写线程崩溃")
+
+    monkeypatch.setattr(writer, '_commit_batch', crash)
+    with pytest.raises(RuntimeError):
+        database.execute_write(insert_employee_row)
+    writer._thread.join(timeout=5)
+    assert not writer.is_alive()
+    with pytest.raises(RuntimeError):
+        writer.submit(insert_employee_row).result(timeout=5)
+
+    assert database.get_writer() is not writer
+    assert database.execute_write(insert_employee_row) == 1
+
+def insert_employee_row(conn):
+    return conn.execute(
+        "INSERT INTO employee (name, employee_id, department, hr_account) VALUES ('甲', 'EMP900', '技术部', 'a@b.c')"
+    ).rowcount